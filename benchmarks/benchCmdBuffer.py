@@ -0,0 +1,109 @@
+## @file benchCmdBuffer.py
+#  Memory benchmark of the command buffer.
+#
+#  @section license_main License
+#
+#  @author  Rodrigo Pedroso Mendes
+#  @version V1.0
+#  @date    19/10/26 11:02:17
+#
+#  Copyright (c) 2023 Rodrigo Pedroso Mendes
+#
+#  Permission is hereby granted, free of charge, to any  person   obtaining  a
+#  copy of this software and associated  documentation files (the "Software"),
+#  to deal in the Software without restriction, including  without  limitation
+#  the rights to use, copy, modify,  merge,  publish,  distribute, sublicense,
+#  and/or sell copies of the Software, and  to  permit  persons  to  whom  the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included  in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,  EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE  WARRANTIES  OF  MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE  LIABLE FOR ANY  CLAIM,  DAMAGES  OR  OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF  CONTRACT, TORT  OR  OTHERWISE,  ARISING
+#  FROM, OUT OF OR IN CONNECTION  WITH  THE  SOFTWARE  OR  THE  USE  OR  OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vagen.veriloga import Module, CmdList, Real
+
+
+#-------------------------------------------------------------------------------
+## Build an analog block with n assignments. The operands mix the ones of a 
+#  test sequence: codes written to buses, voltages from a sweep and 
+#  expressions of other variables, which are almost all distinct.
+#  @param n number of assignments
+#  @param compact the commands are stored in a CmdBuffer if True
+#  @return tuple with the module, the peak memory and the build time
+#
+#-------------------------------------------------------------------------------
+def build(n, compact):
+    """Build an analog block with n assignments.
+
+    The operands mix the ones of a test sequence: codes written to buses, 
+    voltages from a sweep and expressions of other variables, which are 
+    almost all distinct.
+
+    Args:
+        n (int): Number of assignments.
+        compact (bool): Store the commands in a CmdBuffer if True.
+
+    Returns:
+        tuple: The module, the memory in bytes and the build time.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    mod = Module("bench")
+    pins = [mod.var(name = f"pin{i}_$state$") for i in range(16)]
+    volts = [mod.var(Real, f"vdd{i}_$value$") for i in range(4)]
+    cmds = mod.cmdBuffer() if compact else CmdList()
+    for i in range(n):
+        if i % 4 == 3:
+            cmds.append(volts[i % 4].eq(volts[(i + 1) % 4]*0.5 + 1e-6*i))
+        elif i % 4 == 2:
+            cmds.append(volts[i % 4].eq(1e-3*(i % 1800)))
+        else:
+            cmds.append(pins[i % 16].eq(i % 256))
+    mod.analog(cmds)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return mod, memory, elapsed
+
+
+#-------------------------------------------------------------------------------
+## Run the benchmark
+#  @param n number of assignments
+#  @return None
+#
+#-------------------------------------------------------------------------------
+def main(n = 200000):
+    """Run the benchmark.
+
+    Args:
+        n (int): Number of assignments.
+    """
+    for compact in [False, True]:
+        mod, memory, elapsed = build(n, compact)
+        start = time.perf_counter()
+        size = len(mod.getVA())
+        emit = time.perf_counter() - start
+        print(f"{'CmdBuffer' if compact else 'CmdList':10s} {n} cmds  "
+              f"memory {memory/2**20:8.2f}MiB  build {elapsed:7.3f}s  "
+              f"emit {emit:7.3f}s  {size}B  {len(mod.strings)} strings")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,96 @@
+## @file benchImport.py
+#  Import time benchmark.
+#
+#  @section license_main License
+#
+#  @author  Rodrigo Pedroso Mendes
+#  @version V1.0
+#  @date    19/10/26 11:02:17
+#
+#  Copyright (c) 2023 Rodrigo Pedroso Mendes
+#
+#  Permission is hereby granted, free of charge, to any  person   obtaining  a
+#  copy of this software and associated  documentation files (the "Software"),
+#  to deal in the Software without restriction, including  without  limitation
+#  the rights to use, copy, modify,  merge,  publish,  distribute, sublicense,
+#  and/or sell copies of the Software, and  to  permit  persons  to  whom  the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included  in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,  EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE  WARRANTIES  OF  MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE  LIABLE FOR ANY  CLAIM,  DAMAGES  OR  OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF  CONTRACT, TORT  OR  OTHERWISE,  ARISING
+#  FROM, OUT OF OR IN CONNECTION  WITH  THE  SOFTWARE  OR  THE  USE  OR  OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = ["import vagen",
+              "from vagen import Module",
+              "from vagen import HiLevelMod"]
+
+
+#-------------------------------------------------------------------------------
+## Measure the time taken by an import statement in a fresh interpreter
+#  @param statement import statement
+#  @return tuple with the time in seconds and the vagen modules loaded
+#
+#-------------------------------------------------------------------------------
+def importTime(statement):
+    """Measure the time taken by an import statement in a fresh interpreter.
+
+    Args:
+        statement (str): Import statement.
+
+    Returns:
+        tuple: Time in seconds and the vagen modules loaded.
+    """
+    code = ("import sys, time\n"
+            f"sys.path.insert(0, {ROOT!r})\n"
+            "start = time.perf_counter()\n"
+            f"{statement}\n"
+            "elapsed = time.perf_counter() - start\n"
+            "print(elapsed, ' '.join(sorted(m for m in sys.modules "
+            "if m.startswith('vagen'))))\n")
+    out = subprocess.run([sys.executable, "-c", code], check = True,
+                         capture_output = True, text = True).stdout.split()
+    return float(out[0]), out[1:]
+
+
+#-------------------------------------------------------------------------------
+## Run the benchmark
+#  @param repeat number of interpreters started for each statement
+#  @return None
+#
+#-------------------------------------------------------------------------------
+def main(repeat = 20):
+    """Run the benchmark.
+
+    Args:
+        repeat (int): Number of interpreters started for each statement.
+    """
+    for statement in STATEMENTS:
+        times = []
+        for i in range(repeat):
+            elapsed, modules = importTime(statement)
+            times.append(elapsed)
+        print(f"{statement:30s} median {1e3*statistics.median(times):8.3f}ms  "
+              f"min {1e3*min(times):8.3f}ms  loads {', '.join(modules)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+## @file benchSmu.py
+#  Cost of the Smu models.
+#
+#  @section license_main License
+#
+#  @author  Rodrigo Pedroso Mendes
+#  @version V1.0
+#  @date    19/10/26 11:02:17
+#
+#  Copyright (c) 2023 Rodrigo Pedroso Mendes
+#
+#  Permission is hereby granted, free of charge, to any  person   obtaining  a
+#  copy of this software and associated  documentation files (the "Software"),
+#  to deal in the Software without restriction, including  without  limitation
+#  the rights to use, copy, modify,  merge,  publish,  distribute, sublicense,
+#  and/or sell copies of the Software, and  to  permit  persons  to  whom  the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included  in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,  EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE  WARRANTIES  OF  MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE  LIABLE FOR ANY  CLAIM,  DAMAGES  OR  OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF  CONTRACT, TORT  OR  OTHERWISE,  ARISING
+#  FROM, OUT OF OR IN CONNECTION  WITH  THE  SOFTWARE  OR  THE  USE  OR  OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import os
+import re
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vagen import HiLevelMod, WaitUs, Finish
+
+# Operators counted in the analog block. They are evaluated at every time step.
+OPERATORS = ["transition", "tanh", "ddt"]
+
+# Arithmetic, relational and logical operators of the expressions
+ARITHMETIC = r"\)(?:\+|-|\*|/|<|>|==|<=|>=|\|\||&&)\(| \? "
+
+# Modes of the fast model
+MODES = {"voltage": 1, "current": 2, "resistance": 3}
+
+
+#-------------------------------------------------------------------------------
+## Build a testbench with n Smu pins
+#  @param n number of Smu pins
+#  @param model model of the Smu pins
+#  @return tuple with the verilogA code and the build time
+#
+#-------------------------------------------------------------------------------
+def build(n, model):
+    """Build a testbench with n Smu pins.
+
+    Args:
+        n (int): Number of Smu pins.
+        model (str): Model of the Smu pins.
+
+    Returns:
+        tuple: The verilogA code and the build time.
+    """
+    start = time.perf_counter()
+    mod = HiLevelMod("bench")
+    tSeq = mod.par(0, "TEST_SEQ_PARAM")
+    pins = mod.smu("SMU", n, "inout", model = model)
+    mod.seq(tSeq == 0)(
+        pins.applyV(1.8, 1e-3),
+        WaitUs(10),
+        pins.applyI(-1e-6, 1.8),
+        WaitUs(10),
+        pins.applyR(1e6),
+        WaitUs(10),
+        Finish()
+    )
+    elapsed = time.perf_counter() - start
+    return mod.getVA(), elapsed
+
+
+#-------------------------------------------------------------------------------
+## Count the operators of each pin in the analog block. The transition and the
+#  ddt operators are evaluated at every time step. The fast model only 
+#  evaluates one of its tanh operators (none in the resistance mode).
+#  @param va verilogA code
+#  @param n number of Smu pins
+#  @return dictionary with the number of operators per pin.
+#
+#-------------------------------------------------------------------------------
+def cost(va, n):
+    """Count the operators of each pin in the analog block.
+
+    The transition and the ddt operators are evaluated at every time step.
+    The fast model only evaluates one of its tanh operators (none in the 
+    resistance mode).
+
+    Args:
+        va (str): VerilogA code.
+        n (int): Number of Smu pins.
+
+    Returns:
+        dict: Number of operators per pin.
+    """
+    block = va[va.index("endcase"):]
+    return {op: len(re.findall(rf"\b{op}\(", block))/n for op in OPERATORS}
+
+
+#-------------------------------------------------------------------------------
+## Count the arithmetic operators and the assignments of each pin evaluated at
+#  each time step when no ramp is running. The branch run while the weight of
+#  the fast model is lower than 1 is skipped and only the item of the given 
+#  mode is counted in the case statements on the mode.
+#  @param va verilogA code
+#  @param n number of Smu pins
+#  @param mode mode of the fast model.
+#  @return tuple with the number of operators and assignments per pin.
+#
+#-------------------------------------------------------------------------------
+def steady(va, n, mode):
+    """Count the operators and assignments evaluated per pin at each step.
+
+    The branch run while the weight of the fast model is lower than 1 is 
+    skipped and only the item of the given mode is counted in the case 
+    statements on the mode.
+
+    Args:
+        va (str): VerilogA code.
+        n (int): Number of Smu pins.
+        mode (int): Mode of the fast model.
+
+    Returns:
+        tuple: Number of operators and assignments per pin.
+    """
+    lines = va[va.index("endcase"):].split("\n")[2:]
+    ops = 0
+    assigns = 0
+    skip = None
+    matched = False
+    for line in lines:
+        indent = len(line) - len(line.lstrip())
+        text = line.strip()
+        if skip is not None:
+            if indent > skip or text == "end":
+                continue
+            skip = None
+        if "_$weight$ )<(" in text:
+            ops = ops + 1
+            skip = indent
+            continue
+        if text == "else" or text == "endcase":
+            continue
+        if text.startswith("case("):
+            matched = False
+            continue
+        if text.endswith(":"):
+            if text == f"{mode}:" or (text == "default:" and not matched):
+                matched = True
+            else:
+                skip = indent
+            continue
+        ops = ops + len(re.findall(ARITHMETIC, text))
+        if re.match(r"[_a-zA-Z$][^ ]* = ", text):
+            assigns = assigns + 1
+    return ops/n, assigns/n
+
+
+#-------------------------------------------------------------------------------
+## Run the benchmark
+#  @param n number of Smu pins
+#  @return None
+#
+#-------------------------------------------------------------------------------
+def main(n = 256):
+    """Run the benchmark.
+
+    Args:
+        n (int): Number of Smu pins.
+    """
+    for model in ["default", "fast"]:
+        va, elapsed = build(n, model)
+        ops = cost(va, n)
+        print(f"{model:8s} {n} pins  build {elapsed:7.3f}s  {len(va)}B  "
+              + "  ".join(f"{op} {count:.0f}/pin" for op, count in ops.items()))
+        for name, mode in MODES.items():
+            ops, assigns = steady(va, n, mode)
+            print(f"         {name:10s} steady state  {ops:.0f} operators/pin  "
+                  f"{assigns:.0f} assignments/pin")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 256)
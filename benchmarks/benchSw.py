@@ -0,0 +1,127 @@
+## @file benchSw.py
+#  Cost of the Sw models.
+#
+#  @section license_main License
+#
+#  @author  Rodrigo Pedroso Mendes
+#  @version V1.0
+#  @date    19/10/26 11:02:17
+#
+#  Copyright (c) 2023 Rodrigo Pedroso Mendes
+#
+#  Permission is hereby granted, free of charge, to any  person   obtaining  a
+#  copy of this software and associated  documentation files (the "Software"),
+#  to deal in the Software without restriction, including  without  limitation
+#  the rights to use, copy, modify,  merge,  publish,  distribute, sublicense,
+#  and/or sell copies of the Software, and  to  permit  persons  to  whom  the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included  in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,  EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE  WARRANTIES  OF  MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE  LIABLE FOR ANY  CLAIM,  DAMAGES  OR  OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF  CONTRACT, TORT  OR  OTHERWISE,  ARISING
+#  FROM, OUT OF OR IN CONNECTION  WITH  THE  SOFTWARE  OR  THE  USE  OR  OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import os
+import re
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vagen import HiLevelMod, CmdList, WaitUs, Finish
+
+
+#-------------------------------------------------------------------------------
+## Build a testbench with n switches
+#  @param n number of switches
+#  @param model model of the switches
+#  @return tuple with the verilogA code and the build time
+#
+#-------------------------------------------------------------------------------
+def build(n, model):
+    """Build a testbench with n switches.
+
+    Args:
+        n (int): Number of switches.
+        model (str): Model of the switches.
+
+    Returns:
+        tuple: The verilogA code and the build time.
+    """
+    start = time.perf_counter()
+    mod = HiLevelMod("bench")
+    tSeq = mod.par(0, "TEST_SEQ_PARAM")
+    pins = mod.electrical("NODE", n + 1, "inout")
+    switches = [mod.sw(pins[i], pins[i + 1], model = model) for i in range(n)]
+    mod.seq(tSeq == 0)(
+        CmdList(*[sw.setCond(1e-3) for sw in switches]),
+        WaitUs(10),
+        CmdList(*[sw.setCond(0) for sw in switches]),
+        WaitUs(10),
+        Finish()
+    )
+    elapsed = time.perf_counter() - start
+    return mod.getVA(), elapsed
+
+
+#-------------------------------------------------------------------------------
+## Count the statements of each switch evaluated at every time step, i.e. the
+#  ones outside of the event blocks, its event blocks and its transition 
+#  operators.
+#  @param va verilogA code
+#  @param n number of switches
+#  @return dictionary with the counts per switch.
+#
+#-------------------------------------------------------------------------------
+def cost(va, n):
+    """Count the statements of each switch evaluated at every time step.
+
+    The statements outside of the event blocks, the event blocks and the 
+    transition operators are counted.
+
+    Args:
+        va (str): VerilogA code.
+        n (int): Number of switches.
+
+    Returns:
+        dict: Counts per switch.
+    """
+    block = va[va.index("endcase"):]
+    lines = [line for line in block.splitlines() if "sw" in line]
+    return {"statements" : sum(1 for line in lines 
+                               if re.match(r"    \S.*;$", line))/n,
+            "events"     : sum(1 for line in lines 
+                               if line.startswith("    @("))/n,
+            "transition" : len(re.findall(r"\btransition\(", block))/n}
+
+
+#-------------------------------------------------------------------------------
+## Run the benchmark
+#  @param n number of switches
+#  @return None
+#
+#-------------------------------------------------------------------------------
+def main(n = 256):
+    """Run the benchmark.
+
+    Args:
+        n (int): Number of switches.
+    """
+    for model in ["default", "settle"]:
+        va, elapsed = build(n, model)
+        ops = cost(va, n)
+        print(f"{model:8s} {n} switches  build {elapsed:7.3f}s  {len(va)}B  "
+              + "  ".join(f"{op} {count:.0f}/sw" for op, count in ops.items()))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 256)
@@ -0,0 +1,142 @@
+## @package test
+#
+#  @author  Rodrigo Pedroso Mendes
+#  @version V1.0
+#  @date    19/10/26 10:12:45
+#
+#  #LICENSE#
+#
+#  Copyright (c) 2023 Rodrigo Pedroso Mendes
+#
+#  Permission is hereby granted, free of charge, to any  person   obtaining  a
+#  copy of this software and associated  documentation files (the "Software"),
+#  to deal in the Software without restriction, including  without  limitation
+#  the rights to use, copy, modify,  merge,  publish,  distribute, sublicense,
+#  and/or sell copies of the Software, and  to  permit  persons  to  whom  the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included  in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,  EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE  WARRANTIES  OF  MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE  LIABLE FOR ANY  CLAIM,  DAMAGES  OR  OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF  CONTRACT, TORT  OR  OTHERWISE,  ARISING
+#  FROM, OUT OF OR IN CONNECTION  WITH  THE  SOFTWARE  OR  THE  USE  OR  OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+import sys
+sys.path.insert(0, "../")
+import os
+import tempfile
+import unittest
+from vagen import *
+from vagen.batch import expandGrid, runBatch, variantPaths
+
+
+################################################################################
+# Builder used by the tests. It must be defined at module level to be pickled.
+################################################################################
+def builder(seqId, delay):
+    mod = HiLevelMod("tb")
+    seqPar = mod.par(0, "testSeq")
+    vdd = mod.vdc("VDD", 1, direction = "inout")
+    mod.seq(seqPar == seqId)(
+        vdd.applyV(1.8),
+        WaitUs(delay),
+        vdd.applyV(0.0),
+        WaitUs(delay),
+        Finish()
+    )
+    return mod
+
+
+def failingBuilder(seqId):
+    assert seqId != 1, "seqId 1 is not supported"
+    return builder(seqId, 1)
+
+
+class TestBatch(unittest.TestCase):
+
+    ############################################################################
+    # Grid
+    ############################################################################
+    def testExpandGrid(self):
+        self.assertEqual(expandGrid({"a": [1, 2], "b": (3, 4)}),
+                         [{"a": 1, "b": 3}, {"a": 1, "b": 4},
+                          {"a": 2, "b": 3}, {"a": 2, "b": 4}])
+        self.assertEqual(expandGrid([{"a": 1}, {"a": 5}]),
+                         [{"a": 1}, {"a": 5}])
+        self.assertEqual(expandGrid({"a": range(3)}),
+                         [{"a": 0}, {"a": 1}, {"a": 2}])
+        with self.assertRaises(AssertionError):
+            expandGrid({"a": 1})
+        with self.assertRaises(AssertionError):
+            expandGrid([1, 2])
+        with self.assertRaises(AssertionError):
+            expandGrid({"index": [1, 2]})
+        with self.assertRaises(AssertionError):
+            expandGrid([{"a": 1}, {"index": 5}])
+
+    def testVariantPaths(self):
+        variants = [{"a": 1, "b": "x"}, {"a": 2, "b": "x"}]
+        self.assertEqual(variantPaths(variants, "out", "v{index}_{b}.va"),
+                         [os.path.join("out", "v0_x.va"),
+                          os.path.join("out", "v1_x.va")])
+        #Missing field
+        with self.assertRaises(AssertionError):
+            variantPaths(variants, "out", "v{c}.va")
+        with self.assertRaises(AssertionError):
+            variantPaths(variants, "out", "v{0}.va")
+        #Path separator in a value
+        with self.assertRaises(AssertionError):
+            variantPaths([{"b": os.path.join("x", "y")}], "out", "{b}.va")
+        #Colliding names
+        with self.assertRaises(AssertionError):
+            variantPaths(variants, "out", "v{b}.va")
+
+    ############################################################################
+    # Batch
+    ############################################################################
+    def testRunBatch(self):
+        grid = {"seqId": [1, 2], "delay": [10, 20]}
+        with tempfile.TemporaryDirectory() as outDir:
+            report = runBatch(builder, grid, outDir,
+                              fileName = "seq{seqId}_{delay}.va",
+                              maxWorkers = 2)
+            self.assertEqual([entry["index"] for entry in report],
+                             [0, 1, 2, 3])
+            for entry in report:
+                self.assertEqual(entry["error"], None)
+                self.assertTrue(entry["build"] >= 0)
+                self.assertTrue(entry["emit"] >= 0)
+                params = entry["params"]
+                self.assertEqual(entry["path"], os.path.join(outDir,
+                      f"seq{params['seqId']}_{params['delay']}.va"))
+                with open(entry["path"]) as file:
+                    text = file.read()
+                self.assertEqual(entry["size"], len(text.encode()))
+                self.assertEqual(text[323:], builder(**params).getVA()[323:])
+
+    def testRunBatchError(self):
+        with tempfile.TemporaryDirectory() as outDir:
+            report = runBatch(failingBuilder, {"seqId": [0, 1]}, outDir)
+            self.assertEqual(report[0]["error"], None)
+            self.assertTrue(os.path.isfile(report[0]["path"]))
+            self.assertTrue("seqId 1 is not supported" in report[1]["error"])
+            self.assertFalse(os.path.isfile(report[1]["path"]))
+
+    def testRunBatchBadName(self):
+        #Nothing is built if a file name is wrong
+        with tempfile.TemporaryDirectory() as outDir:
+            for fileName in ["v{missing}.va", "v{delay}.va", "variant.va"]:
+                with self.assertRaises(AssertionError):
+                    runBatch(builder, {"seqId": [1, 2], "delay": [10]}, 
+                             outDir, fileName)
+                self.assertEqual(os.listdir(outDir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,10 @@
 ################################################################################
 import sys
 sys.path.insert(0, "../")
+import io
+import os
+import re
+import tempfile
 import unittest
 from vagen import *
 
@@ -447,7 +451,987 @@ class TestHiLevelMod(unittest.TestCase):
         )
                 
         #print(mod.getVA())
+
+    ############################################################################
+    # Templates
+    ############################################################################
+    def testTemplates(self):
+        mod = HiLevelMod("tb")
+        rise = mod.tpar("rise")
+        delay = mod.tpar("delay")
+        code = mod.tpar("code", Integer)
+        vdd = mod.vdc("VDD", 1, direction = "inout")
+        bus = mod.dig(vdd, "BUS", 2, direction = "output")
+        mod.seq(True)(
+            vdd.setRiseFall(rise, rise),
+            vdd.applyV(1.8),
+            WaitUs(delay),
+            bus.write(code),
+            WaitUs(delay),
+            Finish()
+        )
+        ans = mod.render(rise = 1e-6, delay = 10, code = 2)
+        self.assertFalse("{{" in ans)
+        self.assertTrue("VDD_$rise$ = 1.000000e-06;" in ans)
+        self.assertTrue(("_$evntTime_1 = ( $abstime )+( ( 1.000000e-06 )*"
+                         "( 1.000000e+01 ) );") in ans)
+        self.assertTrue("BUS_$1$_$state$ = ( ( 2 )&( 2 ) )!=( 0 );" in ans)
+        skeleton = mod.skeleton
+        ans = mod.render(rise = 2e-6, delay = 20, code = 1)
+        self.assertTrue("VDD_$rise$ = 2.000000e-06;" in ans)
+        self.assertTrue("BUS_$1$_$state$ = ( ( 1 )&( 2 ) )!=( 0 );" in ans)
+        self.assertTrue(mod.skeleton is skeleton)
                                                                                                                                                         
+    ############################################################################
+    # Symbolic
+    ############################################################################
+    def buildSymbolic(self, symbolic):
+        mod = HiLevelMod("tb", symbolic = symbolic)
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        smu = mod.smu("SMU", 2, direction = "inout")
+        vdd = mod.vdc("VDD", 1, direction = "inout")
+        idc = mod.idc("IDC", 2, direction = "output")
+        pin = mod.electrical("PIN", 1, direction = "inout")
+        din = mod.dig(vdd, "DIN", 2, direction = "input")
+        dout = mod.dig(vdd, "DOUT", 2, direction = "output")
+        dio = mod.dig(vdd, "DIO", 1, direction = "inout")
+        clk = mod.clock(mod.dig(vdd, "CLK", 1, direction = "output"))
+        sw = mod.sw(pin, vdd, 1e-3)
+        marker = mod.marker("seq1")
+        var = mod.var(0, "count")
+        mod.seq(tSeq == 1)(
+            vdd.applyV(1.8),
+            smu.applyV(1.0, 1e-3),
+            idc[1].applyI(1e-3),
+            clk.on(1e6),
+            WaitUs(10),
+            var.eq(din.read()),
+            dout.write(var),
+            dio.write(True),
+            marker.mark("A"),
+            WaitSignal(Cross(pin.v - 0.5, "rising")),
+            sw.setCond(0.0),
+            Finish()
+        )
+        return mod
+
+    def testSymbolic(self):
+        ref = self.buildSymbolic(False).getVA()[323:]
+        mod = self.buildSymbolic(True)
+        self.assertEqual(mod.getVA()[323:], ref)
+        self.assertTrue("\x02" in str(mod.vdc("VDD2", 1).v))
+        mod = self.buildSymbolic(True)
+        mod.rename("VDD", "VDDA")
+        mod.rename("count", "cnt")
+        mod.rename("DOUT", "BUS")
+        ans = re.sub(r"\bVDD\b", "VDDA", ref)
+        ans = re.sub(r"\bcount\b", "cnt", ans)
+        ans = re.sub(r"\bDOUT\b", "BUS", ans)
+        self.assertEqual(mod.getVA()[323:], ans)
+        self.assertTrue("V(VDDA) <+" in ans)
+        self.assertTrue("V(BUS[1]) <+" in ans)
+        self.assertTrue('getData("/MARK_seq1" ' in mod.getEqs())
+        mod.rename("MARK_seq1", "MK")
+        self.assertTrue("output MK;" in mod.getVA())
+        self.assertEqual(mod.getEqs().split("\n")[1], 
+                         ('seq1,seq1_A,expr,cross(getData("/MK" ?result "tran")'
+                          ' 0.5 1 "either" nil nil),t,,'))
+        self.assertTrue('getData(\\"/MK\\" ' in mod.getOcn())
+        with self.assertRaises(AssertionError):
+            mod.rename("VDDA", "cnt")
+        with self.assertRaises(AssertionError):
+            mod.rename("VDD", "VDDB")
+        with self.assertRaises(Exception):
+            self.buildSymbolic(False).rename("VDD", "VDDA")
+
+    def testOptimize(self):
+        def build(optimize):
+            mod = HiLevelMod("tb")
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout")
+            var = mod.var(0, "count")
+            mod.seq(tSeq == 1, optimize = optimize)(
+                vdd.applyV(1.8),
+                Repeat(3)(
+                    vdd.applyV(0.5), 
+                    WaitUs(1)
+                ),
+                If(var > 1)(
+                    vdd.applyV(1.0)
+                ).Else(
+                    vdd.applyV(2.0)
+                ),
+                While(var < 2)(
+                    var.inc()
+                ),
+                WaitUs(2),
+                Finish()
+            )
+            va = mod.getVA()
+            return re.findall(r"\n {16}(\d+):", va), va
+        states, va = build(False)
+        self.assertEqual(states, 
+                         ["0", "2", "3", "1", "6", "5", "4", "7", "9", "8", 
+                          "10", "11"])
+        states, va = build(True)
+        self.assertEqual(states, [str(i) for i in range(9)])
+        self.assertEqual(va.count("if( ( _$2 )<( 3 ) )"), 2)
+        self.assertEqual(va.count("if( ( count )<( 2 ) )"), 3)
+        self.assertTrue("                8:\n                    $finish;" 
+                        in va)
+        with self.assertRaises(AssertionError):
+            build(1)
+
+    def testSharedEvents(self):
+        mod = HiLevelMod("tb")
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        pin = mod.electrical("PIN", 1, direction = "inout")
+        var = mod.var(0, "count")
+        for i in range(2):
+            mod.seq(tSeq == i)(
+                WaitSignal(Cross(pin.v - 0.5, "rising")),
+                var.inc(),
+                WaitSignal(Cross(pin.v - 0.5, "rising")),
+                WaitSignal(Cross(pin.v - 0.5, "falling")),
+                var.dec()
+            )
+        va = mod.getVA()
+        self.assertEqual(va.count("@( cross("), 2)
+        self.assertEqual(va.count("_$eventId_1 = 1;"), 2)
+        self.assertEqual(va.count("_$eventId_2 = 1;"), 2)
+        self.assertEqual(va.count("_$eventId_2 = 2;"), 1)
+        self.assertEqual(va.count("if( ( _$eventId_2 )==( 1 ) )"), 1)
+        self.assertEqual(va.count("if( ( _$eventId_2 )==( 2 ) )"), 1)
+
+    def testCompress(self):
+        def build(compress):
+            mod = HiLevelMod("tb")
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout")
+            bus = mod.dig(vdd, "BUS", 2, direction = "output")
+            steps = []
+            for i in range(50):
+                steps += [bus.write(i%4), vdd.applyV(0.1*i), WaitUs(i + 1)]
+            mod.seq(tSeq == 1, compress = compress)(
+                vdd.applyV(1.8),
+                WaitUs(1),
+                *steps,
+                Finish()
+            )
+            va = mod.getVA()
+            return re.findall(r"\n {16}(\d+):", va), va
+        states, va = build(0)
+        self.assertEqual(len(states), 52)
+        states, va = build(3)
+        self.assertEqual(states, ["0", "1", "51"])
+        self.assertEqual(va.count("parameter integer"), 3)
+        self.assertEqual(va.count("parameter real"), 2)
+        self.assertTrue("'{0, 1, 0, 1, 0, 1, " in va)
+        self.assertTrue(("BUS_$0$_$state$ = _$3[_$2];\n"
+                         "                    BUS_$1$_$state$ = _$4[_$2];\n"
+                         "                    VDD_$value$ = _$5[_$2];\n") 
+                         in va)
+        self.assertTrue("_$2 = ( ( _$2 )+( 1 ) )%( 50 );" in va)
+        states, va = build(51)
+        self.assertEqual(len(states), 52)
+        with self.assertRaises(AssertionError):
+            build(1)
+
+    def testPlayback(self):
+        with tempfile.TemporaryDirectory() as path:
+            fileName = os.path.join(path, "vectors.txt")
+            def build(n):
+                mod = HiLevelMod("tb")
+                tSeq = mod.par(0, "TEST_SEQ_PARAM")
+                vdd = mod.vdc("VDD", 1, direction = "inout")
+                bus = mod.dig(vdd, "BUS", 2, direction = "output")
+                var = mod.var(0, "count")
+                pb = mod.playback(fileName, [bus, vdd, var], 
+                                  ((i + 1, i%4, 0.5*i, i) for i in range(n)))
+                mod.seq(tSeq == 1)(
+                    vdd.applyV(1.8),
+                    pb,
+                    Finish()
+                )
+                return mod.getVA()
+            va = build(10)
+            with open(fileName) as file:
+                lines = file.read().split("\n")
+            self.assertEqual(len(lines), 11)
+            self.assertEqual(lines[0], "1.0 0 0.0 0")
+            self.assertEqual(lines[9], "10.0 1 4.5 9")
+            self.assertEqual(lines[10], "")
+            self.assertEqual(len(build(10000)), len(va))
+            with open(fileName) as file:
+                self.assertEqual(len(file.read().split("\n")), 10001)
+            self.assertTrue(f'_$5 = $fopen("{fileName}", "r");' in va)
+            self.assertTrue(('_$6 = $fscanf(_$5, "%e %d %e %d", _$4, _$2, '
+                             '_$3, count);') in va)
+            self.assertTrue("_$evntTime_1 = ( $abstime )+( ( 1.000000e-06 )*"
+                            "( _$4 ) );" in va)
+            self.assertTrue("$fclose(_$5);" in va)
+            self.assertEqual(re.findall(r"\n {16}(\d+):", va), 
+                             ["0", "1", "2"])
+            mod = HiLevelMod("tb")
+            with self.assertRaises(AssertionError):
+                mod.playback(fileName, [mod.var(0)], [(1, 2, 3)])
+            with self.assertRaises(AssertionError):
+                mod.playback(fileName, [mod.var(0)], [(1, 2.5)])
+            with self.assertRaises(TypeError):
+                mod.playback(fileName, [1], [(1, 2)])
+            with self.assertRaises(Exception):
+                mod.playback(fileName, [mod.var(0)], [(1, 2)]).getVA(0)
+
+            #The file is written when the command is created
+            os.remove(fileName)
+            pb = mod.playback(fileName, [mod.var(0)], [(1, 2)])
+            self.assertTrue(os.path.isfile(fileName))
+            with self.assertRaises(Exception):
+                str(pb)
+            with self.assertRaises(AssertionError):
+                mod.cmdBuffer(pb)
+
+    def testDispatch(self):
+        def build(leafSize):
+            mod = HiLevelMod("tb")
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout")
+            steps = []
+            for i in range(200):
+                steps += [vdd.applyV(0.01*i), WaitUs(1)]
+            mod.seq(tSeq == 1, leafSize = leafSize)(*steps, Finish())
+            return mod
+        ref = build(0)
+        va = ref.getVA()
+        stats = ref.getSeqStats()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual([stats[0][key] for key in 
+                          ("seq", "states", "leaves", "depth")], [1, 201, 1, 0])
+        self.assertEqual(va.count("case( _$state_1 )"), 1)
+        mod = build(64)
+        stats = mod.getSeqStats()[0]
+        self.assertEqual([stats[key] for key in ("states", "leaves", "depth")],
+                         [201, 4, 2])
+        va = mod.getVA()
+        self.assertEqual(va.count("case( _$state_1 )"), 4)
+        self.assertTrue("if( ( _$state_1 )<( 100 ) )" in va)
+        self.assertTrue("if( ( _$state_1 )<( 50 ) )" in va)
+        self.assertTrue("if( ( _$state_1 )<( 150 ) )" in va)
+        self.assertEqual(re.findall(r"\n +(\d+):", va), 
+                         [str(i) for i in range(201)])
+        self.assertEqual(build(201).getSeqStats()[0]["leaves"], 1)
+        with self.assertRaises(AssertionError):
+            build(-1)
+
+    def testSeqStats(self):
+        log = io.StringIO()
+        mod = HiLevelMod("tb", seqLog = log)
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        vdd = mod.vdc("VDD", 1, direction = "inout")
+        pin = mod.electrical("PIN", 1, direction = "inout")
+        var = mod.var(0, "count")
+        mod.seq(tSeq == 1)(
+            vdd.applyV(1.8),
+            WaitSignal(Cross(pin.v - 0.5, "rising")),
+            var.inc(),
+            If(var > 1)(
+                var.dec()
+            ),
+            WaitUs(1),
+            Repeat(3)(
+                WaitSignal(Cross(pin.v - 0.5, "rising")),
+            ),
+            Finish()
+        )
+        mod.seq(tSeq == 2)(
+            WaitSignal(Cross(pin.v - 0.5, "rising")),
+            While(var < 3)(
+                var.inc()
+            ),
+            Finish()
+        )
+        stats = mod.getSeqStats()
+        self.assertEqual(len(stats), 2)
+        self.assertEqual(stats[0]["seq"], 1)
+        self.assertEqual(stats[0]["states"], 10)
+        self.assertEqual(stats[0]["events"], 2)
+        self.assertEqual(stats[0]["monitors"], 1)
+        self.assertEqual(stats[0]["counters"], 1)
+        self.assertEqual(stats[0]["zeroWaitRun"], 3)
+        self.assertEqual(stats[0]["zeroWaitLoop"], False)
+        self.assertEqual(stats[1]["events"], 1)
+        self.assertEqual(stats[1]["monitors"], 0)
+        self.assertEqual(stats[1]["counters"], 0)
+        self.assertEqual(stats[1]["zeroWaitRun"], 4)
+        self.assertEqual(stats[1]["zeroWaitLoop"], True)
+        va = mod.getVA()
+        self.assertTrue(stats[0]["size"] > 0)
+        self.assertTrue(stats[0]["size"] + stats[1]["size"] < len(va))
+        self.assertTrue(stats[0]["size"] > stats[1]["size"])
+        for entry in stats:
+            self.assertTrue(entry["time"] >= 0)
+        lines = log.getvalue().split("\n")
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("seq    1  states     10"))
+        self.assertTrue(lines[1].endswith("zero-wait run 4 (loops without "
+                                          "wait)"))
+
+    def testDeepNesting(self):
+        depth = 3*sys.getrecursionlimit()
+        mod = HiLevelMod("tb")
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        var = mod.var(0, "count")
+        body = var.inc()
+        cmds = CmdList(var.dec())
+        for i in range(depth):
+            if i%2:
+                body = If(var > i)(body, WaitUs(1))
+            else:
+                body = Repeat(2)(body)
+            cmds = CmdList(cmds)
+        mod.seq(tSeq == 1)(body, cmds, Finish())
+        va = mod.getVA()
+        self.assertEqual(mod.getSeqStats()[0]["states"], 7*depth//2 + 1)
+        self.assertEqual(va.count("_$runSt_1 = 1;"), 3*depth + 1)
+        self.assertTrue(f"                {7*depth//2}: begin\n"
+                        "                    count = count - 1;\n"
+                        "                    $finish;\n" in va)
+
+    def testPeriodic(self):
+        def build(periodic):
+            mod = HiLevelMod("tb", timeTol = 1e-12)
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout")
+            clk = mod.dig(vdd, "CLK", 1, direction = "output")
+            mod.seq(tSeq == 1, periodic = periodic)(
+                vdd.applyV(1.8),
+                Repeat(100000)(
+                    WaitUs(0.5), 
+                    clk.toggle()
+                ),
+                Repeat(4)(
+                    vdd.applyV(1.0), 
+                    WaitUs(2), 
+                    vdd.applyV(0.0)
+                ),
+                Repeat(2)(
+                    WaitUs(1), 
+                    WaitUs(1)
+                ),
+                Finish()
+            )
+            return mod, mod.getVA()
+        mod, va = build(False)
+        self.assertEqual(mod.getSeqStats()[0]["states"], 14)
+        self.assertFalse("timer(_$3" in va)
+        mod, va = build(True)
+        self.assertEqual(mod.getSeqStats()[0]["states"], 10)
+        self.assertEqual(mod.getSeqStats()[0]["counters"], 3)
+        self.assertTrue(("    @( timer(_$3, 5.000000e-07, 1.000000e-12) )\n"
+                         "        if( ( _$eventId_1 )==( 1 ) )\n"
+                         "            _$runSt_1 = 1;\n") in va)
+        self.assertTrue("@( timer(_$5, 2.000000e-06, 1.000000e-12) )" in va)
+        self.assertEqual(va.count("_$3 = 1.000000e+06;"), 3)
+        self.assertTrue(("                1: begin\n"
+                         "                    CLK_$state$ = !CLK_$state$;\n"
+                         "                    _$2 = _$2 - 1;\n"
+                         "                    if( ( _$2 )==( 0 ) )\n"
+                         "                        _$3 = 1.000000e+06;\n"
+                         "                    if( ( _$2 )>( 0 ) ) begin\n"
+                         "                        _$eventId_1 = 1;\n"
+                         "                        _$state_1 = 1;\n"
+                         "                    end\n") in va)
+        self.assertTrue(("                    _$4 = _$4 - 1;\n"
+                         "                    if( ( _$4 )>( 0 ) )\n"
+                         "                        VDD_$value$ = 1.000000e+00;"
+                         "\n                    else\n"
+                         "                        _$5 = 1.000000e+06;\n") 
+                         in va)
+        with self.assertRaises(AssertionError):
+            HiLevelMod("tb").seq(True, periodic = 1)
+
+    def testScheduler(self):
+        def build(scheduler):
+            mod = HiLevelMod("tb", timeTol = 1e-12, scheduler = scheduler)
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout")
+            clks = [mod.clock(mod.dig(vdd, f"CLK{i}", 1, direction = "output"))
+                    for i in range(3)]
+            for i in range(2):
+                mod.seq(tSeq == i)(
+                    vdd.applyV(1.8),
+                    clks[i].on(1e6),
+                    WaitUs(1),
+                    clks[i].off(),
+                    Finish()
+                )
+            return mod.getVA()
+        va = build(False)
+        self.assertEqual(va.count("@( timer("), 5)
+        va = build(True)
+        self.assertEqual(va.count("@( timer("), 1)
+        self.assertTrue(("@( timer(_$schedTime, 0.000000e+00, "
+                         "1.000000e-12) ) begin\n") in va)
+        self.assertTrue(("        if( ( _$evntTime_2 )<=( _$schedTime ) ) "
+                         "begin\n"
+                         "            _$evntTime_2 = 1.000000e+06;\n"
+                         "            if( ( _$eventId_2 )==( 0 ) )\n"
+                         "                _$runSt_2 = 1;\n"
+                         "        end\n") in va)
+
+        #The clocks are run after the sequences as their own timers would be
+        self.assertTrue(("    if( ( _$schedFired )&&( ( clk3_$time$ )<=( "
+                         "_$schedTime ) ) ) begin\n"
+                         "        clk3_$time$ = ( clk3_$time$ )+( "
+                         "clk3_$halfPeriod$ );\n"
+                         "        CLK2_$state$ = !CLK2_$state$;\n") in va)
+        self.assertTrue(va.index("_$schedFired )&&( ( clk1_$time$") > 
+                        va.index("while( _$runSt_2 )"))
+        self.assertFalse("clk1_$time$ )<=( _$schedTime ) ) begin" in 
+                         va[:va.index("while( _$runSt_1 )")])
+        update = va[va.index("    _$schedTime = clk1_$time$;\n"):
+                    va.index("    V(VDD) <+")]
+        self.assertEqual(update.count("_$schedTime = "), 5)
+        self.assertTrue(va.index("    _$schedFired = 0;\n"
+                                 "    _$schedTime = clk1_$time$;") > 
+                        va.index("_$schedFired )&&( ( clk3_$time$"))
+        with self.assertRaises(AssertionError):
+            HiLevelMod("tb", scheduler = 1)
+
+        #The periodic loops and the settle of the switches are run by the
+        #shared timer too
+        mod = HiLevelMod("tb", scheduler = True)
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        vdd = mod.vdc("VDD", 1, direction = "inout")
+        pin = mod.electrical("B", direction = "inout")
+        sw = mod.sw(vdd, pin, model = "settle")
+        mod.seq(tSeq == 0, periodic = True)(
+            Repeat(5)(vdd.applyV(1), WaitUs(1)),
+            sw.setCond(1),
+            sw.settled(),
+            Finish()
+        )
+        va = mod.getVA()
+        self.assertEqual(va.count("@( timer("), 1)
+        self.assertTrue(("        if( ( _$3 )<=( _$schedTime ) ) begin\n"
+                         "            _$3 = ( _$3 )+( 1.000000e-06 );\n"
+                         "            if( ( _$eventId_1 )==( 1 ) )\n") in va)
+        self.assertTrue(("_$evntTime_1 = ( $abstime )+( ( 1.000000e-06 )*( "
+                         "( 1.000000e+06 )*( ( sw1_$settle$ )-( $abstime ) ) "
+                         ") );") in va)
+
+    def testSubseq(self):
+        def build(n, call, optimize = False):
+            mod = HiLevelMod("tb")
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout")
+            dat = mod.vdc("DAT", 1, direction = "inout")
+            body = [dat.applyV(1.8), WaitUs(1), dat.applyV(0), WaitUs(1)]
+            write = mod.subseq(*body)
+            cmds = []
+            for i in range(n):
+                cmds.append(vdd.applyV(0.1*i))
+                cmds.append(Call(write) if call else CmdList(*body))
+            mod.seq(tSeq == 0, optimize = optimize)(*cmds, Finish())
+            return mod
+        self.assertTrue(len(build(100, True).getVA()) < 
+                        len(build(100, False).getVA())/2)
+        mod = build(100, True, True)
+        va = mod.getVA()
+        self.assertEqual(mod.getSeqStats()[0]["states"], 104)
+        self.assertEqual(va.count("DAT_$value$ = 1.800000e+00;"), 1)
+        self.assertTrue(("                0: begin\n"
+                         "                    VDD_$value$ = 0.000000e+00;\n"
+                         "                    _$2 = 1;\n"
+                         "                    _$runSt_1 = 1;\n"
+                         "                    _$state_1 = 101;\n") in va)
+        self.assertTrue(("                103: begin\n"
+                         "                    _$runSt_1 = 1;\n"
+                         "                    _$state_1 = _$2;\n") in va)
+        mod = HiLevelMod("tb")
+        sub = mod.subseq(WaitUs(1))
+        sub.getCmds().append(Call(sub))
+        with self.assertRaises(Exception):
+            mod.seq(mod.par(0, "TEST_SEQ_PARAM") == 0)(Call(sub))
+        with self.assertRaises(Exception):
+            Call(sub).getVA(0)
+        with self.assertRaises(AssertionError):
+            mod.cmdBuffer(Call(sub))
+        with self.assertRaises(AssertionError):
+            mod.subseq()
+
+    def testSharedClock(self):
+        def build(shared, scheduler = False):
+            mod = HiLevelMod("tb", timeTol = 1e-12, scheduler = scheduler)
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout")
+            clks = [mod.clock(mod.dig(vdd, f"CLK{i}", 1, direction = "output"),
+                              shared = shared) for i in range(4)]
+            mod.seq(tSeq == 0)(
+                clks[0].on(1e6),
+                clks[1].on(1e6),
+                clks[2].on(1e6),
+                WaitUs(1),
+                clks[3].on(2e6),
+                clks[0].off(),
+                WaitUs(2),
+                Finish()
+            )
+            return mod.getVA()
+        va = build(False)
+        self.assertEqual(va.count("@( timer("), 5)
+        self.assertTrue(("    @( timer(clk1_$time$, clk1_$halfPeriod$, "
+                         "1.000000e-12) ) begin\n"
+                         "        CLK0_$state$ = !CLK0_$state$;\n"
+                         "        if( ( !( clk1_$isOn$ ) )&&( !( CLK0_$state$ "
+                         ") ) )\n"
+                         "            clk1_$time$ = 1.000000e+06;\n") in va)
+        va = build(True)
+        self.assertEqual(va.count("@( timer("), 3)
+        self.assertTrue(("@( timer(clkGen1_$start$, 5.000000e-07, "
+                         "1.000000e-12) ) begin\n"
+                         "        clkGen1_$level$ = !clkGen1_$level$;\n"
+                         "        clkGen1_$busy$ = 0;\n"
+                         "        if( ( clk1_$gen$ )==( 1 ) )\n"
+                         "            if( clk1_$isOn$ ) begin\n"
+                         "                CLK0_$state$ = clkGen1_$level$;\n"
+                         "                clkGen1_$busy$ = 1;\n"
+                         "            end\n"
+                         "            else begin\n"
+                         "                CLK0_$state$ = 0;\n"
+                         "                clk1_$gen$ = 0;\n"
+                         "            end\n") in va)
+        self.assertEqual(va.count("CLK1_$state$ = clkGen1_$level$;"), 1)
+        
+        #A clock joining a running generator waits for its next rising edge
+        self.assertTrue(("CLK1_$state$ = ( ( clkGen1_$start$ )>=( 1.000000e+06 "
+                         ") )||( ( ( clk2_$isOn$ )&&( ( clk2_$gen$ )==( 1 ) ) "
+                         ")&&( clkGen1_$level$ ) );") in va)
+        self.assertTrue("@( timer(clkGen2_$start$, 2.500000e-07, " in va)
+        self.assertTrue(("clkGen1_$start$ = ( clkGen1_$start$ )>=( "
+                         "1.000000e+06 ) ? ( $abstime )+( 5.000000e-07 ) : "
+                         "clkGen1_$start$;") in va)
+        mod = HiLevelMod("tb")
+        vdd = mod.vdc("VDD", 1, direction = "inout")
+        clk = mod.clock(mod.dig(vdd, "CLK", 1, direction = "output"), 
+                        shared = True)
+        with self.assertRaises(AssertionError):
+            clk.on(mod.par(1e6, "FREQ"))
+
+        #The generators are run by the shared timer of the scheduler
+        va = build(True, True)
+        self.assertEqual(va.count("@( timer("), 1)
+        self.assertTrue(("    if( ( _$schedFired )&&( ( clkGen2_$start$ )<=( "
+                         "_$schedTime ) ) ) begin\n"
+                         "        clkGen2_$start$ = ( clkGen2_$start$ )+( "
+                         "2.500000e-07 );\n"
+                         "        clkGen2_$level$ = !clkGen2_$level$;\n") 
+                        in va)
+
+    def testClockTree(self):
+        mod = HiLevelMod("tb", timeTol = 1e-12)
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        vdd = mod.vdc("VDD", 1, direction = "inout")
+        pins = [mod.dig(vdd, f"CLK{i}", 1, direction = "output") 
+                for i in range(5)]
+        tree = mod.clockTree(pins[0], [(pins[1], 2), (pins[2], 4), 
+                                       (pins[3], 8), (pins[4], 2, 1)])
+        mod.seq(tSeq == 0)(
+            tree.on(64e6),
+            WaitUs(1),
+            tree.off(),
+            WaitUs(1),
+            Finish()
+        )
+        va = mod.getVA()
+        self.assertEqual(va.count("@( timer("), 2)
+        self.assertTrue(("    @( timer(clk1_$start$, clk1_$halfPeriod$, "
+                         "1.000000e-12) )\n"
+                         "        if( clk1_$isOn$ ) begin\n"
+                         "            clk1_$tick$ = ( ( clk1_$tick$ )+( 1 ) )"
+                         "%( 16 );\n"
+                         "            CLK0_$state$ = ( ( clk1_$tick$ )%( 2 ) )"
+                         "<( 1 );\n"
+                         "            CLK1_$state$ = ( ( clk1_$tick$ )%( 4 ) )"
+                         "<( 2 );\n"
+                         "            CLK2_$state$ = ( ( clk1_$tick$ )%( 8 ) )"
+                         "<( 4 );\n"
+                         "            CLK3_$state$ = ( clk1_$tick$ )<( 8 );\n"
+                         "            CLK4_$state$ = ( ( ( clk1_$tick$ )+( 3 ) )"
+                         "%( 4 ) )<( 2 );\n"
+                         "        end\n"
+                         "        else begin\n"
+                         "            CLK0_$state$ = 0;\n") in va)
+        self.assertTrue("clk1_$halfPeriod$ = 7.812500e-09;" in va)
+        with self.assertRaises(AssertionError):
+            mod.clockTree(pins[0], [(pins[1], 0)])
+        with self.assertRaises(AssertionError):
+            mod.clockTree(pins[0], [pins[1]])
+
+        #The master timer is run by the shared timer of the scheduler
+        mod = HiLevelMod("tb", scheduler = True)
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        vdd = mod.vdc("VDD", 1, direction = "inout")
+        pins = [mod.dig(vdd, f"CLK{i}", 1, direction = "output") 
+                for i in range(2)]
+        tree = mod.clockTree(pins[0], [(pins[1], 2)])
+        mod.seq(tSeq == 0)(tree.on(64e6), WaitUs(1), tree.off(), Finish())
+        va = mod.getVA()
+        self.assertEqual(va.count("@( timer("), 1)
+        self.assertTrue(("    if( ( _$schedFired )&&( ( clk1_$start$ )<=( "
+                         "_$schedTime ) ) ) begin\n"
+                         "        clk1_$start$ = ( clk1_$start$ )+( "
+                         "clk1_$halfPeriod$ );\n"
+                         "        if( clk1_$isOn$ ) begin\n") in va)
+
+    def testSmuFast(self):
+        mod = HiLevelMod("tb")
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        smu = mod.smu("SMU", 2, "inout", model = "fast")
+        self.assertTrue(isinstance(smu[0], SmuFast))
+        mod.seq(tSeq == 0)(
+            smu.applyV(1.2, 1e-3),
+            WaitUs(1),
+            smu[1].applyR(1e3),
+            Finish()
+        )
+        va = mod.getVA()
+        self.assertEqual(va.count("transition("), 0)
+        ramp = ("( SMU_$1$_$rampEnd$ )>( $abstime ) ? ( 1.000000e+00 )-( ( ( "
+                "SMU_$1$_$rampEnd$ )-( $abstime ) )/( SMU_$1$_$riseFall$ ) ) "
+                ": 1.000000e+00")
+        self.assertTrue(("    if( ( SMU_$1$_$weight$ )<( 1.000000e+00 ) ) "
+                         "begin\n"
+                         f"        SMU_$1$_$weight$ = {ramp};\n") in va)
+        self.assertTrue("    @( timer(SMU_$1$_$rampTimer$) );\n" in va)
+        #Only the terms of the mode once the ramp is done
+        self.assertTrue(("            3:\n"
+                         "                I(SMU[1]) <+ ( V(SMU[1]) )*( "
+                         "SMU_$1$_$cond$ );\n") in va)
+        #Every update restarts the ramp from the current values
+        self.assertTrue(("                    SMU_$1$_$condOld$ = ( "
+                         "SMU_$1$_$condOld$ )+( ( ( SMU_$1$_$condNew$ )-( "
+                         "SMU_$1$_$condOld$ ) )*( SMU_$1$_$weight$ ) );\n"
+                         "                    SMU_$1$_$condNew$ = "
+                         "1.000000e-03;\n"
+                         "                    SMU_$1$_$rampEnd$ = ( $abstime "
+                         ")+( SMU_$1$_$riseFall$ );\n"
+                         "                    SMU_$1$_$rampTimer$ = "
+                         "SMU_$1$_$rampEnd$;\n"
+                         "                    SMU_$1$_$weight$ = "
+                         "0.000000e+00;\n"
+                         "                    SMU_$1$_$mode$ = 3;\n") in va)
+        
+        #Two updates in one state and one update in the middle of a ramp. 
+        #The ramp restarts from the blended values every time.
+        mod = HiLevelMod("tb")
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        smu = mod.smu("SMU", 1, "inout", model = "fast")
+        mod.seq(tSeq == 0)(
+            smu.applyV(1.2, 1e-3),
+            smu.applyI(1e-6, 1.8),
+            WaitUs(0.05),
+            smu.applyR(1e3),
+            Finish()
+        )
+        va = mod.getVA()
+        self.assertFalse("_$edge$" in va)
+        self.assertEqual(va.count("SMU_$rampEnd$ = ( $abstime )+( "
+                                  "SMU_$riseFall$ );"), 3)
+        self.assertEqual(va.count("                    SMU_$weight$ = ( "
+                                  "SMU_$rampEnd$ )>( $abstime ) ?"), 3)
+        self.assertEqual(va.count("SMU_$voltOld$ = ( SMU_$voltOld$ )+( ( ( "
+                                  "SMU_$voltNew$ )-( SMU_$voltOld$ ) )*( "
+                                  "SMU_$weight$ ) );"), 3)
+        with self.assertRaises(AssertionError):
+            mod.smu("SMU2", model = "slow")
+
+        #The scheduler resets the timer, not the end of the ramp
+        mod = HiLevelMod("tb", scheduler = True)
+        smu = mod.smu("SMU", 1, "inout", model = "fast")
+        va = mod.getVA()
+        self.assertTrue(("    if( ( _$schedFired )&&( ( SMU_$rampTimer$ )<=( "
+                         "_$schedTime ) ) )\n"
+                         "        SMU_$rampTimer$ = 1.000000e+06;\n") in va)
+        self.assertFalse("SMU_$rampEnd$ = 1.000000e+06;" in va)
+
+    def testDigTransition(self):
+        mod = HiLevelMod("tb")
+        vdd = mod.vdc("VDD", 1, direction = "inout")
+        bus = mod.dig(vdd, "D", 2, direction = "output", 
+                      model = "transition")
+        mod.dig(vdd, "S", 1, direction = "output")
+        va = mod.getVA()
+        self.assertEqual(va.count("tanh("), 1)
+        self.assertEqual(va.count("V(D[1]) <+"), 1)
+        self.assertTrue(("    V(D[0]) <+ ( ( V(VDD) )*( transition(D_$0$_$state$"
+                         " ? 1.000000e+00 : 0.000000e+00, D_$0$_$delay$, "
+                         "( D_$0$_$rise$ )/( 9.000000e-01 ), ( D_$0$_$fall$ "
+                         ")/( 9.000000e-01 )) ) )+( ( I(D[0]) )*( "
+                         "D_$0$_$serRes$ ) );\n") in va)
+        self.assertEqual(va.count("V(S) <+"), 2)
+        self.assertTrue(isinstance(bus, DigBusOut))
+        with self.assertRaises(AssertionError):
+            mod.dig(vdd, "IO", 1, direction = "inout", model = "transition")
+        with self.assertRaises(AssertionError):
+            mod.dig(vdd, "O", 1, direction = "output", model = "fast")
+
+    def testDigCached(self):
+        def build(symbolic):
+            mod = HiLevelMod("tb", symbolic = symbolic)
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout")
+            bus = mod.dig(vdd, "D", 3, direction = "input", cached = True)
+            pin = mod.dig(vdd, "P", 1, direction = "inout", cached = True)
+            x = mod.var()
+            mod.seq(tSeq == 0)(
+                x.eq(bus.read()),
+                x.eq(bus.read(True)),
+                x.eq(bus[1:0].read()),
+                x.eq(Integer(pin.read())),
+                Finish()
+            )
+            return mod
+        va = build(False).getVA()
+        self.assertEqual(build(True).getVA()[323:], va[323:])
+        self.assertEqual(va.count("@( cross("), 8)
+        self.assertTrue(("    @( cross(( V(D[2]) )-( ( V(VDD) )/( 2.000000e+00"
+                         " ) ), -1) )\n"
+                         "        if( D_$2$_$in$ ) begin\n"
+                         "            D_$2$_$in$ = 0;\n"
+                         "            D_$value$ = ( D_$value$ )-( 4 );\n"
+                         "        end\n") in va)
+        self.assertTrue(("        D_$value$ = ( ( D_$0$_$in$ ? 1 : 0 )+( ( "
+                         "D_$1$_$in$ ? 1 : 0 )*( 2 ) ) )+( ( D_$2$_$in$ ? 1 : "
+                         "0 )*( 4 ) );\n") in va)
+        self.assertTrue(("                    _$3 = D_$value$;\n"
+                         "                    _$3 = ( D_$value$ )>=( 4 ) ? ( "
+                         "D_$value$ )-( 8 ) : D_$value$;\n"
+                         "                    _$3 = ( D_$0$_$in$ ? 1 : 0 )+( ( "
+                         "D_$1$_$in$ ? 1 : 0 )*( 2 ) );\n"
+                         "                    _$3 = P_$in$ ? 1 : 0;\n") in va)
+        with self.assertRaises(AssertionError):
+            mod = build(False)
+            mod.dig(mod.vdc("VDD2"), "O", 1, direction = "output", 
+                    cached = True)
+
+    def testAutoBoundStep(self):
+        def build(autoBoundStep):
+            mod = HiLevelMod("tb", autoBoundStep = autoBoundStep)
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout")
+            ibias = mod.idc("IBIAS", 1, direction = "inout")
+            clk = mod.clock(mod.dig(vdd, "CLK", 1, direction = "output"))
+            mod.seq(tSeq == 0)(
+                vdd.applyV(1.8),
+                ibias.applyI(1e-6),
+                clk.on(1e6),
+                WaitUs(100),
+                clk.off(),
+                Finish()
+            )
+            return mod.getVA()
+        self.assertFalse("bound_step" in build(None))
+        va = build(1e-9)
+        self.assertTrue(("    if( ( ( _$rampEnd )>( $abstime ) )||( "
+                         "clk1_$isOn$ ) )\n"
+                         "        $bound_step(1.000000e-09);\n") in va)
+        self.assertTrue(("                    _$rampEnd = ( _$rampEnd )<( ( "
+                         "$abstime )+( ( VDD_$value$ )<( 1.800000e+00 ) ? "
+                         "VDD_$rise$ : VDD_$fall$ ) ) ? ( $abstime )+( ( "
+                         "VDD_$value$ )<( 1.800000e+00 ) ? VDD_$rise$ : "
+                         "VDD_$fall$ ) : _$rampEnd;\n"
+                         "                    VDD_$value$ = 1.800000e+00;\n")
+                        in va)
+        self.assertEqual(va.count("_$rampEnd = ( _$rampEnd )<"), 2)
+
+    def testDiscontinuity(self):
+        def build(discontinuity, autoBoundStep = None):
+            mod = HiLevelMod("tb", autoBoundStep = autoBoundStep)
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 1, direction = "inout", rise = 0, fall = 0)
+            ibias = mod.idc("IBIAS", 1, direction = "inout")
+            sw = mod.sw(vdd, ibias)
+            mod.seq(tSeq == 0, discontinuity = discontinuity)(
+                vdd.applyV(1.8),
+                ibias.applyI(1e-6),
+                WaitUs(1),
+                sw.setCond(1),
+                WaitUs(1),
+                Finish()
+            )
+            return mod.getVA()
+        self.assertFalse("$discontinuity" in build(False))
+        va = build(True)
+        self.assertEqual(va.count("$discontinuity(0);"), 2)
+        self.assertFalse("$bound_step" in va)
+        #The time for the direction of the change is checked before the
+        #assignment
+        self.assertTrue(("                    _$step = ( ( 1.800000e+00 )>( "
+                         "VDD_$value$ ) ? VDD_$rise$ : VDD_$fall$ )==( "
+                         "0.000000e+00 );\n"
+                         "                    VDD_$value$ = 1.800000e+00;\n"
+                         "                    _$step = ( _$step )||( ( ( "
+                         "1.000000e-06 )>( IBIAS_$value$ ) ? IBIAS_$rise$ : "
+                         "IBIAS_$fall$ )==( 0.000000e+00 ) );\n"
+                         "                    IBIAS_$value$ = 1.000000e-06;\n"
+                         "                    if( _$step )\n"
+                         "                        $discontinuity(0);\n") 
+                        in va)
+        self.assertEqual(va.count("integer _$step;"), 1)
+        va = build(True, 1e-9)
+        self.assertEqual(va.count("        $bound_step(1.000000e-09);\n"), 3)
+
+    def testMuxMarkers(self):
+        mod = HiLevelMod("tb", symbolic = True)
+        tSeq = mod.par(0, "TEST_SEQ_PARAM")
+        vdd = mod.vdc("VDD", 1, direction = "inout")
+        marker1 = mod.marker("seq1", mux = True)
+        marker2 = mod.marker("seq2", mux = True)
+        
+        #The events are numbered by their position in the sequence, not by 
+        #the order the marks are created
+        end = marker2.mark("END")
+        marker2.mark("UNUSED")
+        mod.seq(tSeq == 0)(
+            vdd.applyV(1.8),
+            marker1.mark("UP"),
+            WaitUs(1),
+            vdd.applyV(0),
+            marker1.mark("DOWN"),
+            Finish()
+        )
+        mod.seq(tSeq == 1)(
+            WaitUs(1),
+            marker2.mark("START"),
+            WaitUs(1),
+            end,
+            Finish()
+        )
+        va = mod.getVA()
+        self.assertFalse("MARK_" in va)
+        self.assertEqual(va.count("smooth("), 0)
+        self.assertEqual(va.count("V(MARK) <+ transition(_$markCount"), 1)
+        self.assertEqual(va.count("_$markCount = _$markCount + 1;"), 4)
+        eqs = mod.getEqs().split("\n")
+        self.assertEqual(len(eqs), 5)
+        self.assertEqual(eqs[1], ('seq1,seq1_UP,expr,cross(getData("/MARK" '
+                                  '?result "tran") 0.5 1 "rising" nil nil),'
+                                  't,,'))
+        self.assertEqual(eqs[2], ('seq1,seq1_DOWN,expr,cross(getData("/MARK" '
+                                  '?result "tran") 1.5 1 "rising" nil nil),'
+                                  't,,'))
+        self.assertEqual(eqs[3], ('seq2,seq2_START,expr,cross(getData('
+                                  '"/MARK" ?result "tran") 0.5 1 "rising" '
+                                  'nil nil),t,,'))
+        self.assertEqual(eqs[4], ('seq2,seq2_END,expr,cross(getData('
+                                  '"/MARK" ?result "tran") 1.5 1 "rising" '
+                                  'nil nil),t,,'))
+        mod.rename("MARK", "MK")
+        self.assertTrue('getData("/MK" ' in mod.getEqs())
+        with self.assertRaises(AssertionError):
+            marker1.low()
+        with self.assertRaises(AssertionError):
+            mod.marker("seq3", 1e-9, mux = True)
+        
+        #The count would depend on the path taken at run time
+        with self.assertRaises(Exception):
+            mod.seq(tSeq == 2)(
+                Repeat(2)(
+                    marker1.mark("LOOP"),
+                    WaitUs(1)
+                ),
+                Finish()
+            )
+
+    def testSharedSourceBus(self):
+        def build(shared):
+            mod = HiLevelMod("tb")
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            vdd = mod.vdc("VDD", 4, direction = "inout", shared = shared)
+            ibias = mod.idc("IBIAS", 3, direction = "inout", shared = shared)
+            mod.seq(tSeq == 0)(
+                vdd.setRiseFall(1e-9, 2e-9),
+                vdd.applyV(1.8),
+                ibias[2:1].applyI(1e-6),
+                WaitUs(1),
+                Finish()
+            )
+            return mod.getVA()
+        va = build(False)
+        self.assertEqual(va.count("transition("), 7)
+        self.assertEqual(va.count("_$value$ = 1.800000e+00;"), 4)
+        va = build(True)
+        self.assertEqual(va.count("transition("), 2)
+        self.assertEqual(va.count("real VDD_$value$"), 1)
+        self.assertFalse("VDD_$0$" in va)
+        self.assertTrue(("    VDD_$ramp$ = transition(VDD_$value$, "
+                         "0.000000e+00, VDD_$rise$, VDD_$fall$);\n") in va)
+        self.assertTrue("    V(VDD[3]) <+ VDD_$ramp$;\n" in va)
+        self.assertTrue("    I(IBIAS[0]) <+ IBIAS_$ramp$;\n" in va)
+        self.assertEqual(va.count("VDD_$value$ = 1.800000e+00;"), 1)
+        self.assertEqual(va.count("VDD_$rise$ = 1.000000e-09;"), 1)
+        self.assertEqual(va.count("IBIAS_$value$ = 1.000000e-06;"), 1)
+
+    def testSwSettle(self):
+        def build(model):
+            mod = HiLevelMod("tb")
+            tSeq = mod.par(0, "TEST_SEQ_PARAM")
+            pin1 = mod.electrical("A", direction = "inout")
+            pin2 = mod.electrical("B", direction = "inout")
+            sw = mod.sw(pin1, pin2, model = model)
+            cmds = [sw.setCond(1e-3)]
+            if model == "settle":
+                cmds.append(sw.settled())
+            mod.seq(tSeq == 0)(*(cmds + [WaitUs(1), Finish()]))
+            return mod.getVA()
+        self.assertTrue("transition(" in build("default"))
+        va = build("settle")
+        self.assertFalse("transition(" in va)
+        self.assertTrue(("    I(A, B) <+ ( V(A, B) )*( ( sw1_$settle$ )>( "
+                         "$abstime ) ? ( sw1_$cond$ )+( ( ( ( sw1_$condOld$ "
+                         ")-( sw1_$cond$ ) )*( ( sw1_$settle$ )-( $abstime ) "
+                         ") )/( sw1_$length$ ) ) : sw1_$cond$ );\n") in va)
+        self.assertTrue(("    @( timer(sw1_$settleTimer$) )\n"
+                         "        sw1_$isOn$ = ( sw1_$cond$ )>( 0.000000e+00 "
+                         ");\n") in va)
+        self.assertTrue(("                    sw1_$settle$ = ( $abstime )+( "
+                         "sw1_$length$ );\n"
+                         "                    sw1_$settleTimer$ = "
+                         "sw1_$settle$;\n"
+                         "                    sw1_$cond$ = 1.000000e-03;\n")
+                        in va)
+        #The wait is skipped when the ramp is already done
+        self.assertTrue(("                    if( ( sw1_$settle$ )>( $abstime "
+                         ") )\n"
+                         "                        _$state_1 = 1;\n"
+                         "                    else\n") in va)
+        self.assertTrue(("    @( timer(sw1_$settle$) )\n"
+                         "        if( ( _$eventId_1 )==( 1 ) )\n") in va)
+        self.assertEqual(va.count("sw1_$isOn$ = ( sw1_$cond$ )>( "
+                                  "0.000000e+00 );"), 4)
+        with self.assertRaises(AssertionError):
+            build("fast")
+
+        #The scheduler resets the timer, not the end of the ramp
+        mod = HiLevelMod("tb", scheduler = True)
+        pin1 = mod.electrical("A", direction = "inout")
+        pin2 = mod.electrical("B", direction = "inout")
+        mod.sw(pin1, pin2, model = "settle")
+        va = mod.getVA()
+        self.assertTrue("        sw1_$settleTimer$ = 1.000000e+06;\n" in va)
+        self.assertFalse("sw1_$settle$ = 1.000000e+06;" in va)
+
+    def testSeqCmdBuffer(self):
+        mod = HiLevelMod("tb")
+        a = mod.var(0, "a")
+        marker = mod.marker("seq1")
+        buf = mod.cmdBuffer(a.eq(1))
+        for cmd in [WaitUs(1), WaitSignal(Timer(1)), marker.mark("UP"), 
+                    CmdList(a.eq(2), WaitUs(1))]:
+            with self.assertRaises(AssertionError):
+                buf.append(cmd)
+
 if __name__ == '__main__':
     unittest.main()
     
@@ -0,0 +1,88 @@
+## @package test
+#
+#  @author  Rodrigo Pedroso Mendes
+#  @version V1.0
+#  @date    19/10/26 11:02:17
+#
+#  #LICENSE#
+#
+#  Copyright (c) 2023 Rodrigo Pedroso Mendes
+#
+#  Permission is hereby granted, free of charge, to any  person   obtaining  a
+#  copy of this software and associated  documentation files (the "Software"),
+#  to deal in the Software without restriction, including  without  limitation
+#  the rights to use, copy, modify,  merge,  publish,  distribute, sublicense,
+#  and/or sell copies of the Software, and  to  permit  persons  to  whom  the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included  in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,  EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE  WARRANTIES  OF  MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE  LIABLE FOR ANY  CLAIM,  DAMAGES  OR  OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF  CONTRACT, TORT  OR  OTHERWISE,  ARISING
+#  FROM, OUT OF OR IN CONNECTION  WITH  THE  SOFTWARE  OR  THE  USE  OR  OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+import sys
+sys.path.insert(0, "../")
+import os
+import statistics
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "benchmarks"))
+from benchImport import importTime
+
+# Budgets of the median import time in seconds. They are generous, so they
+# only fail when something slow is loaded at import.
+BUDGET_PACKAGE = 0.05
+BUDGET_MODULE  = 0.5
+
+
+class TestImport(unittest.TestCase):
+
+    ############################################################################
+    # Lazy loading. Each statement runs in a fresh interpreter and the vagen 
+    # modules left in sys.modules are checked, as well as the median time.
+    ############################################################################
+    def medianTime(self, statement, modules, repeat = 5):
+        times = []
+        for i in range(repeat):
+            elapsed, loaded = importTime(statement)
+            self.assertEqual(loaded, modules)
+            times.append(elapsed)
+        return statistics.median(times)
+
+    def testImportPackage(self):
+        self.assertLess(self.medianTime("import vagen", ["vagen"]), 
+                        BUDGET_PACKAGE)
+        elapsed, modules = importTime("import vagen; dir(vagen)")
+        self.assertEqual(modules, ["vagen"])
+
+    def testImportModule(self):
+        self.assertLess(self.medianTime("from vagen import Module", 
+                                        ["vagen", "vagen.veriloga"]), 
+                        BUDGET_MODULE)
+        elapsed, modules = importTime("import vagen; vagen.If")
+        self.assertEqual(modules, ["vagen", "vagen.veriloga"])
+
+    def testImportHiLevelMod(self):
+        self.assertLess(self.medianTime("from vagen import HiLevelMod", 
+                                        ["vagen", "vagen.hilevelmod",
+                                         "vagen.veriloga"]), 
+                        BUDGET_MODULE)
+
+    def testImportAll(self):
+        elapsed, modules = importTime("from vagen import *")
+        self.assertEqual(modules, ["vagen", "vagen.hilevelmod",
+                                   "vagen.veriloga"])
+        with self.assertRaises(AttributeError):
+            import vagen
+            vagen.NotAName
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -657,6 +657,39 @@ class TestVA(unittest.TestCase):
         self.assertEqual(str(b.getVA(0)), 'a;\nb;\nc;\nd;\ne;\nf;\ng;\n')            
         self.assertEqual(str(b.getVA(1)), '    a;\n    b;\n    c;\n    d;\n    e;\n    f;\n    g;\n') 
         
+    ############################################################################
+    # Command buffer
+    ############################################################################
+    def testCmdBuffer(self):
+        a = IntegerVar("a")
+        b = RealVar("b")
+        c = BoolVar("c")
+        cmds = CmdList(a.eq(1), b.eq(2.0), Cmd("$finish"), a.inc(), c.toggle(),
+                       If(c)(a.eq(1), a.eq(2)), CmdList(a.eq(1), b.eq(3.0)))
+        buf = CmdBuffer(cmds)
+        self.assertEqual(len(buf), 8)
+        self.assertEqual(buf.getVA(1), cmds.getVA(1))
+        self.assertEqual(str(CmdBuffer(a.eq(1), Cmd("$finish"))), 
+                         "a = 1, $finish")
+        self.assertEqual(list(buf.opcodes), [0, 0, 1, 0, 0, 2, 0, 0])
+        self.assertEqual(len(buf.table), 9)
+        buf.assign(a, Integer(5))
+        self.assertEqual(buf.getVA(0).split("\n")[-2], "a = 5;")
+        self.assertEqual(Block("if( c )", CmdBuffer(a.eq(1))).getVA(0), 
+                         "if( c )\n    a = 1;\n")
+        self.assertEqual(Block("if( c )", CmdBuffer(a.eq(1), a.eq(2))).getVA(0),
+                         "if( c ) begin\n    a = 1;\n    a = 2;\nend\n")
+        self.assertEqual(Block("if( c )", CmdBuffer()).getVA(0), "if( c );\n")
+        mod = Module("test")
+        buf1 = mod.cmdBuffer(a.eq(1))
+        buf2 = mod.cmdBuffer(a.eq(1), a.eq(2))
+        self.assertTrue(buf1.table is buf2.table)
+        self.assertEqual(len(mod.strings), 3)
+        self.assertEqual(a.eq(1).target, "a")
+        self.assertEqual(a.eq(1).operand, "1")
+        with self.assertRaises(AssertionError):
+            CmdBuffer(At(Timer(1))(a.eq(1)))
+
     ############################################################################
     # Block
     ############################################################################ 
@@ -825,6 +858,15 @@ class TestVA(unittest.TestCase):
         a = Fopen("ab")   
         self.assertEqual(type(a), Integer)   
         self.assertEqual(str(a), '$fopen("ab")')   
+        a = Fopen("ab", "r")   
+        self.assertEqual(str(a), '$fopen("ab", "r")')   
+        with self.assertRaises(AssertionError):
+            Fopen("ab", "x")
+        a = Fscanf(Integer('f'), "%e %d", RealVar('a'), IntegerVar('b'))
+        self.assertEqual(type(a), Integer)   
+        self.assertEqual(str(a), '$fscanf(f, "%e %d", a, b)')
+        with self.assertRaises(AssertionError):
+            Fscanf(Integer('f'), "%e", Real('a'))
         a = Fclose(Integer('f'))   
         self.assertEqual(type(a), Cmd)   
         self.assertEqual(str(a), '$fclose(f)')
@@ -1184,6 +1226,86 @@ analog begin
 end
 endmodule'''
         self.assertEqual(mod.getVA()[323:], ref)
+
+    ############################################################################
+    # testRender
+    ############################################################################        
+    def testRender(self): 
+        mod = Module("teste")
+        var = mod.var(vType = Real)
+        var2 = mod.var()
+        tp1 = mod.tpar("tp1")
+        tp2 = mod.tpar("tp2", Integer)
+        self.assertEqual(type(tp1), RealTemplate)
+        self.assertEqual(type(tp2), IntegerTemplate)
+        self.assertEqual(str(tp1), "{{tp1}}")
+        self.assertEqual(str(tp2), "{{tp2}}")
+        mod.analog(var.eq(tp1*2), var2.eq(tp2 + 1))
+        ans = mod.render(tp1 = 1.5, tp2 = 3)
+        self.assertTrue(ans.endswith(
+            ("analog begin\n"
+             "    _$1 = ( 1.500000e+00 )*( 2.000000e+00 );\n"
+             "    _$2 = ( 3 )+( 1 );\n"
+             "end\nendmodule") ) )
+        self.assertEqual(mod.render(tp1 = 1.5, tp2 = 3), ans)
+        self.assertTrue("( 2.500000e+00 )*" in mod.render(tp1 = 2.5, tp2 = 3))
+        mod.analog(var.eq(tp1))
+        self.assertTrue("_$1 = 1.500000e+00;" in mod.render(tp1 = 1.5, tp2 = 3))
+
+        #The skeleton is reused until a CmdList of the module is changed
+        skeleton = mod.skeleton
+        mod.render(tp1 = 2.5, tp2 = 4)
+        self.assertTrue(mod.skeleton is skeleton)
+        cmds = CmdList(var2.eq(tp2))
+        mod.analog(cmds)
+        mod.render(tp1 = 1.5, tp2 = 3)
+        cmds.append(var2.eq(var2 + 2))
+        ans = mod.render(tp1 = 1.5, tp2 = 3)
+        self.assertEqual(ans.count("_$2 = "), 3)
+        self.assertEqual(ans[323:], 
+                         mod.getVA()[323:].replace("{{tp1}}", "1.500000e+00")
+                                          .replace("{{tp2}}", "3"))
+        cmds.clear()
+        self.assertEqual(mod.render(tp1 = 1.5, tp2 = 3).count("_$2 = "), 1)
+
+        #The header is dated again the next day
+        mod.skeletonKey = (mod.skeletonKey[0], None)
+        mod.render(tp1 = 1.5, tp2 = 3)
+        self.assertFalse(mod.skeleton is skeleton)
+        with self.assertRaises(Exception):
+            mod.render(tp1 = 1.5)
+        with self.assertRaises(Exception):
+            mod.render(tp1 = 1.5, tp2 = 3, tp3 = 4)
+        with self.assertRaises(Exception):
+            mod.render(tp1 = 1.5, tp2 = 3.5)
+        with self.assertRaises(AssertionError):
+            mod.tpar("tp1")
+        with self.assertRaises(AssertionError):
+            mod.tpar("1tp")
+
+    def testTable(self): 
+        mod = Module("teste")
+        var = mod.var(vType = Real)
+        idx = mod.var()
+        tbl1 = mod.table([1, 2, 3])
+        tbl2 = mod.table([1, 2.5], "tbl")
+        self.assertEqual(type(tbl1), Table)
+        self.assertEqual(len(tbl1), 3)
+        self.assertEqual(type(tbl1[idx]), Integer)
+        self.assertEqual(type(tbl2[1]), Real)
+        self.assertEqual(str(tbl1[idx + 1]), "_$3[( _$2 )+( 1 )]")
+        mod.analog(var.eq(tbl2[idx]))
+        va = mod.getVA()
+        self.assertTrue("parameter integer _$3[0:2] = '{1, 2, 3};\n" in va)
+        self.assertTrue(("parameter real tbl[0:1] = "
+                         "'{1.000000e+00, 2.500000e+00};\n") in va)
+        self.assertTrue("    _$1 = tbl[_$2];\n" in va)
+        with self.assertRaises(AssertionError):
+            tbl1[3]
+        with self.assertRaises(AssertionError):
+            mod.table([])
+        with self.assertRaises(AssertionError):
+            mod.table([1, "a"])
                                                                                                                                                      
 if __name__ == '__main__':
     unittest.main()
@@ -41,27 +41,72 @@
 ################################################################################
 
 #-------------------------------------------------------------------------------
-# Imports
+# Lazy imports. The modules are only loaded when one of their names is used, so
+# "import vagen" is cheap and scripts that only need the low level Module never
+# load the hilevelmod module.
 #-------------------------------------------------------------------------------
-from vagen.hilevelmod import HiLevelMod, Module, Branch, Cmd, CmdList, Electrical, \
-                     Real, Integer, Bool,\
-                     RealVar, IntegerVar, Vdc, Smu, DigIn, DigOut, DigInOut, \
-                     DigBusIn, DigBusOut, DigBusInOut, \
-                     If, For, While, Case, Repeat, At, \
-                     Cross, Above, Timer, InitialStep, FinalStep, \
-                     temp, vt, abstime, \
-                     random, uDistReal, uDistInt, uDistInt, \
-                     gaussDistInt, gaussDistReal, expDistInt, expDistReal, \
-                     poissonDistInt, poissonDistReal, \
-                     lastCrossing, analysis, acStim, \
-                     absDelay, transition, slew, ternary, \
-                     limexp, exp, ddt, idt, ceil, floor, ln, log, sqrt, \
-                     sin, cos, tan, asin, acos, atan, atan2, hypot, \
-                     sinh, cosh, tanh, asinh, acosh, atanh, \
-                     Strobe, Write, Discontinuity, BoundStep, \
-                     Fopen, Fwrite, Fstrobe, Fclose, \
-                     Finish, Error, Fatal, WaitUs, WaitSignal
-            
-            
+_veriloga = ["Module", "Branch", "Cmd", "CmdList", "CmdBuffer", 
+             "Electrical", 
+             "Real", "Integer", "Bool",
+             "RealVar", "IntegerVar", "RealTemplate", "IntegerTemplate", 
+             "Table", 
+             "If", "For", "While", "Case", "Repeat", "At", 
+             "Cross", "Above", "Timer", "InitialStep", "FinalStep", 
+             "temp", "vt", "abstime", 
+             "random", "uDistReal", "uDistInt", 
+             "gaussDistInt", "gaussDistReal", "expDistInt", "expDistReal", 
+             "poissonDistInt", "poissonDistReal", 
+             "lastCrossing", "analysis", "acStim", 
+             "absDelay", "transition", "slew", "ternary", 
+             "limexp", "exp", "ddt", "idt", "ceil", "floor", "ln", "log", 
+             "sqrt", "sin", "cos", "tan", "asin", "acos", "atan", "atan2", 
+             "hypot", "sinh", "cosh", "tanh", "asinh", "acosh", "atanh", 
+             "Strobe", "Write", "Discontinuity", "BoundStep", 
+             "Fopen", "Fwrite", "Fstrobe", "Fscanf", "Fclose", 
+             "Finish", "Error", "Fatal"]
 
+_hilevelmod = ["HiLevelMod", "Vdc", "Smu", "DigIn", "DigOut", "DigInOut", 
+               "DigBusIn", "DigBusOut", "DigBusInOut", "WaitUs", "WaitSignal",
+               "Call", "SmuFast"]
 
+__all__ = _veriloga + _hilevelmod
+
+
+#-------------------------------------------------------------------------------
+## Load the module where name is defined and return the object
+#  @param name name of the object
+#  @return the object
+#
+#-------------------------------------------------------------------------------
+def __getattr__(name):
+    """Load the module where name is defined and return the object.
+
+    Args:
+        name (str): Name of the object.
+
+    Returns:
+        The object.
+    """
+    if name in _veriloga:
+        from vagen import veriloga as module
+    elif name in _hilevelmod:
+        from vagen import hilevelmod as module
+    else:
+        raise AttributeError(f"module 'vagen' has no attribute '{name}'")
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+#-------------------------------------------------------------------------------
+## List the names of the package, including the ones not loaded yet
+#  @return list of names
+#
+#-------------------------------------------------------------------------------
+def __dir__():
+    """List the names of the package, including the ones not loaded yet.
+
+    Returns:
+        list: Names of the package.
+    """
+    return sorted(set(globals()) | set(__all__))
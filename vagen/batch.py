@@ -0,0 +1,319 @@
+## @file batch.py
+#  Parallel generation of testbench variants.
+#
+#  @section license_main License
+#
+#  @author  Rodrigo Pedroso Mendes
+#  @version V1.0
+#  @date    19/10/26 10:12:45
+#
+#  Copyright (c) 2023 Rodrigo Pedroso Mendes
+#
+#  Permission is hereby granted, free of charge, to any  person   obtaining  a
+#  copy of this software and associated  documentation files (the "Software"),
+#  to deal in the Software without restriction, including  without  limitation
+#  the rights to use, copy, modify,  merge,  publish,  distribute, sublicense,
+#  and/or sell copies of the Software, and  to  permit  persons  to  whom  the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included  in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,  EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE  WARRANTIES  OF  MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE  LIABLE FOR ANY  CLAIM,  DAMAGES  OR  OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF  CONTRACT, TORT  OR  OTHERWISE,  ARISING
+#  FROM, OUT OF OR IN CONNECTION  WITH  THE  SOFTWARE  OR  THE  USE  OR  OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+
+
+#-------------------------------------------------------------------------------
+## Expand a parameter grid into a list of variants. No argument can be named
+#  index, as the index of the variant is used to format the file names.
+#  @param grid Dictionary mapping each builder argument to a list of values or
+#         an iterable of dictionaries (each one is a variant).
+#  @return list of dictionaries with the builder arguments of each variant.
+#
+#-------------------------------------------------------------------------------
+def expandGrid(grid):
+    """Expand a parameter grid into a list of variants.
+
+    No argument can be named index, as the index of the variant is used to 
+    format the file names.
+
+    Args:
+        grid (dict or iterable): Dictionary mapping each builder argument to
+            a list of values (the cartesian product is taken) or an iterable
+            of dictionaries (each one is a variant).
+
+    Returns:
+        list: Dictionaries with the builder arguments of each variant.
+    """
+    if isinstance(grid, dict):
+        keys = list(grid.keys())
+        assert "index" not in keys, "grid can't have an argument named index"
+        for key in keys:
+            assert isinstance(grid[key], (list, tuple, range)), \
+                   f"values of {key} must be a list, a tuple or a range"
+        return [dict(zip(keys, values))
+                for values in product(*[grid[key] for key in keys])]
+    variants = list(grid)
+    for variant in variants:
+        assert isinstance(variant, dict), \
+               "grid must be a dict or an iterable of dicts"
+        assert "index" not in variant, \
+               "grid can't have an argument named index"
+    return variants
+
+
+#-------------------------------------------------------------------------------
+## Get the output path of each variant. The file names are checked before any
+#  variant is built: every field of fileName must be given, the names can't 
+#  have a path separator and two variants can't be written to the same file.
+#  @param variants List of dictionaries with the builder arguments.
+#  @param outDir Output directory.
+#  @param fileName Name of the output files. It is formatted with the variant
+#         index and the variant parameters.
+#  @return list with the path of each variant.
+#
+#-------------------------------------------------------------------------------
+def variantPaths(variants, outDir, fileName):
+    """Get the output path of each variant.
+
+    The file names are checked before any variant is built: every field of
+    fileName must be given, the names can't have a path separator and two 
+    variants can't be written to the same file.
+
+    Args:
+        variants (list): Dictionaries with the builder arguments.
+        outDir (str): Output directory.
+        fileName (str): Name of the output files. It is formatted with the
+            variant index and the variant parameters.
+
+    Returns:
+        list: Path of each variant.
+    """
+    assert isinstance(fileName, str), "fileName must be a string"
+    separators = [sep for sep in (os.sep, os.altsep) if sep]
+    paths = []
+    owners = {}
+    for index, params in enumerate(variants):
+        try:
+            name = fileName.format(index = index, **params)
+        except (KeyError, IndexError, ValueError, AttributeError) as e:
+            raise AssertionError(f"fileName '{fileName}' can't be formatted "
+                                 f"for variant {index} {params}: "
+                                 f"{type(e).__name__}: {e}") from None
+        assert name and not any(sep in name for sep in separators), \
+               f"file name '{name}' of variant {index} must be a plain name"
+        path = os.path.join(outDir, name)
+        assert path not in owners, \
+               (f"variants {owners[path]} and {index} are both written to "
+                f"'{path}'. Add {{index}} or the parameters to fileName")
+        owners[path] = index
+        paths.append(path)
+    return paths
+
+
+#-------------------------------------------------------------------------------
+## Build a single variant and write it to disk. It runs in the worker process.
+#  @param builder Callable that returns a Module (or its verilogA text).
+#  @param params Dictionary of arguments passed to the builder.
+#  @param path Path of the output file.
+#  @return tuple with the build time, the emission time and the file size in
+#          bytes.
+#
+#-------------------------------------------------------------------------------
+def buildVariant(builder, params, path):
+    """Build a single variant and write it to disk.
+
+    Args:
+        builder (callable): Callable that returns a Module (or its verilogA
+            text).
+        params (dict): Arguments passed to the builder.
+        path (str): Path of the output file.
+
+    Returns:
+        tuple: Build time, emission time and the file size in bytes.
+    """
+    start = time.perf_counter()
+    mod = builder(**params)
+    built = time.perf_counter()
+    text = mod if isinstance(mod, str) else mod.getVA()
+    emitted = time.perf_counter()
+    with open(path, "w") as file:
+        file.write(text)
+    return built - start, emitted - built, len(text.encode())
+
+
+#-------------------------------------------------------------------------------
+## Build all variants of a parameter grid in parallel. Each variant is written
+#  to disk as soon as it is done.
+#  @param builder Picklable callable that returns a Module. The parameters of
+#         each variant are passed as keyword arguments.
+#  @param grid Parameter grid (see expandGrid).
+#  @param outDir Output directory. It is created if it doesn't exist.
+#  @param fileName Name of the output files. It is formatted with the variant
+#         index and the variant parameters. It is checked for every variant
+#         before any of them is built (see variantPaths).
+#  @param maxWorkers Number of worker processes. Default is the number of cores.
+#  @param log File-like object where the timing of each variant is written as
+#         it completes. Nothing is written if None.
+#  @return list of dictionaries (one per variant, sorted by index) with the
+#          keys index, params, path, build, emit, size and error.
+#
+#-------------------------------------------------------------------------------
+def runBatch(builder, grid, outDir = ".", fileName = "variant_{index}.va",
+             maxWorkers = None, log = None):
+    """Build all variants of a parameter grid in parallel.
+
+    Args:
+        builder (callable): Picklable callable that returns a Module. The
+            parameters of each variant are passed as keyword arguments.
+        grid (dict or iterable): Parameter grid (see expandGrid).
+        outDir (str): Output directory. It is created if it doesn't exist.
+        fileName (str): Name of the output files. It is formatted with the
+            variant index and the variant parameters. It is checked for every
+            variant before any of them is built (see variantPaths).
+        maxWorkers (int, optional): Number of worker processes.
+        log (file, optional): Where the timing of each variant is written.
+
+    Returns:
+        list: One dictionary per variant, sorted by index, with the keys
+            index, params, path, build, emit, size and error.
+    """
+    assert callable(builder), "builder must be callable"
+    variants = expandGrid(grid)
+    paths = variantPaths(variants, outDir, fileName)
+    os.makedirs(outDir, exist_ok = True)
+    report = []
+    with ProcessPoolExecutor(max_workers = maxWorkers) as pool:
+        futures = {}
+        for index, (params, path) in enumerate(zip(variants, paths)):
+            future = pool.submit(buildVariant, builder, params, path)
+            futures[future] = (index, params, path)
+        for future in as_completed(futures):
+            index, params, path = futures[future]
+            entry = {"index"  : index,
+                     "params" : params,
+                     "path"   : path,
+                     "build"  : None,
+                     "emit"   : None,
+                     "size"   : None,
+                     "error"  : None}
+            try:
+                entry["build"], entry["emit"], entry["size"] = future.result()
+            except Exception as e:
+                entry["error"] = f"{type(e).__name__}: {e}"
+            report.append(entry)
+            if log is not None:
+                log.write(formatEntry(entry) + "\n")
+                log.flush()
+    return sorted(report, key = lambda entry: entry["index"])
+
+
+#-------------------------------------------------------------------------------
+## Format one entry of the batch report.
+#  @param entry Dictionary returned by runBatch.
+#  @return string.
+#
+#-------------------------------------------------------------------------------
+def formatEntry(entry):
+    """Format one entry of the batch report.
+
+    Args:
+        entry (dict): Entry returned by runBatch.
+
+    Returns:
+        str: One line describing the variant.
+    """
+    if entry["error"] is not None:
+        return f"{entry['index']:6d}  FAILED  {entry['error']}"
+    return (f"{entry['index']:6d}  build {entry['build']:9.4f}s  "
+            f"emit {entry['emit']:9.4f}s  {entry['size']:10d}B  "
+            f"{entry['path']}")
+
+
+#-------------------------------------------------------------------------------
+## Resolve a builder given as "package.module:callable".
+#  @param spec String with the module and the callable name.
+#  @return callable.
+#
+#-------------------------------------------------------------------------------
+def resolveBuilder(spec):
+    """Resolve a builder given as "package.module:callable".
+
+    Args:
+        spec (str): Module and callable name separated by a colon.
+
+    Returns:
+        callable: The builder.
+    """
+    moduleName, sep, funcName = spec.partition(":")
+    assert sep and moduleName and funcName, \
+           f"builder must be given as 'module:callable' but '{spec}' was given"
+    return getattr(importlib.import_module(moduleName), funcName)
+
+
+#-------------------------------------------------------------------------------
+## Command line entry point: python -m vagen.batch module:builder --grid ...
+#  @param argv List of arguments. sys.argv is used if None.
+#  @return exit code.
+#
+#-------------------------------------------------------------------------------
+def main(argv = None):
+    """Command line entry point.
+
+    Args:
+        argv (list, optional): Arguments. sys.argv is used if None.
+
+    Returns:
+        int: Exit code (the number of failed variants is reported as 1).
+    """
+    parser = argparse.ArgumentParser(
+        prog = "python -m vagen.batch",
+        description = "Build testbench variants in parallel."
+    )
+    parser.add_argument("builder",
+                        help = "builder given as package.module:callable")
+    parser.add_argument("--grid", required = True,
+                        help = "JSON parameter grid or a path to a JSON file")
+    parser.add_argument("--out", default = ".", help = "output directory")
+    parser.add_argument("--name", default = "variant_{index}.va",
+                        help = "file name pattern")
+    parser.add_argument("-j", "--jobs", type = int, default = None,
+                        help = "number of worker processes")
+    args = parser.parse_args(argv)
+
+    if os.path.isfile(args.grid):
+        with open(args.grid) as file:
+            grid = json.load(file)
+    else:
+        grid = json.loads(args.grid)
+    sys.path.insert(0, os.getcwd())
+    start = time.perf_counter()
+    report = runBatch(resolveBuilder(args.builder), grid, args.out, args.name,
+                      args.jobs, sys.stdout)
+    failed = sum(1 for entry in report if entry["error"] is not None)
+    print(f"{len(report)} variants ({failed} failed) in "
+          f"{time.perf_counter() - start:.3f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,6 +33,53 @@
 # Imports
 #-------------------------------------------------------------------------------
 from vagen.veriloga import *
+import math
+import time
+
+
+#-------------------------------------------------------------------------------
+## Base class of the commands compiled by the sequences (Mark, WaitUs, 
+#  WaitSignal, Playback, Call). They don't have a verilogA representation of 
+#  their own, so they can't be used outside a sequence.
+#
+#-------------------------------------------------------------------------------
+class SeqCmd(Cmd):
+    """Base class of the commands compiled by the sequences.
+
+    They don't have a verilogA representation of their own, so they can't be
+    used outside a sequence.
+    """
+
+    # Compiled by the sequences only
+    seqOnly = True
+
+    #---------------------------------------------------------------------------
+    ## Raise an exception as the command doesn't have a string representation.
+    #
+    #  @param self The object pointer.
+    #
+    #---------------------------------------------------------------------------
+    def __str__(self):
+        """Raise an exception as the command doesn't have a string 
+        representation.
+        """
+        raise Exception(f"{type(self).__name__} doesn't have string "
+                        "representation")
+
+    #---------------------------------------------------------------------------
+    ## Raise an exception as the command can't be used outside a sequence.
+    #
+    #  @param self The object pointer.
+    #  @param padding Number of padding spaces.
+    #
+    #---------------------------------------------------------------------------
+    def getVA(self, padding):
+        """Raise an exception as the command can't be used outside a sequence.
+
+        Args:
+            padding (int): Number of padding spaces.
+        """
+        raise Exception(f"{type(self).__name__} can't be outside seq")
 
 
 #-------------------------------------------------------------------------------
@@ -42,7 +89,7 @@ from vagen.veriloga import *
 #  an specific event
 #
 #-------------------------------------------------------------------------------
-class Mark(Cmd):
+class Mark(SeqCmd):
     """Mark command class.
     
     This class is used to store a command that marks a specific event.
@@ -53,16 +100,25 @@ class Mark(Cmd):
     #
     #  @param self The object pointer.
     #  @param cmd Command to be added to the marker.
+    #  @param marker Multiplexed Marker numbering the event when the sequence
+    #         is compiled. None for the other markers.
+    #  @param name Name of the event of a multiplexed marker.
     #
     #---------------------------------------------------------------------------
-    def __init__(self, cmd):
+    def __init__(self, cmd, marker = None, name = ""):
         """Initialize a Mark instance.
 
         Args:
             cmd (Cmd): The command to be stored as a marker.
+            marker (Marker, optional): Multiplexed marker numbering the event
+                when the sequence is compiled.
+            name (str): Name of the event of a multiplexed marker.
         """
         checkInstance("cmd", cmd, Cmd)
+        checkType("name", name, str)
         self.cmd = cmd
+        self.marker = marker
+        self.name = name
 
     #---------------------------------------------------------------------------
     ## Return the command
@@ -79,28 +135,6 @@ class Mark(Cmd):
         """
         return self.cmd
 
-    #---------------------------------------------------------------------------
-    ## Dummy method.
-    #  Raise exception when runned.
-    #
-    #  @param self The object pointer.
-    #
-    #---------------------------------------------------------------------------        
-    def __str__(self):
-        #TODO: Find a better way to fix this
-        raise Exception("Mark doesn't have string representation")
-
-    #---------------------------------------------------------------------------
-    ## Dummy method.
-    #  Raise exception when runned.
-    #
-    #  @param self The object pointer.
-    #
-    #---------------------------------------------------------------------------        
-    def getVA(self, padding):
-        #TODO: Find a better way to fix this
-        raise Exception("Mark can't be outside seq")
-
 
 #-------------------------------------------------------------------------------
 ## Marker class. 
@@ -123,21 +157,47 @@ class Marker():
     # @param hiLeveMod  Hi level model in which the analog command will be added
     # @param name Name of the marker.
     # @param riseFall Rise and fall times of the marker pin.
+    # @param mux If True, the marker drives the MARK pin shared by all 
+    #        multiplexed markers instead of its own pin. 
     #
     #---------------------------------------------------------------------------
-    def __init__(self, hiLevelMod, name, riseFall):
+    def __init__(self, hiLevelMod, name, riseFall, mux = False):
         """Initialize a Marker.
 
         Args:
             hiLevelMod (HiLevelMod): The high-level model where the analog command is added.
             name (str): The marker name.
             riseFall (Real, float, or int): The rise/fall time for the marker pin.
+            mux (bool): If True, the marker drives the MARK pin shared by all
+                multiplexed markers instead of its own pin.
         """
         checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
         checkType("name", name, str)
+        checkType("mux", mux, bool)
         riseFall = parseReal("riseFall", riseFall)
         self.name = name
         self.markList = []
+        self.hiLevelMod = hiLevelMod
+        self.mux = mux
+        if mux:
+            #The shared pin carries the number of marks done so far. The 
+            #index of each mark is counted per sequence as only the sequence
+            #selected by the testbench parameters toggles the markers.
+            self.markIds = []
+            if isinstance(hiLevelMod.markCount, type(None)):
+                markerPin = hiLevelMod.electrical(name = "MARK",
+                                                  direction = "output")
+                hiLevelMod.markPin = markerPin
+                hiLevelMod.markRiseFall = str(riseFall)
+                hiLevelMod.markCount = hiLevelMod.var(Integer(0), 
+                                                      "_$markCount")
+                hiLevelMod.endAnalog(
+                    markerPin.vCont(transition(Real(hiLevelMod.markCount), 0, 
+                                               riseFall, riseFall))
+                )
+            assert hiLevelMod.markRiseFall == str(riseFall), \
+                   "multiplexed markers must have the same riseFall"
+            return
         self.markerPin = hiLevelMod.electrical(name = f"MARK_{name}",
                                                direction = "output")
         self.markSt = hiLevelMod.var(Bool(False), f"_$markSt_{name}")
@@ -178,9 +238,32 @@ class Marker():
             Mark: A Mark command representing the event mark.
         """
         checkType("name", name, str)
+        if self.mux:
+            return Mark(self.hiLevelMod.markCount.inc(), self, name)
         self.markList.append(name)
         return Mark(self.markSt.toggle())
 
+    #---------------------------------------------------------------------------
+    ## Add an event of a multiplexed marker. It is called when the sequence is
+    #  compiled, so the index is the position of the mark in the sequence. Do
+    #  not use it! Use Seq instead.
+    # 
+    #  @param self The object pointer.
+    #  @param name Name of the event.
+    #  @param index Number of marks of the sequence up to this one.
+    #
+    #---------------------------------------------------------------------------
+    def addMuxEvent(self, name, index):
+        """Add an event of a multiplexed marker. Do not use it! Use Seq 
+        instead.
+
+        Args:
+            name (str): The name of the event.
+            index (int): Number of marks of the sequence up to this one.
+        """
+        self.markList.append(name)
+        self.markIds.append(index)
+
     #---------------------------------------------------------------------------
     ## Force the internal variable low. 
     #
@@ -198,6 +281,7 @@ class Marker():
         Returns:
             Mark: A Mark command forcing the marker state to low.
         """
+        assert not self.mux, "low isn't supported by multiplexed markers"
         return Mark(self.markSt.eq(False))
 
     #---------------------------------------------------------------------------
@@ -217,6 +301,7 @@ class Marker():
         Returns:
             Mark: A Mark command forcing the marker state to high.
         """
+        assert not self.mux, "high isn't supported by multiplexed markers"
         return Mark(self.markSt.eq(True))
 
     #---------------------------------------------------------------------------
@@ -233,8 +318,15 @@ class Marker():
             dict: Keys are event names, and values are cadence equations.
         """
         ans = {}
+        if self.mux:
+            pin = self.hiLevelMod.resolve(self.hiLevelMod.markPin.getName())
+            for name, i in zip(self.markList, self.markIds):
+                ans[name] = (f'cross(getData("/{pin}" ?result "tran") '
+                             f'{i-0.5} 1 "rising" nil nil)')
+            return ans
+        pin = self.hiLevelMod.resolve(self.markerPin.getName())
         for i in range(0, len(self.markList)):
-            ans[self.markList[i]] = (f'cross(getData("/MARK_{self.name}" '
+            ans[self.markList[i]] = (f'cross(getData("/{pin}" '
                                      f'?result "tran") 0.5 {i+1} "either" '
                                      f'nil nil)')
         return ans
@@ -247,7 +339,7 @@ class Marker():
 #  allowing a test sequence to continue 
 #
 #-------------------------------------------------------------------------------
-class WaitSignal(Cmd):
+class WaitSignal(SeqCmd):
     """WaitSignal command class.
 
     This class is used to wait for a specific event before continuing a test sequence.
@@ -284,28 +376,6 @@ class WaitSignal(Cmd):
             Event: The event stored in this WaitSignal.
         """
         return self.evnt
-        
-    #---------------------------------------------------------------------------
-    ## Dummy method.
-    #  Raise exception when runned.
-    #
-    #  @param self The object pointer.
-    #
-    #---------------------------------------------------------------------------         
-    def __str__(self):
-        #TODO: Find a better way to fix this
-        raise Exception("Wait doesn't have string representation")
-
-    #---------------------------------------------------------------------------
-    ## Dummy method.
-    #  Raise exception when runned.
-    #
-    #  @param self The object pointer.
-    #
-    #---------------------------------------------------------------------------      
-    def getVA(self, padding):
-        #TODO: Find a better way to fix this
-        raise Exception("Wait can't be outside seq")
 
 
 #-------------------------------------------------------------------------------
@@ -315,7 +385,7 @@ class WaitSignal(Cmd):
 #  allowing a test sequence to continue.
 #
 #-------------------------------------------------------------------------------
-class WaitUs(Cmd):
+class WaitUs(SeqCmd):
     """WaitUs command class.
 
     This command waits for a specific delay (in microseconds) before continuing.
@@ -352,28 +422,215 @@ class WaitUs(Cmd):
             Real, float, or int: The delay.
         """
         return self.delay
-        
+
+
+#-------------------------------------------------------------------------------
+## Playback command class.
+# 
+#  This class of commands streams vectors from a data file during the 
+#  simulation. Each line of the file holds a delay in us followed by the values
+#  applied to the targets before the delay is waited for. Use the method 
+#  playback of the HiLevelMod to create it.
+#
+#-------------------------------------------------------------------------------
+class Playback(SeqCmd):
+    """Playback command class.
+
+    This command streams vectors from a data file during the simulation. Use
+    HiLevelMod.playback to create it.
+    """
+
+    #---------------------------------------------------------------------------
+    ## Construtor.
+    # 
+    #  @param self The object pointer.
+    #  @param fileName Name of the data file.
+    #  @param delay RealVar where the delay is read.
+    #  @param variables List of variables where the values are read.
+    #  @param cmds CmdList that applies the values read to the targets.
+    #
     #---------------------------------------------------------------------------
-    ## Dummy method.
-    #  Raise exception when runned.
+    def __init__(self, fileName, delay, variables, cmds):
+        """Initialize a Playback instance.
+
+        Args:
+            fileName (str): Name of the data file.
+            delay (RealVar): Variable where the delay is read.
+            variables (list): Variables where the values are read.
+            cmds (CmdList): Commands that apply the values to the targets.
+        """
+        checkType("fileName", fileName, str)
+        checkInstance("delay", delay, RealVar)
+        checkInstance("cmds", cmds, CmdList)
+        self.fileName = fileName
+        self.delay = delay
+        self.variables = variables
+        self.cmds = cmds
+        super(Playback, self).__init__("")
+
+    #---------------------------------------------------------------------------
+    ## Return the name of the data file.
     #
     #  @param self The object pointer.
+    #  @return string.
     #
-    #---------------------------------------------------------------------------       
-    def __str__(self):
-        #TODO: Find a better way to fix this
-        raise Exception("Wait doesn't have string representation")
+    #---------------------------------------------------------------------------
+    def getFileName(self):
+        """Return the name of the data file.
+
+        Returns:
+            str: The name of the data file.
+        """
+        return self.fileName
 
     #---------------------------------------------------------------------------
-    ## Dummy method.
-    #  Raise exception when runned.
+    ## Return the format of a line of the data file.
     #
     #  @param self The object pointer.
+    #  @return string.
     #
-    #---------------------------------------------------------------------------      
-    def getVA(self, padding):
-        #TODO: Find a better way to fix this
-        raise Exception("Wait can't be outside seq")
+    #---------------------------------------------------------------------------
+    def getFormat(self):
+        """Return the format of a line of the data file.
+
+        Returns:
+            str: The format used by $fscanf.
+        """
+        fmt = ["%e" if isinstance(var, RealVar) else "%d" 
+               for var in self.variables]
+        return " ".join(["%e"] + fmt)
+
+    #---------------------------------------------------------------------------
+    ## Return the variables read from each line of the data file.
+    #
+    #  @param self The object pointer.
+    #  @return list of variables. The delay is the first one.
+    #
+    #---------------------------------------------------------------------------
+    def getVariables(self):
+        """Return the variables read from each line of the data file.
+
+        Returns:
+            list: The variables. The delay is the first one.
+        """
+        return [self.delay] + self.variables
+
+    #---------------------------------------------------------------------------
+    ## Return the delay read from the data file.
+    #
+    #  @param self The object pointer.
+    #  @return RealVar.
+    #
+    #---------------------------------------------------------------------------
+    def getDelay(self):
+        """Return the delay read from the data file.
+
+        Returns:
+            RealVar: The delay in us.
+        """
+        return self.delay
+
+    #---------------------------------------------------------------------------
+    ## Return the commands that apply the values read to the targets.
+    #
+    #  @param self The object pointer.
+    #  @return CmdList.
+    #
+    #---------------------------------------------------------------------------
+    def getCmds(self):
+        """Return the commands that apply the values read to the targets.
+
+        Returns:
+            CmdList: The commands.
+        """
+        return self.cmds
+
+
+#-------------------------------------------------------------------------------
+## Subroutine of a sequence. Use the method subseq of the HiLevelMod to create 
+#  it and the Call command to run it inside a sequence. The body is compiled 
+#  once per sequence no matter how many times it is called.
+#
+#-------------------------------------------------------------------------------
+class Subseq():
+    """Subroutine of a sequence. Use HiLevelMod.subseq to create it."""
+
+    #---------------------------------------------------------------------------
+    ## Construtor.
+    # 
+    #  @param self The object pointer.
+    #  @param cmds CmdList with the body of the subroutine.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, cmds):
+        """Initialize a Subseq instance.
+
+        Args:
+            cmds (CmdList): Body of the subroutine.
+        """
+        checkInstance("cmds", cmds, CmdList)
+        self.cmds = cmds
+
+    #---------------------------------------------------------------------------
+    ## Return the body of the subroutine.
+    #
+    #  @param self The object pointer.
+    #  @return CmdList.
+    #
+    #---------------------------------------------------------------------------
+    def getCmds(self):
+        """Return the body of the subroutine.
+
+        Returns:
+            CmdList: The body.
+        """
+        return self.cmds
+
+
+#-------------------------------------------------------------------------------
+## Call command class.
+# 
+#  This class of commands runs a subroutine inside a sequence and continues 
+#  with the next command when the subroutine ends.
+#
+#-------------------------------------------------------------------------------
+class Call(SeqCmd):
+    """Call command class.
+
+    This command runs a subroutine (Subseq) inside a sequence.
+    """
+
+    #---------------------------------------------------------------------------
+    ## Construtor.
+    # 
+    #  @param self The object pointer.
+    #  @param subseq Subroutine to be called.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, subseq):
+        """Initialize a Call instance.
+
+        Args:
+            subseq (Subseq): The subroutine to be called.
+        """
+        checkInstance("subseq", subseq, Subseq)
+        self.subseq = subseq
+        super(Call, self).__init__("")
+
+    #---------------------------------------------------------------------------
+    ## Return the subroutine called.
+    #
+    #  @param self The object pointer.
+    #  @return Subseq.
+    #
+    #---------------------------------------------------------------------------
+    def getSubseq(self):
+        """Return the subroutine called.
+
+        Returns:
+            Subseq: The subroutine.
+        """
+        return self.subseq
 
 
 #-------------------------------------------------------------------------------
@@ -462,6 +719,53 @@ class Bus(list):
         super(Bus, self).append(item)
         
         
+#-------------------------------------------------------------------------------
+## SourceGen class.
+#  It holds the value, the rise and the fall times of a shared source bus. The
+#  value is filtered once and the result is fanned out to every bit.
+#
+#-------------------------------------------------------------------------------
+class SourceGen():
+    """Source generator shared by the bits of a source bus.
+
+    Use HiLevelMod.vdc or HiLevelMod.idc with shared = True instead.
+    """
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self The object pointer.
+    #  @param hiLeveMod Hi level model in which the analog command will be added.
+    #  @param name Name of the bus.
+    #  @param value Real expression holding the initial value.
+    #  @param rise Real expression holding the initial rise time.
+    #  @param fall Real expression holding the initial fall time.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, hiLevelMod, name, value, rise, fall):
+        """Initialize a SourceGen instance.
+
+        Args:
+            hiLevelMod (HiLevelMod): The high-level model.
+            name (str): Name of the bus.
+            value (Real, float, or int): The initial value.
+            rise (Real, float, or int): Initial rise time.
+            fall (Real, float, or int): Initial fall time.
+        """
+        checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
+        checkType("name", name, str)
+        value = parseReal("value", value)
+        rise = parseReal("rise", rise)
+        fall = parseReal("fall", fall)
+        self.value = hiLevelMod.var(value,   f"{name}_$value$")
+        self.rise  = hiLevelMod.var(rise,    f"{name}_$rise$")
+        self.fall  = hiLevelMod.var(fall,    f"{name}_$fall$")
+        self.ramp  = hiLevelMod.var(Real(0), f"{name}_$ramp$")
+        hiLevelMod.stepSources[str(self.value)] = (self.rise, self.fall)
+        hiLevelMod.endAnalog(
+            self.ramp.eq(transition(self.value, Real(0), self.rise, self.fall))
+        )
+        
+        
 #-------------------------------------------------------------------------------
 ## Vdc class. 
 #  Child of Electrical implementing aditional features in order to work as a 
@@ -483,9 +787,11 @@ class Vdc(Electrical):
     #  @param gnd Electrical representing the ground reference.
     #  @param rise Real expression holding the initial rise time.
     #  @param fall Real expression holding the initial fall time.
+    #  @param gen SourceGen shared by the bits of a bus. If given, value, rise
+    #         and fall are taken from it.
     #
     #---------------------------------------------------------------------------
-    def __init__(self, hiLevelMod, name, value, gnd, rise, fall):
+    def __init__(self, hiLevelMod, name, value, gnd, rise, fall, gen = None):
         """Initialize a Vdc instance.
 
         Args:
@@ -495,6 +801,8 @@ class Vdc(Electrical):
             gnd (Electrical or None): Ground reference signal.
             rise (Real, float, or int): Initial rise time.
             fall (Real, float, or int): Initial fall time.
+            gen (SourceGen, optional): Generator shared by the bits of a
+                bus.
         """
         checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
         if not (gnd is None):
@@ -504,11 +812,21 @@ class Vdc(Electrical):
         value = parseReal("value", value)
         rise = parseReal("rise", rise)
         fall = parseReal("fall", fall)
-        super(Vdc, self).__init__(name)
+        super(Vdc, self).__init__(hiLevelMod.ref(name))
         prefix = name.replace("[", "_$").replace("]", "$").replace(", ", "_")
-        self.volt = hiLevelMod.var(value, f"{prefix}_$value$")
-        self.rise = hiLevelMod.var(rise,  f"{prefix}_$rise$")
-        self.fall = hiLevelMod.var(fall,  f"{prefix}_$fall$")
+        self.hiLevelMod = hiLevelMod
+        if isinstance(gen, type(None)):
+            self.volt = hiLevelMod.var(value, f"{prefix}_$value$")
+            self.rise = hiLevelMod.var(rise,  f"{prefix}_$rise$")
+            self.fall = hiLevelMod.var(fall,  f"{prefix}_$fall$")
+            hiLevelMod.stepSources[str(self.volt)] = (self.rise, self.fall)
+            ramp = transition(self.volt, Real(0), self.rise, self.fall)
+        else:
+            checkInstance("gen", gen, SourceGen)
+            self.volt = gen.value
+            self.rise = gen.rise
+            self.fall = gen.fall
+            ramp = gen.ramp
         if gnd is None:
             out = self
         else:
@@ -516,9 +834,7 @@ class Vdc(Electrical):
         self.dv = out.v
         self.di = out.i
         hiLevelMod.endAnalog(
-            out.vCont(
-                transition(self.volt, Real(0), self.rise, self.fall)
-            )
+            out.vCont(ramp)
         ) 
     
     #---------------------------------------------------------------------------
@@ -562,10 +878,18 @@ class Vdc(Electrical):
             value (Real, float, or int): The new voltage value.
 
         Returns:
-            Cmd: A command to update the voltage.
+            Cmd or CmdList: A command to update the voltage. The ramp is 
+                tracked too if autoBoundStep is enabled.
         """
         checkReal("value", value)
-        return self.volt.eq(value)
+        if isinstance(self.hiLevelMod.autoBoundStep, type(None)):
+            return self.volt.eq(value)
+        return CmdList(
+            self.hiLevelMod.ramp(ternary(value > self.volt, 
+                                         self.rise, 
+                                         self.fall)),
+            self.volt.eq(value)
+        )
 
 
 #-------------------------------------------------------------------------------
@@ -613,7 +937,12 @@ class VdcBus(Bus):
         checkReal("rise", rise)
         checkReal("fall", fall)
         ans = CmdList()
+        done = set()
         for pin in self:
+            #The bits of a shared bus hold the same variables 
+            if str(pin.rise) in done:
+                continue
+            done.add(str(pin.rise))
             ans.append(pin.setRiseFall(rise, fall))
         return ans
 
@@ -635,7 +964,12 @@ class VdcBus(Bus):
         """
         checkReal("value", value)
         ans = CmdList()
+        done = set()
         for pin in self:
+            #The bits of a shared bus hold the same variables 
+            if str(pin.volt) in done:
+                continue
+            done.add(str(pin.volt))
             ans.append(pin.applyV(value))
         return ans
         
@@ -661,9 +995,11 @@ class Idc(Electrical):
     #  @param gnd Electrical representing the ground reference.
     #  @param rise Real expression holding the initial rise time.
     #  @param fall Real expression holding the initial fall time.
+    #  @param gen SourceGen shared by the bits of a bus. If given, value, rise
+    #         and fall are taken from it.
     #
     #---------------------------------------------------------------------------
-    def __init__(self, hiLevelMod, name, value, gnd, rise, fall):
+    def __init__(self, hiLevelMod, name, value, gnd, rise, fall, gen = None):
         """Initialize an Idc instance.
 
         Args:
@@ -673,6 +1009,8 @@ class Idc(Electrical):
             gnd (Electrical or None): Ground reference signal.
             rise (Real, float, or int): Initial rise time.
             fall (Real, float, or int): Initial fall time.
+            gen (SourceGen, optional): Generator shared by the bits of a
+                bus.
         """
         checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
         checkType("name", name, str)
@@ -682,11 +1020,21 @@ class Idc(Electrical):
             checkNotInstance("gnd", gnd, Branch)
         rise = parseReal("rise", rise)
         fall = parseReal("fall", fall)
-        super(Idc, self).__init__(name)
+        super(Idc, self).__init__(hiLevelMod.ref(name))
         prefix = name.replace("[", "_$").replace("]", "$").replace(", ", "_")
-        self.cur  = hiLevelMod.var(value, f"{prefix}_$value$")
-        self.rise = hiLevelMod.var(rise,  f"{prefix}_$rise$")
-        self.fall = hiLevelMod.var(fall,  f"{prefix}_$fall$")
+        self.hiLevelMod = hiLevelMod
+        if isinstance(gen, type(None)):
+            self.cur  = hiLevelMod.var(value, f"{prefix}_$value$")
+            self.rise = hiLevelMod.var(rise,  f"{prefix}_$rise$")
+            self.fall = hiLevelMod.var(fall,  f"{prefix}_$fall$")
+            hiLevelMod.stepSources[str(self.cur)] = (self.rise, self.fall)
+            ramp = transition(self.cur, Real(0), self.rise, self.fall)
+        else:
+            checkInstance("gen", gen, SourceGen)
+            self.cur  = gen.value
+            self.rise = gen.rise
+            self.fall = gen.fall
+            ramp = gen.ramp
         if gnd == None:
             out = self
         else:
@@ -694,9 +1042,7 @@ class Idc(Electrical):
         self.dv = out.v
         self.di = out.i
         hiLevelMod.endAnalog(
-            out.iCont(
-                transition(self.cur, Real(0), self.rise, self.fall)
-            )
+            out.iCont(ramp)
         ) 
     
     #---------------------------------------------------------------------------
@@ -740,10 +1086,18 @@ class Idc(Electrical):
             value (Real, float, or int): The new current value.
 
         Returns:
-            Cmd: A command to update the current.
+            Cmd or CmdList: A command to update the current. The ramp is 
+                tracked too if autoBoundStep is enabled.
         """
         checkReal("value", value)
-        return self.cur.eq(value)
+        if isinstance(self.hiLevelMod.autoBoundStep, type(None)):
+            return self.cur.eq(value)
+        return CmdList(
+            self.hiLevelMod.ramp(ternary(value > self.cur, 
+                                         self.rise, 
+                                         self.fall)),
+            self.cur.eq(value)
+        )
 
 
 #-------------------------------------------------------------------------------
@@ -792,7 +1146,12 @@ class IdcBus(Bus):
         checkReal("rise", rise)
         checkReal("fall", fall)
         ans = CmdList()
+        done = set()
         for pin in self:
+            #The bits of a shared bus hold the same variables 
+            if str(pin.rise) in done:
+                continue
+            done.add(str(pin.rise))
             ans.append(pin.setRiseFall(rise, fall))
         return ans
 
@@ -814,7 +1173,12 @@ class IdcBus(Bus):
         """
         checkReal("value", value)
         ans = CmdList()
+        done = set()
         for pin in self:
+            #The bits of a shared bus hold the same variables 
+            if str(pin.cur) in done:
+                continue
+            done.add(str(pin.cur))
             ans.append(pin.applyI(value))
         return ans
         
@@ -865,8 +1229,9 @@ class Smu(Electrical):
         if not (gnd is None):
             checkType("gnd", gnd, Electrical)
             checkNotInstance("gnd", gnd, Branch)
-        super(Smu, self).__init__(name)
+        super(Smu, self).__init__(hiLevelMod.ref(name))
         prefix = name.replace("[", "_$").replace("]", "$").replace(", ", "_")
+        self.hiLevelMod = hiLevelMod
         self.volt     = hiLevelMod.var(volt, f"{prefix}_$volt$")
         self.maxCur   = hiLevelMod.var(maxCur, f"{prefix}_$maxCur")
         self.minCur   = hiLevelMod.var(minCur, f"{prefix}_$minCur$")
@@ -954,6 +1319,7 @@ class Smu(Electrical):
             self.vDelay.eq(0),
             self.iDelay.eq(100e-9),
             self.rDelay.eq(100e-9),
+            self.hiLevelMod.ramp(100e-9 + self.riseFall)
         )
 
     #---------------------------------------------------------------------------
@@ -987,6 +1353,7 @@ class Smu(Electrical):
             self.vDelay.eq(100e-9),
             self.iDelay.eq(0),
             self.rDelay.eq(0),
+            self.hiLevelMod.ramp(100e-9 + self.riseFall)
         )
 
     #---------------------------------------------------------------------------
@@ -1014,52 +1381,277 @@ class Smu(Electrical):
             self.vDelay.eq(100e-9),
             self.iDelay.eq(0),
             self.rDelay.eq(0),
+            self.hiLevelMod.ramp(100e-9 + self.riseFall)
         )
 
 
 #-------------------------------------------------------------------------------
-## SmuBus class. Child of a list. 
-#  It implements additional methods to deal with read and write operations to 
-#  a bus. It also overrides the slice method, so it works similar to a slice 
-#  of a bus in verilog.
+## SmuFast class. Child of Smu with a lighter model. The four parameters of 
+#  the model share a single transition filter and only the contributions of 
+#  the active mode are evaluated once the transition is over.
 #
 #-------------------------------------------------------------------------------
-class SmuBus(Bus):
-    """SmuBus class.
+class SmuFast(Smu):
+    """SmuFast class.
 
-    A bus of Smu elements with additional methods for handling SMU operations.
+    A lighter Smu. The parameters of the model share a single linear ramp 
+    restarted at every update and only the contributions of the active mode
+    are evaluated once the ramp is over. The delays between the voltage and 
+    the current limits of the Smu aren't modeled.
     """
 
-    #---------------------------------------------------------------------------
-    ## Constructor
-    #  @param self The object pointer.
-    #
-    #---------------------------------------------------------------------------
-    def __init__(self):
-        """Initialize a SmuBus instance."""
-        super(SmuBus, self).__init__(Smu, SmuBus)
-      
+    # Modes of the model
+    GENERAL = 0
+    VOLTAGE = 1
+    CURRENT = 2
+    RESISTANCE = 3
 
     #---------------------------------------------------------------------------
-    ## Configure the smu as voltage limited current source and apply the desired
-    # current. Positive currents are sink current sources. The limit corresponds 
-    # to the uppper voltage when value < 0 and to the lower voltage when value > 
-    # 0.
+    ## Construtor.
     #  @param self The object pointer.
-    #  @param value Real expression holding the current to be applied.
-    #  @param limit Real expression holding the voltage limit.
-    #  @return The commands to configure the Smu in current mode.
-    # 
+    #  @param hiLeveMod Hi level model in which the analog command will be added.
+    #  @param name Name of the smu electrical pin.
+    #  @param volt Real expression holding the initial voltage.
+    #  @param minCur Real expression holding the initial minimum current.
+    #  @param maxCur Real expression holding the initial maximum current.
+    #  @param res Real expression holding the resistance.
+    #  @param gnd Electrical representing the ground reference.
+    #
     #---------------------------------------------------------------------------
-    def applyI(self, value, limit):
-        """Apply a current command to all SMU elements in the bus.
+    def __init__(self, hiLevelMod, name, volt, minCur, maxCur, res, gnd): 
+        """Initialize a SmuFast instance.
 
         Args:
-            value (Real, float, or int): The current value.
-            limit (Real, float, or int): The voltage limit.
-
-        Returns:
-            CmdList: A list of commands to update each SMU in current mode.
+            hiLeveMod (HiLevelMod): High-level model where analog commands are added.
+            name (str): Name of the SMU pin.
+            volt (Real, float, or int): Initial voltage.
+            minCur (Real, float, or int): Initial minimum current.
+            maxCur (Real, float, or int): Initial maximum current.
+            res (Real, float, or int): Resistance value.
+            gnd (Electrical or None): Ground reference signal.
+        """
+        checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
+        checkType("name", name, str)
+        volt = parseReal("volt", volt)
+        minCur = parseReal("minCur", minCur)
+        maxCur = parseReal("maxCur", maxCur)
+        res = parseReal("res", res)
+        if not (gnd is None):
+            checkType("gnd", gnd, Electrical)
+            checkNotInstance("gnd", gnd, Branch)
+        Electrical.__init__(self, hiLevelMod.ref(name))
+        prefix = name.replace("[", "_$").replace("]", "$").replace(", ", "_")
+        self.hiLevelMod = hiLevelMod
+        
+        #The current is amp*tanh(50*(V - volt)) + offset + V*cond. Each 
+        #parameter moves from its old value to its new value following the 
+        #shared ramp, which ends at rampEnd. The parameters are only blended
+        #while the weight is lower than 1, and only the terms of the mode are
+        #evaluated otherwise. rampTimer breaks the simulation at the end of 
+        #the ramp, it is a copy of rampEnd as the scheduler resets the fire 
+        #times.
+        self.mode      = hiLevelMod.var(Integer(self.GENERAL), 
+                                        f"{prefix}_$mode$")
+        self.riseFall  = hiLevelMod.var(100e-9, f"{prefix}_$riseFall$")
+        self.rampEnd   = hiLevelMod.var(0.0, f"{prefix}_$rampEnd$")
+        self.rampTimer = hiLevelMod.var(0.0, f"{prefix}_$rampTimer$")
+        self.weight    = hiLevelMod.var(1.0, f"{prefix}_$weight$")
+        self.ramp      = ternary(abstime < self.rampEnd, 
+                                 1 - (self.rampEnd - abstime)/self.riseFall,
+                                 1.0)
+        self.params    = []
+        for param, value in [("amp", 0.5*(maxCur - minCur)), 
+                             ("volt", volt), 
+                             ("offset", 0.5*(maxCur + minCur)), 
+                             ("cond", 1/res)]:
+            self.params.append((
+                hiLevelMod.var(value, f"{prefix}_${param}$"),
+                hiLevelMod.var(value, f"{prefix}_${param}Old$"),
+                hiLevelMod.var(value, f"{prefix}_${param}New$")
+            ))
+        amp, volt, offset, cond = [param[0] for param in self.params]
+        if gnd == None:
+            out = self
+        else:
+            out = Branch(self, gnd)
+        self.dv = out.v
+        self.di = out.i
+        blends = CmdList(
+            self.weight.eq(self.ramp)
+        )
+        for param, old, new in self.params:
+            blends.append(param.eq(old + (new - old)*self.weight))
+        limiter = amp*tanh(50*(out.v - volt))
+        hiLevelMod.analog(
+            hiLevelMod.timerEvent(self.rampTimer)
+        )
+        hiLevelMod.endAnalog(
+            If(self.weight < 1)(
+                blends,
+                out.iCont(limiter + offset + out.v*cond)
+            ).Else(
+                Case(self.mode)(
+                    (self.VOLTAGE, out.iCont(limiter + out.v*cond)),
+                    (self.RESISTANCE, out.iCont(out.v*cond)),
+                    (None, out.iCont(limiter + offset + out.v*cond))
+                )
+            ),
+            out.iCont(1e-12*ddt(out.v))
+        ) 
+    
+    #---------------------------------------------------------------------------
+    ## Return the commands that start the ramp to new parameters. The ramp 
+    #  starts from the current values, so updates done while ramping or in 
+    #  the same state are ramped too.
+    #  @param self The object pointer.
+    #  @param mode mode of the model.
+    #  @param *values new amplitude, voltage, offset and conductance.
+    #  @return CmdList.
+    #
+    #---------------------------------------------------------------------------
+    def setParams(self, mode, *values):
+        """Return the commands that start the ramp to new parameters.
+
+        The ramp starts from the current values, so updates done while 
+        ramping or in the same state are ramped too.
+
+        Args:
+            mode (int): Mode of the model.
+            *values: New amplitude, voltage, offset and conductance.
+
+        Returns:
+            CmdList: A list of commands to update the model.
+        """
+        cmds = CmdList(self.weight.eq(self.ramp))
+        for (param, old, new), value in zip(self.params, values):
+            cmds.append(old.eq(old + (new - old)*self.weight))
+            cmds.append(new.eq(value))
+        cmds.append(self.rampEnd.eq(abstime + self.riseFall))
+        cmds.append(self.rampTimer.eq(self.rampEnd))
+        cmds.append(self.weight.eq(0.0))
+        cmds.append(self.mode.eq(mode))
+        cmds.append(self.hiLevelMod.ramp(self.riseFall))
+        return cmds
+
+    #---------------------------------------------------------------------------
+    ## Configure the smu as current limited voltage source and apply the desired
+    #  voltage.
+    #  @param self The object pointer.
+    #  @param value Real expression holding the voltage to be applied.
+    #  @param limit Real expression holding the current limit.
+    #  @return The commands to configure the Smu in voltage mode.
+    #
+    #---------------------------------------------------------------------------
+    def applyV(self, value, limit):
+        """Configure the SMU as a current-limited voltage source and apply a voltage.
+
+        Args:
+            value (Real, float, or int): Voltage to be applied.
+            limit (Real, float, or int): Current limit.
+
+        Returns:
+            CmdList: A list of commands to configure the SMU in voltage mode.
+        """
+        checkReal("value", value)
+        checkReal("limit", limit)
+        return self.setParams(self.VOLTAGE, 
+                              abs(limit), 
+                              value, 
+                              0.0, 
+                              1e-4*(abs(limit) + 1e-9))
+
+    #---------------------------------------------------------------------------
+    ## Configure the smu as voltage limited current source and apply the desired
+    # current. Positive currents are sink current sources. The limit corresponds 
+    # to the upper voltage when value < 0 and to the lower voltage when value > 
+    # 0.
+    #  @param self The object pointer.
+    #  @param value Real expression holding the current to be applied.
+    #  @param limit Real expression holding the voltage limit.
+    #  @return The commands to configure the Smu in current mode.
+    # 
+    #---------------------------------------------------------------------------
+    def applyI(self, value, limit):
+        """Configure the SMU as a voltage-limited current source and apply a current.
+
+        Args:
+            value (Real, float, or int): Current to be applied.
+            limit (Real, float, or int): Voltage limit.
+
+        Returns:
+            CmdList: A list of commands to configure the SMU in current mode.
+        """
+        checkReal("value", value)
+        checkReal("limit", limit)
+        return self.setParams(self.CURRENT, 
+                              0.5*abs(value), 
+                              limit, 
+                              0.5*value, 
+                              1e-4*(abs(value) + 1e-9))
+
+    #---------------------------------------------------------------------------
+    ## Configure the resistive load.
+    #  @param self The object pointer.
+    #  @param value Real expression holding the value of the resistor.
+    #  @return The commands to configure the Smu in resistance mode.
+    # 
+    #---------------------------------------------------------------------------
+    def applyR(self, value):
+        """Configure the SMU as a resistive load.
+
+        Args:
+            value (Real, float, or int): The resistor value.
+
+        Returns:
+            CmdList: A list of commands to configure the SMU in resistance mode.
+        """
+        checkReal("value", value)
+        return self.setParams(self.RESISTANCE, 0.0, 0.0, 0.0, 1/value)
+
+
+#-------------------------------------------------------------------------------
+## SmuBus class. Child of a list. 
+#  It implements additional methods to deal with read and write operations to 
+#  a bus. It also overrides the slice method, so it works similar to a slice 
+#  of a bus in verilog.
+#
+#-------------------------------------------------------------------------------
+class SmuBus(Bus):
+    """SmuBus class.
+
+    A bus of Smu elements with additional methods for handling SMU operations.
+    """
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self The object pointer.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self):
+        """Initialize a SmuBus instance."""
+        super(SmuBus, self).__init__(Smu, SmuBus)
+      
+
+    #---------------------------------------------------------------------------
+    ## Configure the smu as voltage limited current source and apply the desired
+    # current. Positive currents are sink current sources. The limit corresponds 
+    # to the uppper voltage when value < 0 and to the lower voltage when value > 
+    # 0.
+    #  @param self The object pointer.
+    #  @param value Real expression holding the current to be applied.
+    #  @param limit Real expression holding the voltage limit.
+    #  @return The commands to configure the Smu in current mode.
+    # 
+    #---------------------------------------------------------------------------
+    def applyI(self, value, limit):
+        """Apply a current command to all SMU elements in the bus.
+
+        Args:
+            value (Real, float, or int): The current value.
+            limit (Real, float, or int): The voltage limit.
+
+        Returns:
+            CmdList: A list of commands to update each SMU in current mode.
         """
         checkReal("value", value)
         checkReal("limit", limit)
@@ -1145,10 +1737,13 @@ class DigOut(Electrical):
     #  @param delay Real expression holding the initial delay time.
     #  @param rise Real expression holding the initial rise time.
     #  @param fall Real expression holding the initial fall time.
+    #  @param model default (smooth driver) or transition (plain transition 
+    #         driver with the series resistance in the same contribution).
+    #         The rise and fall times are the 5%-95% times in both models.
     #
     #---------------------------------------------------------------------------
     def __init__(self, hiLevelMod, name, state, domain, inCap, serRes, gnd, 
-                 delay, rise, fall): 
+                 delay, rise, fall, model = "default"): 
         """Initialize a DigOut instance.
 
         Args:
@@ -1162,10 +1757,16 @@ class DigOut(Electrical):
             delay (Real, float, or int): Initial delay.
             rise (Real, float, or int): Initial rise time.
             fall (Real, float, or int): Initial fall time.
+            model (str): default (smooth driver) or transition (plain 
+                transition driver with the series resistance in the same 
+                contribution). The rise and fall times are the 5%-95% times
+                in both models.
         """
         checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
         checkType("name", name, str)
         checkInstance("domain", domain, Electrical)
+        assert model in ("default", "transition"), \
+               "model must be default or transition"
         state = parseBool("state", state)
         serRes = parseReal("serRes", serRes)
         if not (gnd is None):
@@ -1174,7 +1775,7 @@ class DigOut(Electrical):
         delay = parseReal("delay", delay) 
         rise = parseReal("rise", rise)
         fall = parseReal("fall", fall)
-        super(DigOut, self).__init__(name)
+        super(DigOut, self).__init__(hiLevelMod.ref(name))
         prefix = name.replace("[", "_$").replace("]", "$").replace(", ", "_")
         self.st = hiLevelMod.var(state, f"{prefix}_$state$")
         self.serRes = hiLevelMod.var(serRes, f"{prefix}_$serRes$")
@@ -1190,6 +1791,20 @@ class DigOut(Electrical):
         self.dv = out.v
         self.di = out.i
         self.diffHalfDomain = self.dv - dm.v/2
+        if model == "transition":
+            #rise and fall are the 5%-95% times as in smooth. The linear ramp
+            #takes 0.9 of its length between these levels.
+            hiLevelMod.endAnalog(
+                out.vCont(
+                    dm.v*transition(
+                        ternary(self.st, 1.0, 0.0), 
+                        self.delay, 
+                        self.rise/0.9, 
+                        self.fall/0.9
+                    ) + out.i*self.serRes
+                )
+            )
+            return
         hiLevelMod.endAnalog(
             out.vCont(
                 dm.v*smooth(
@@ -1306,6 +1921,9 @@ class DigIn(Electrical):
     A subclass of Electrical representing a digital input pin.
     """
 
+    # Variable holding the state updated by cross events (see cache)
+    inSt = None
+
     #---------------------------------------------------------------------------
     ## Constructor
     #  @param self The object pointer.
@@ -1345,10 +1963,11 @@ class DigIn(Electrical):
         if not (gnd is None):
             checkType("gnd", gnd, Electrical)
             checkNotInstance("gnd", gnd, Branch)
-        super(DigIn, self).__init__(name)
+        super(DigIn, self).__init__(hiLevelMod.ref(name))
         self.domain = domain
         self.gnd = gnd
         prefix = name.replace("[", "_$").replace("]", "$").replace(", ", "_")
+        self.prefix = prefix
         self.inCap = hiLevelMod.var(inCap, f"{prefix}_$inCap$")
         if self.gnd is None:
             out = self
@@ -1375,8 +1994,50 @@ class DigIn(Electrical):
         Returns:
             Bool: An expression indicating whether the digital input is high.
         """
+        if not isinstance(self.inSt, type(None)):
+            return self.inSt
         return self.diffHalfDomain > 0
 
+    #---------------------------------------------------------------------------
+    ## Hold the state of the digital input in a variable updated by cross 
+    #  events, so reading it doesn't evaluate the comparator.
+    #  @param self The object pointer.
+    #  @param hiLeveMod Hi level model in which the events will be added.
+    #  @param onRise commands run when the input rises.
+    #  @param onFall commands run when the input falls.
+    #
+    #---------------------------------------------------------------------------   
+    def cache(self, hiLevelMod, onRise = None, onFall = None):
+        """Hold the state in a variable updated by cross events.
+
+        Args:
+            hiLevelMod (HiLevelMod): The high-level model.
+            onRise (Cmd, optional): Commands run when the input rises.
+            onFall (Cmd, optional): Commands run when the input falls.
+        """
+        checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
+        onRise = CmdList() if isinstance(onRise, type(None)) else onRise
+        onFall = CmdList() if isinstance(onFall, type(None)) else onFall
+        assert isinstance(self.inSt, type(None)), "Input is already cached"
+        self.inSt = hiLevelMod.var(Bool(False), f"{self.prefix}_$in$")
+        hiLevelMod.dcCmdList.append(
+            self.inSt.eq(self.diffHalfDomain > 0)
+        )
+        hiLevelMod.beginningAnalog(
+            At(Cross(self.diffHalfDomain, "rising"))(
+                If(~self.inSt)(
+                    self.inSt.eq(True),
+                    onRise
+                )
+            ),
+            At(Cross(self.diffHalfDomain, "falling"))(
+                If(self.inSt)(
+                    self.inSt.eq(False),
+                    onFall
+                )
+            )
+        )
+
 
 #-------------------------------------------------------------------------------
 ## DigInOut class. Child of Electrical implementing additional features in order 
@@ -1438,8 +2099,9 @@ class DigInOut(DigIn, DigOut):
         delay = parseReal("delay", delay)     
         rise = parseReal("rise", rise)
         fall = parseReal("fall", fall)
-        super(DigOut, self).__init__(name)
+        super(DigOut, self).__init__(hiLevelMod.ref(name))
         prefix = name.replace("[", "_$").replace("]", "$").replace(", ", "_")
+        self.prefix = prefix
         self.st = hiLevelMod.var(state, f"{prefix}_$state$")
         self.serRes = hiLevelMod.var(serRes, f"{prefix}_$serRes$")
         self.inCap = hiLevelMod.var(inCap, f"{prefix}_$inCap$")
@@ -1630,6 +2292,9 @@ class DigBusIn(Bus):
     similar to a Verilog bus.
     """
 
+    # Variable holding the value updated by cross events (see cache)
+    value = None
+
     #---------------------------------------------------------------------------
     ## Constructor
     #  @param self The object pointer.
@@ -1650,6 +2315,12 @@ class DigBusIn(Bus):
         assert len(self) <= 32, "Can't read a bus wider than 32 bit"
         assert len(self) <= 31 or signed, \
                "Can't read a bus wider than 31 bit as unsigned"
+        if not isinstance(self.value, type(None)):
+            if signed and 1 < len(self) < 32:
+                return ternary(self.value >= 1 << (len(self) - 1),
+                               self.value - (1 << len(self)),
+                               self.value)
+            return self.value
         ans = Integer(self[0].read())
         i = 2
         for j in range(1, len(self) - 1):
@@ -1662,6 +2333,38 @@ class DigBusIn(Bus):
                 ans = ans + Integer(self[len(self)-1].read())*i
         return ans        
 
+    #---------------------------------------------------------------------------
+    ## Hold the value of the bus in a variable updated by the cross events of 
+    #  each bit, so reading it doesn't evaluate the comparators.
+    #  @param self The object pointer.
+    #  @param hiLeveMod Hi level model in which the events will be added.
+    #
+    #---------------------------------------------------------------------------   
+    def cache(self, hiLevelMod):
+        """Hold the value in a variable updated by the cross events of each
+        bit.
+
+        Args:
+            hiLevelMod (HiLevelMod): The high-level model.
+        """
+        checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
+        assert len(self) <= 32, "Can't cache a bus wider than 32 bit"
+        prefix = self[0].prefix.rpartition("_$")[0]
+        self.value = hiLevelMod.var(Integer(0), f"{prefix}_$value$")
+        
+        #The msb of a 32 bit bus is the sign bit
+        for i in range(len(self)):
+            weight = -(1 << i) if i == 31 else 1 << i
+            self[i].cache(hiLevelMod, 
+                self.value.eq(self.value + weight),
+                self.value.eq(self.value - weight)
+            )
+        ans = Integer(self[0].read())
+        for i in range(1, len(self)):
+            weight = -(1 << i) if i == 31 else 1 << i
+            ans = ans + Integer(self[i].read())*weight
+        hiLevelMod.dcCmdList.append(self.value.eq(ans))
+
 
 #-------------------------------------------------------------------------------
 ## DigBusInOut class. Child of a list. It implements aditional methods to deal 
@@ -1742,9 +2445,13 @@ class Sw():
     #         conductance
     #  @param fall Real expression representing the fall time for changes in the 
     #         conductance
+    #  @param model default (transition filter) or settle (linear ramp computed
+    #         from the time of the last change. The conductance is constant 
+    #         once the ramp is done).
     #
     #---------------------------------------------------------------------------
-    def __init__(self, hiLevelMod, pin1, pin2, cond, rise, fall):
+    def __init__(self, hiLevelMod, pin1, pin2, cond, rise, fall, 
+                 model = "default"):
         """Initialize a Sw instance representing a switch between two nodes.
 
         Args:
@@ -1754,10 +2461,15 @@ class Sw():
             cond (Real, float, or int): Initial conductance.
             rise (Real, float, or int): Rise time for conductance changes.
             fall (Real, float, or int): Fall time for conductance changes.
+            model (str): default (transition filter) or settle (linear ramp
+                computed from the time of the last change. The conductance 
+                is constant once the ramp is done).
         """
         checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
         checkInstance("pin1", pin1, Electrical)
         checkInstance("pin2", pin2, Electrical)
+        assert model in ("default", "settle"), \
+               "model must be default or settle"
         cond = parseReal("cond", cond)
         rise = parseReal("rise", rise)
         fall = parseReal("fall", fall)
@@ -1766,7 +2478,35 @@ class Sw():
         self.cond = hiLevelMod.var(cond, f"{prefix}_$cond$")
         self.rise = hiLevelMod.var(rise, f"{prefix}_$rise$")
         self.fall = hiLevelMod.var(fall, f"{prefix}_$fall$")
+        hiLevelMod.stepSources[str(self.cond)] = (self.rise, self.fall)
+        self.hiLevelMod = hiLevelMod
         self.branch = Branch(pin1, pin2)
+        self.model = model
+        if model == "settle":
+            #The ramp goes from condOld to cond and ends at settle. Nothing 
+            #but the contribution is evaluated once it is done. settleTimer 
+            #is a copy of settle as the scheduler resets the fire times.
+            self.condOld = hiLevelMod.var(cond, f"{prefix}_$condOld$")
+            self.settle = hiLevelMod.var(Real(0), f"{prefix}_$settle$")
+            self.settleTimer = hiLevelMod.var(Real(0), 
+                                              f"{prefix}_$settleTimer$")
+            self.length = hiLevelMod.var(Real(0), f"{prefix}_$length$")
+            self.isOn = hiLevelMod.var(Bool(False), f"{prefix}_$isOn$")
+            self.actual = ternary(
+                abstime < self.settle,
+                self.cond + (self.condOld - self.cond)*
+                (self.settle - abstime)/self.length,
+                self.cond
+            )
+            hiLevelMod.dcCmdList.append(self.isOn.eq(self.cond > 0))
+            hiLevelMod.analog(
+                hiLevelMod.timerEvent(self.settleTimer, 
+                                      self.isOn.eq(self.cond > 0))
+            )
+            hiLevelMod.endAnalog(
+                self.branch.iCont(self.branch.v*self.actual)
+            )
+            return
         hiLevelMod.endAnalog(
             self.branch.iCont(
                 self.branch.v*transition(
@@ -1817,11 +2557,156 @@ class Sw():
             cond (Real, float, or int): The new conductance.
 
         Returns:
-            Cmd: A command to update the conductance.
+            Cmd or CmdList: A command to update the conductance, a list of 
+                commands in the settle model.
         """
         checkReal("cond", cond)
+        if self.model == "settle":
+            return CmdList(
+                self.condOld.eq(self.actual),
+                self.length.eq(ternary(cond > self.cond, self.rise, self.fall)),
+                self.settle.eq(abstime + self.length),
+                self.settleTimer.eq(self.settle),
+                self.cond.eq(cond)
+            )
         return self.cond.eq(cond)
 
+    #---------------------------------------------------------------------------
+    ## Return the sequence commands that wait until the conductance reaches 
+    #  the value of the last change. Nothing is waited if it is already 
+    #  reached. The isOn variable holds whether it is greater than zero, it 
+    #  is updated by the commands as the sequence runs before the timer of 
+    #  the switch. Only available in the settle model.
+    #  @param self The object pointer.
+    #  @return CmdList.
+    #
+    #---------------------------------------------------------------------------
+    def settled(self):
+        """Return the sequence commands that wait until the conductance 
+        reaches the value of the last change.
+
+        Nothing is waited if it is already reached. The isOn variable holds
+        whether it is greater than zero, it is updated by the commands as the
+        sequence runs before the timer of the switch. Only available in the
+        settle model.
+
+        Returns:
+            CmdList: The commands to be added to a sequence.
+        """
+        assert self.model == "settle", "settled requires the settle model"
+        if self.hiLevelMod.scheduler:
+            #The wait of the sequence is run by the shared timer
+            wait = WaitUs(1e6*(self.settle - abstime))
+        else:
+            wait = WaitSignal(Timer(self.settle))
+        return CmdList(
+            If(abstime < self.settle)(
+                wait
+            ),
+            self.isOn.eq(self.cond > 0)
+        )
+
+
+#-------------------------------------------------------------------------------
+## Clock generator shared by the clocks running at the same frequency. It is 
+#  driven by a periodic timer that runs while at least one of its clocks is on,
+#  so the clocks are in phase and the simulator has a single breakpoint per 
+#  edge.
+# 
+#-------------------------------------------------------------------------------
+class ClockGen():
+    """Clock generator shared by the clocks running at the same frequency.
+
+    Use HiLevelMod.clock with shared = True instead.
+    """
+    
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self The object pointer.
+    #  @param hiLeveMod Hi level model in which the analog command will be added.
+    #  @param frequency frequency of the clock generator.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, hiLevelMod, frequency):
+        """Initialize a ClockGen instance.
+
+        Args:
+            hiLevelMod (HiLevelMod): The high-level model.
+            frequency (float or int): The clock frequency.
+        """
+        checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
+        assert type(frequency) in (int, float) and frequency > 0, \
+               "frequency of a shared clock must be a positive int or float"
+        self.id = len(hiLevelMod.clockGens) + 1
+        self.never = hiLevelMod.never
+        self.halfPeriod = 0.5/frequency
+        self.clocks = []
+        self.members = CmdList()
+        prefix = f"clkGen{self.id}"
+        self.start = hiLevelMod.var(Real(self.never), f"{prefix}_$start$")
+        self.level = hiLevelMod.var(Bool(0), f"{prefix}_$level$")
+        self.busy = hiLevelMod.var(Bool(0), f"{prefix}_$busy$")
+        hiLevelMod.analog(
+            hiLevelMod.timerEvent(self.start,
+                self.level.toggle(),
+                self.busy.eq(False),
+                self.members,
+                If(~self.busy)(
+                    self.start.eq(self.never)
+                ),
+                period = self.halfPeriod
+            )
+        )
+
+    #---------------------------------------------------------------------------
+    ## Turn a clock on. The generator is started if it is stopped. Otherwise 
+    #  the clock is held low until the next rising edge of the generator, so 
+    #  it is in phase with the other clocks and its first pulse isn't cut 
+    #  short.
+    #  @param self The object pointer.
+    #  @param clock Clock to be turned on.
+    #  @return CmdList.
+    #
+    #---------------------------------------------------------------------------
+    def on(self, clock):
+        """Turn a clock on.
+
+        The generator is started if it is stopped. Otherwise the clock is 
+        held low until the next rising edge of the generator, so it is in 
+        phase with the other clocks and its first pulse isn't cut short.
+
+        Args:
+            clock (Clock): The clock to be turned on.
+
+        Returns:
+            CmdList: A list of commands to start the clock.
+        """
+        checkInstance("clock", clock, Clock)
+        if clock not in self.clocks:
+            self.clocks.append(clock)
+            self.members.append(
+                If(clock.gen == self.id)(
+                    If(clock.isOn)(
+                        clock.pin.write(self.level),
+                        self.busy.eq(True)
+                    ).Else(
+                        clock.pin.write(False),
+                        clock.gen.eq(0)
+                    )
+                )
+            )
+        stopped = self.start >= self.never
+        running = clock.isOn & (clock.gen == self.id) 
+        return CmdList(
+            clock.pin.write(stopped | (running & self.level)),
+            self.level.eq(self.level | stopped),
+            self.start.eq(ternary(stopped, 
+                                  abstime + self.halfPeriod, 
+                                  self.start)),
+            clock.isOn.eq(True),
+            clock.gen.eq(self.id)
+        )
+
 
 #-------------------------------------------------------------------------------
 ## Clock class.
@@ -1838,33 +2723,43 @@ class Clock():
     #  @param self The object pointer.
     #  @param hiLeveMod Hi level model in which the analog command will be added.
     #  @param pin DigIn or DigInOut
+    #  @param shared the clock is driven by the generator shared by all clocks
+    #         running at the same frequency if True.
     #
     #---------------------------------------------------------------------------
-    def __init__(self, hiLevelMod, pin):
+    def __init__(self, hiLevelMod, pin, shared = False):
         """Initialize a Clock instance.
 
         Args:
             hiLevelMod (HiLevelMod): The high-level model.
             pin (DigOut): A digital output pin used for the clock signal.
+            shared (bool): The clock is driven by the generator (ClockGen) 
+                shared by all clocks running at the same frequency if True.
         """
         checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
         checkInstance("pin", pin, DigOut)
+        checkType("shared", shared, bool)
         hiLevelMod.clkCount += 1
         prefix = f"clk{hiLevelMod.clkCount}"
+        self.hiLevelMod = hiLevelMod
+        self.shared = shared
         self.pin = pin
         self.isOn = hiLevelMod.var(Bool(0), f"{prefix}_$isOn$")
+        hiLevelMod.boundStepWhile(self.isOn)
+        if shared:
+            self.gen = hiLevelMod.var(Integer(0), f"{prefix}_$gen$")
+            return
         self.halfPeriod = hiLevelMod.var(Real(1000000), f"{prefix}_$halfPeriod$")
         self.time = hiLevelMod.var(Real(1000000), f"{prefix}_$time$")
-        _at = CmdList(
-                self.pin.toggle(),
-                If(self.isOn | self.pin.getST())(
-                    self.time.eq(abstime + self.halfPeriod)
-                )
-            )
-               
+        
+        #The periodic timer runs from time until the clock is off and low
         hiLevelMod.analog(
-            At(Timer(*([self.time] + hiLevelMod.timeArgs)))(
-                _at
+            hiLevelMod.timerEvent(self.time,
+                self.pin.toggle(),
+                If(~self.isOn & ~self.pin.getST())(
+                    self.time.eq(hiLevelMod.never)
+                ),
+                period = self.halfPeriod
             )
         )
 
@@ -1878,12 +2773,20 @@ class Clock():
         """Turn on the clock generator.
 
         Args:
-            frequency (Real, float, or int): The clock frequency.
+            frequency (Real, float, or int): The clock frequency. It must be
+                a float or an int if the clock is shared.
 
         Returns:
             CmdList: A list of commands to start the clock.
         """
         checkReal("frequency", frequency)
+        if self.shared:
+            assert type(frequency) in (int, float) and frequency > 0, \
+                   "frequency of a shared clock must be a positive int or float"
+            gens = self.hiLevelMod.clockGens
+            if float(frequency) not in gens:
+                gens[float(frequency)] = ClockGen(self.hiLevelMod, frequency)
+            return gens[float(frequency)].on(self)
         return CmdList(
             self.halfPeriod.eq(0.5/frequency),
             self.isOn.eq(True),
@@ -1906,10 +2809,392 @@ class Clock():
 
 
 #-------------------------------------------------------------------------------
-## HiLevelMod class. Child of the module class in the veriloA module. It 
-#  provides aditional methods for dealing with digital bus, current sources, 
-#  voltage sources, clocks and switches
-#
+## Clock tree class. The master clock and the derived clocks (divided and 
+#  phase-shifted) are driven by a counter updated by a single periodic timer.
+# 
+#-------------------------------------------------------------------------------
+class ClockTree():
+    """Clock tree class.
+    
+    Drives a master clock and its divided and phase-shifted clocks from a 
+    single periodic timer.
+    """
+    
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self The object pointer.
+    #  @param hiLeveMod Hi level model in which the analog command will be added.
+    #  @param master DigOut driven by the master clock.
+    #  @param derived list of tuples (pin, divider) or (pin, divider, shift). 
+    #         The pin is a DigOut, the divider is the ratio between the period
+    #         of the derived clock and the period of the master clock and the 
+    #         shift is the delay of the derived clock in half periods of the
+    #         master clock.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, hiLevelMod, master, derived):
+        """Initialize a ClockTree instance.
+
+        Args:
+            hiLevelMod (HiLevelMod): The high-level model.
+            master (DigOut): Pin driven by the master clock.
+            derived (list): Tuples (pin, divider) or (pin, divider, shift). 
+                The pin is a DigOut, the divider (int) is the ratio between 
+                the period of the derived clock and the period of the master
+                clock and the shift (int) is the delay of the derived clock in
+                half periods of the master clock.
+        """
+        checkInstance("hiLevelMod", hiLevelMod, HiLevelMod)
+        checkInstance("master", master, DigOut)
+        hiLevelMod.clkCount += 1
+        prefix = f"clk{hiLevelMod.clkCount}"
+        self.isOn = hiLevelMod.var(Bool(0), f"{prefix}_$isOn$")
+        self.halfPeriod = hiLevelMod.var(Real(1000000), f"{prefix}_$halfPeriod$")
+        self.start = hiLevelMod.var(Real(hiLevelMod.never), f"{prefix}_$start$")
+        self.tick = hiLevelMod.var(Integer(0), f"{prefix}_$tick$")
+        self.never = hiLevelMod.never
+        hiLevelMod.boundStepWhile(self.isOn)
+        
+        #Each pin is high in the first half of its period. The counter wraps
+        #at the least common multiple of the periods.
+        pins = [(master, 1, 0)]
+        i = 0
+        for item in derived:
+            assert isinstance(item, tuple) and len(item) in (2, 3), \
+                   f"derived[{i}] must be a tuple (pin, divider[, shift])"
+            checkInstance(f"derived[{i}][0]", item[0], DigOut)
+            checkType(f"derived[{i}][1]", item[1], int)
+            assert item[1] > 0, f"derived[{i}][1] must be greater than 0"
+            if len(item) == 3:
+                checkType(f"derived[{i}][2]", item[2], int)
+            pins.append(tuple(item) if len(item) == 3 else tuple(item) + (0,))
+            i = i + 1
+        self.wrap = 1
+        for pin, divider, shift in pins:
+            self.wrap = self.wrap*2*divider//math.gcd(self.wrap, 2*divider)
+        self.outputs = CmdList()
+        self.lows = CmdList()
+        for pin, divider, shift in pins:
+            offset = (-shift) % (2*divider)
+            phase = self.tick + offset if offset > 0 else self.tick
+            if offset > 0 or 2*divider < self.wrap:
+                phase = phase % (2*divider)
+            self.outputs.append(pin.write(phase < divider))
+            self.lows.append(pin.write(False))
+        
+        hiLevelMod.analog(
+            hiLevelMod.timerEvent(self.start,
+                If(self.isOn)(
+                    self.tick.eq((self.tick + 1) % self.wrap),
+                    self.outputs
+                ).Else(
+                    self.lows,
+                    self.start.eq(self.never)
+                ),
+                period = self.halfPeriod
+            )
+        )
+
+    #---------------------------------------------------------------------------
+    ## Turn the clock tree on. All clocks start with a rising edge unless they
+    #  are shifted.
+    #  @param self The object pointer.
+    #  @param frequency frequency of the master clock.
+    #
+    #---------------------------------------------------------------------------
+    def on(self, frequency):
+        """Turn on the clock tree.
+
+        All clocks start with a rising edge unless they are shifted.
+
+        Args:
+            frequency (Real, float, or int): The master clock frequency.
+
+        Returns:
+            CmdList: A list of commands to start the clock tree.
+        """
+        checkReal("frequency", frequency)
+        return CmdList(
+            self.halfPeriod.eq(0.5/frequency),
+            self.isOn.eq(True),
+            self.tick.eq(0),
+            self.outputs,
+            self.start.eq(abstime + self.halfPeriod)
+        )
+
+    #---------------------------------------------------------------------------
+    ## Turn the clock tree off. All pins go low at the next edge of the master
+    #  clock.
+    #  @param self The object pointer.
+    #
+    #---------------------------------------------------------------------------
+    def off(self):
+        """Turn off the clock tree.
+
+        All pins go low at the next edge of the master clock.
+
+        Returns:
+            Cmd: A command to turn off the clock tree.
+        """
+        return self.isOn.eq(False)
+
+
+#-------------------------------------------------------------------------------
+## Jump between two states of a compiled sequence. The jump is immediate (the
+#  next state runs at the same time point) unless an event id is given. In this
+#  case the sequence waits for the event (or for the timer if delay is given).
+#
+#-------------------------------------------------------------------------------
+class SeqJump():
+    """Jump between two states of a compiled sequence."""
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self The object pointer.
+    #  @param nxt Number of the next state.
+    #  @param eventId Id of the event waited before the jump. None if the jump
+    #         is immediate. 0 is the timer of the sequence.
+    #  @param delay Delay in us programmed in the timer.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, nxt, eventId = None, delay = None):
+        """Initialize a SeqJump instance.
+
+        Args:
+            nxt (int): Number of the next state.
+            eventId (int, optional): Id of the event waited before the jump.
+                None if the jump is immediate. 0 is the timer of the sequence.
+            delay (Real, float, or int, optional): Delay in us programmed in 
+                the timer.
+        """
+        self.nxt = nxt
+        self.eventId = eventId
+        self.delay = delay
+
+    #---------------------------------------------------------------------------
+    ## Return True if the jump waits for an event
+    #  @param self The object pointer.
+    #  @return bool
+    #
+    #---------------------------------------------------------------------------
+    def isWait(self):
+        """Return True if the jump waits for an event.
+
+        Returns:
+            bool: True if the jump waits for an event.
+        """
+        return not (self.eventId is None)
+
+    #---------------------------------------------------------------------------
+    ## Return the list of jumps
+    #  @param self The object pointer.
+    #  @return list of SeqJump
+    #
+    #---------------------------------------------------------------------------
+    def getJumps(self):
+        """Return the list of jumps.
+
+        Returns:
+            list: [self].
+        """
+        return [self]
+
+
+#-------------------------------------------------------------------------------
+## Conditional jump of a compiled sequence.
+#
+#-------------------------------------------------------------------------------
+class SeqBranch():
+    """Conditional jump of a compiled sequence."""
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self The object pointer.
+    #  @param cond Bool expression.
+    #  @param jumpTrue SeqJump taken when cond is true.
+    #  @param jumpFalse SeqJump taken when cond is false.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, cond, jumpTrue, jumpFalse):
+        """Initialize a SeqBranch instance.
+
+        Args:
+            cond (Bool): Condition.
+            jumpTrue (SeqJump): Jump taken when cond is true.
+            jumpFalse (SeqJump): Jump taken when cond is false.
+        """
+        self.cond = parseBool("cond", cond)
+        self.jumpTrue = jumpTrue
+        self.jumpFalse = jumpFalse
+
+    #---------------------------------------------------------------------------
+    ## Return the list of jumps
+    #  @param self The object pointer.
+    #  @return list of SeqJump
+    #
+    #---------------------------------------------------------------------------
+    def getJumps(self):
+        """Return the list of jumps.
+
+        Returns:
+            list: The jumps taken when cond is true and false.
+        """
+        return [self.jumpTrue, self.jumpFalse]
+
+
+#-------------------------------------------------------------------------------
+## Call of a subroutine of a compiled sequence. The return state is stored in 
+#  a variable before jumping to the entry of the subroutine.
+#
+#-------------------------------------------------------------------------------
+class SeqCall():
+    """Call of a subroutine of a compiled sequence."""
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self The object pointer.
+    #  @param ret IntegerVar holding the return state.
+    #  @param jumpEntry SeqJump to the entry of the subroutine.
+    #  @param jumpReturn SeqJump to the return state. It is shared with the 
+    #         SeqReturn of the subroutine.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, ret, jumpEntry, jumpReturn):
+        """Initialize a SeqCall instance.
+
+        Args:
+            ret (IntegerVar): Variable holding the return state.
+            jumpEntry (SeqJump): Jump to the entry of the subroutine.
+            jumpReturn (SeqJump): Jump to the return state. It is shared with
+                the SeqReturn of the subroutine.
+        """
+        checkInstance("ret", ret, IntegerVar)
+        self.ret = ret
+        self.jumpEntry = jumpEntry
+        self.jumpReturn = jumpReturn
+
+    #---------------------------------------------------------------------------
+    ## Return the list of jumps
+    #  @param self The object pointer.
+    #  @return list of SeqJump
+    #
+    #---------------------------------------------------------------------------
+    def getJumps(self):
+        """Return the list of jumps.
+
+        Returns:
+            list: The jump to the entry of the subroutine. The return jump
+                belongs to the SeqReturn of the subroutine.
+        """
+        return [self.jumpEntry]
+
+
+#-------------------------------------------------------------------------------
+## Return of a subroutine of a compiled sequence. It jumps to the state stored
+#  in the return variable.
+#
+#-------------------------------------------------------------------------------
+class SeqReturn():
+    """Return of a subroutine of a compiled sequence."""
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self The object pointer.
+    #  @param ret IntegerVar holding the return state.
+    #  @param jumps list of SeqJump to the return states of all calls.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, ret, jumps):
+        """Initialize a SeqReturn instance.
+
+        Args:
+            ret (IntegerVar): Variable holding the return state.
+            jumps (list): Jumps to the return states of all calls.
+        """
+        checkInstance("ret", ret, IntegerVar)
+        self.ret = ret
+        self.jumps = jumps
+
+    #---------------------------------------------------------------------------
+    ## Return the list of jumps
+    #  @param self The object pointer.
+    #  @return list of SeqJump
+    #
+    #---------------------------------------------------------------------------
+    def getJumps(self):
+        """Return the list of jumps.
+
+        Returns:
+            list: The jumps to the return states of all calls.
+        """
+        return list(self.jumps)
+
+
+#-------------------------------------------------------------------------------
+## State of a compiled sequence. It holds the commands run in the state and the
+#  jump to the next state. The state halts the sequence if exit is None.
+#
+#-------------------------------------------------------------------------------
+class SeqState():
+    """State of a compiled sequence."""
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self The object pointer.
+    #  @param n Number of the state.
+    #  @param cmds CmdList run in the state.
+    #  @param exit SeqJump, SeqBranch or None.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, n, cmds, exit = None):
+        """Initialize a SeqState instance.
+
+        Args:
+            n (int): Number of the state.
+            cmds (CmdList): Commands run in the state.
+            exit (SeqJump, SeqBranch, or None): Jump to the next state.
+        """
+        checkInstance("cmds", cmds, CmdList)
+        self.n = n
+        self.cmds = cmds
+        self.exit = exit
+
+    #---------------------------------------------------------------------------
+    ## Return the list of jumps
+    #  @param self The object pointer.
+    #  @return list of SeqJump
+    #
+    #---------------------------------------------------------------------------
+    def getJumps(self):
+        """Return the list of jumps leaving the state.
+
+        Returns:
+            list: List of SeqJump.
+        """
+        if self.exit is None:
+            return []
+        return self.exit.getJumps()
+
+    #---------------------------------------------------------------------------
+    ## Return True if the state doesn't run any command
+    #  @param self The object pointer.
+    #  @return bool
+    #
+    #---------------------------------------------------------------------------
+    def isEmpty(self):
+        """Return True if the state doesn't run any command.
+
+        Returns:
+            bool: True if the state has no commands.
+        """
+        return len(self.cmds.flat()) == 0
+
+
+#-------------------------------------------------------------------------------
+## HiLevelMod class. Child of the module class in the veriloA module. It 
+#  provides aditional methods for dealing with digital bus, current sources, 
+#  voltage sources, clocks and switches
+#
 #-------------------------------------------------------------------------------
 class HiLevelMod(Module):
     """
@@ -1917,6 +3202,9 @@ class HiLevelMod(Module):
     It provides additional methods for handling digital buses, 
     current sources, voltage sources, clocks, and switches.
     """
+
+    # Start time (in seconds) of the timers that must not fire
+    never = 1e6
   
     #---------------------------------------------------------------------------
     ## Constructor 
@@ -1924,9 +3212,19 @@ class HiLevelMod(Module):
     #  @param tbName Name of the test bench.
     #  @param timeTol Time tolerances for the timer.
     #  @param ignoreHiddenState ignore hiddel state pragma will be added if True
+    #  @param symbolic identifiers are referenced by id if True.
+    #  @param seqLog file-like object where the report of each compiled 
+    #         sequence is written. Nothing is written if None.
+    #  @param scheduler the timers of the module (sequences, periodic loops, 
+    #         clocks and models) are driven by a single timer armed at the 
+    #         earliest fire time if True.
+    #  @param autoBoundStep maximum time step while a source is ramping or a
+    #         clock is on. The time step isn't bound if None.
     #
     #---------------------------------------------------------------------------
-    def __init__(self, tbName, timeTol = None, ignoreHiddenStates = False):
+    def __init__(self, tbName, timeTol = None, ignoreHiddenStates = False,
+                 symbolic = False, seqLog = None, scheduler = False, 
+                 autoBoundStep = None):
         """
         Initializes the HiLevelMod instance.
 
@@ -1934,11 +3232,22 @@ class HiLevelMod(Module):
             tbName (str): Name of the test bench.
             timeTol (float, optional): Time tolerance for the timer.
             ignoreHiddenState (bool): Pragma will be added if True
+            symbolic (bool): Identifiers are referenced by id if True.
+            seqLog (file, optional): Where the report of each compiled 
+                sequence is written.
+            scheduler (bool): The timers of the module (sequences, periodic
+                loops, clocks and models) are driven by a single timer armed 
+                at the earliest fire time if True.
+            autoBoundStep (float, optional): Maximum time step while a source
+                is ramping or a clock is on. The simulator is free to take
+                large steps otherwise.
         """
+        checkType("scheduler", scheduler, bool)
         
         super(HiLevelMod, self).__init__(
             tbName, 
-            ignoreHiddenStates = ignoreHiddenStates
+            ignoreHiddenStates = ignoreHiddenStates,
+            symbolic = symbolic
         )
         self.dcCmdList  = CmdList()
         self.time       = None 
@@ -1946,14 +3255,30 @@ class HiLevelMod(Module):
         self.runSt      = None
         self.eventId    = None
         self.evntList   = None
+        self.seqStates  = []
+        self.seqSubs    = {}
+        self.seqCaller  = None
+        self.periodic   = False
+        self.seqStats   = []
+        self.seqLog     = seqLog
+        self.seqCode    = []
+        self.nEvents    = 0
+        self.nMonitors  = 0
+        self.nCounters  = 0
         self.pEventList = []
-        self.evntListG  = []
+        self.evntListG  = {}
         self.markers    = []
+        self.markCount  = None
+        self.markPin    = None
+        self.markRiseFall = None
         self.nSeq       = 1
         self.testSeqs   = CmdList()    
         self.var()   
         self.swCount = 0
         self.clkCount = 0
+        self.clockGens = {}
+        self.stepSources = {}
+        self.stepFlag = None
 
         if not isinstance(timeTol, type(None)):
             self.timeArgs = [0, parseReal("timeTol", timeTol)]
@@ -1972,7 +3297,170 @@ class HiLevelMod(Module):
         self.analog(
             self.testSeqs
         )
+
+        #Single timer armed at the earliest fire time. The fire times are 
+        #updated at the end of the analog block. The sequences are run by the
+        #timer block while the other commands are run where they were added,
+        #after the sequences, as their own timers would do.
+        self.scheduler   = scheduler
+        self.schedTimes  = []
+        self.schedCmds   = CmdList()
+        self.schedUpdate = CmdList()
+        if scheduler:
+            self.schedTime = self.var(Real(self.never), "_$schedTime")
+            self.schedFired = self.var(Bool(False), "_$schedFired")
+            self.beginningAnalog(
+                At(Timer(*([self.schedTime] + self.timeArgs)))(
+                    self.schedCmds,
+                    self.schedFired.eq(True)
+                )
+            )
+            self.endAnalog(
+                self.schedFired.eq(False),
+                self.schedUpdate
+            )
+
+        #Bound the time step until the end of the last ramp or while one of 
+        #the conditions holds
+        self.autoBoundStep = autoBoundStep
+        self.boundStepConds = []
+        self.boundStepCmds = CmdList()
+        if not isinstance(autoBoundStep, type(None)):
+            self.autoBoundStep = parseReal("autoBoundStep", autoBoundStep)
+            self.rampEnd = self.var(Real(0), "_$rampEnd")
+            self.endAnalog(
+                self.boundStepCmds
+            )
+            self.boundStepWhile(abstime < self.rampEnd)
                     
+    #---------------------------------------------------------------------------
+    ## Return the commands that keep the time step bound until the end of a 
+    #  ramp. An empty CmdList is returned if autoBoundStep is disabled.
+    #  @param self The object pointer.
+    #  @param duration Real expression holding the duration of the ramp.
+    #  @return CmdList.
+    #
+    #---------------------------------------------------------------------------
+    def ramp(self, duration):
+        """
+        Return the commands that keep the time step bound until the end of a
+        ramp. 
+
+        Args:
+            duration (Real, float, or int): Duration of the ramp.
+
+        Returns:
+            CmdList: Empty if autoBoundStep is disabled.
+        """
+        checkReal("duration", duration)
+        if isinstance(self.autoBoundStep, type(None)):
+            return CmdList()
+        end = abstime + duration
+        return CmdList(
+            self.rampEnd.eq(ternary(end > self.rampEnd, end, self.rampEnd))
+        )
+
+    #---------------------------------------------------------------------------
+    ## Keep the time step bound while a condition holds. Nothing is done if 
+    #  autoBoundStep is disabled.
+    #  @param self The object pointer.
+    #  @param cond Bool expression.
+    #  @return None
+    #
+    #---------------------------------------------------------------------------
+    def boundStepWhile(self, cond):
+        """
+        Keep the time step bound while a condition holds. Nothing is done if
+        autoBoundStep is disabled.
+
+        Args:
+            cond (Bool): The condition.
+        """
+        checkBool("cond", cond)
+        if isinstance(self.autoBoundStep, type(None)):
+            return
+        self.boundStepConds.append(cond)
+        active = self.boundStepConds[0]
+        for cond in self.boundStepConds[1:]:
+            active = active | cond
+        self.boundStepCmds.clear()
+        self.boundStepCmds.append(
+            If(active)(
+                BoundStep(self.autoBoundStep)
+            )
+        )
+
+    #---------------------------------------------------------------------------
+    ## Return the event that runs commands when the time of a timer is 
+    #  reached. In the scheduler mode the time is reset to never when it is 
+    #  reached, or moved by one period for periodic timers. The commands can 
+    #  stop a periodic timer setting its time to never. The commands of the 
+    #  sequences are run by the shared timer block and an empty CmdList is 
+    #  returned. The others are run by the returned block when the shared 
+    #  timer has fired, so they keep their place in the analog block.
+    #  @param self The object pointer.
+    #  @param time RealVar holding the fire time.
+    #  @param *cmds commands run when the time is reached.
+    #  @param period period of a periodic timer. None for one-shot timers.
+    #  @param seq True for the timers of the sequences.
+    #  @return At block, If block or CmdList.
+    #
+    #---------------------------------------------------------------------------
+    def timerEvent(self, time, *cmds, period = None, seq = False):
+        """
+        Return the event that runs commands when the time of a timer is 
+        reached. 
+
+        In the scheduler mode the time is reset to never when it is reached,
+        or moved by one period for periodic timers. The commands can stop a
+        periodic timer setting its time to never. The commands of the 
+        sequences are run by the shared timer block and an empty CmdList is
+        returned. The others are run by the returned block when the shared 
+        timer has fired, so they keep their place in the analog block.
+
+        Args:
+            time (RealVar): Fire time.
+            *cmds: Commands run when the time is reached.
+            period (Real, float or int, optional): Period of a periodic 
+                timer. None for one-shot timers.
+            seq (bool): True for the timers of the sequences.
+
+        Returns:
+            WaitAnalogEvent, If or CmdList: Block to be added to the analog 
+                block.
+        """
+        checkInstance("time", time, RealVar)
+        checkType("seq", seq, bool)
+        if not self.scheduler:
+            if isinstance(period, type(None)):
+                return At(Timer(*([time] + self.timeArgs)))(*cmds)
+            return At(Timer(*([time, period] + self.timeArgs[1:])))(*cmds)
+        if isinstance(period, type(None)):
+            rearm = time.eq(self.never)
+        else:
+            rearm = time.eq(time + period)
+        self.schedTimes.append(time)
+        self.schedUpdate.clear()
+        self.schedUpdate.append(self.schedTime.eq(self.schedTimes[0]))
+        for other in self.schedTimes[1:]:
+            self.schedUpdate.append(
+                If(other < self.schedTime)(
+                    self.schedTime.eq(other)
+                )
+            )
+        if not seq:
+            return If(self.schedFired & (time <= self.schedTime))(
+                rearm,
+                *cmds
+            )
+        self.schedCmds.append(
+            If(time <= self.schedTime)(
+                rearm,
+                *cmds
+            )
+        )
+        return CmdList()
+
     #---------------------------------------------------------------------------
     ## Add variable to the module. Also, the intial value of the variable will 
     #  be set during the static analysis and the initial step of transient.
@@ -2006,21 +3494,30 @@ class HiLevelMod(Module):
     #  @param self The object pointer.
     #  @param name Name of the marker.
     #  @param riseFall Rise and fall times of the marker pin. Default is 100ps.
+    #  @param mux If True, all multiplexed markers share the MARK pin. Its 
+    #         voltage is the number of marks done by the running sequence, so
+    #         only one sequence with multiplexed marks can run per simulation.
+    #         All multiplexed markers must have the same riseFall.
     #  @return Marker class.
     #
     #---------------------------------------------------------------------------
-    def marker(self, name, riseFall = 50e-12):
+    def marker(self, name, riseFall = 50e-12, mux = False):
         """
         Returns a marker object.
 
         Args:
             name (str): Name of the marker.
             riseFall (float, optional): Rise and fall times of the marker pin. Default is 50ps.
+            mux (bool): If True, all multiplexed markers share the MARK pin.
+                Its voltage is the number of marks done by the running
+                sequence, so only one sequence with multiplexed marks can run
+                per simulation. All multiplexed markers must have the same 
+                riseFall.
         
         Returns:
             Marker: Marker class instance.
         """
-        markerObj = Marker(self, name, riseFall)
+        markerObj = Marker(self, name, riseFall, mux)
         self.markers.append(markerObj)
         return markerObj
         
@@ -2045,6 +3542,11 @@ class HiLevelMod(Module):
     #  @param delay Real expression holding the initial delay time.    
     #  @param rise Real expression holding the initial rise time.
     #  @param fall Real expression holding the initial fall time.
+    #  @param model default or transition. Outputs with the transition model 
+    #         use a plain transition driver with the series resistance folded
+    #         into a single contribution. The edge times are the same.
+    #  @param cached the inputs are held in variables updated by cross events
+    #         if True.
     #  @return DigIn, DigOut, or DigInOut object. A DigBusIn, DigBusOut or
     #          DigBusInOut will be returned if width > 0.
     #
@@ -2060,7 +3562,9 @@ class HiLevelMod(Module):
             gnd = None, 
             delay = 0,
             rise = 100e-12,
-            fall = 100e-12):
+            fall = 100e-12,
+            model = "default",
+            cached = False):
         """
         Returns a digital pin or a digital bus.
 
@@ -2076,12 +3580,24 @@ class HiLevelMod(Module):
             delay (float, optional): Initial delay time.
             rise (float, optional): Initial rise time.
             fall (float, optional): Initial fall time.
+            model (str, optional): Driver of the outputs. default uses 
+                smooth and a separate series resistance. transition uses a 
+                plain transition with the series resistance folded into a 
+                single contribution. Only outputs support transition.
+            cached (bool, optional): The inputs are held in variables updated
+                by cross events if True. Reading a bus returns a single 
+                integer variable instead of evaluating a comparator per bit.
 
         Returns:
             DigIn, DigOut, DigInOut, DigBusIn, DigBusOut, or DigBusInOut: The corresponding digital pin or bus object.
         """
         #Check the inputs
         checkInstance("domain", domain, Electrical)
+        assert model == "default" or direction == "output", \
+               "only outputs support the transition model"
+        checkType("cached", cached, bool)
+        assert not cached or direction != "output", \
+               "outputs can't be cached"
         checkInteger("value", value)
         checkReal("inCap", inCap)
         checkReal("serRes", serRes)
@@ -2097,9 +3613,10 @@ class HiLevelMod(Module):
         else:
             digType = DigInOut
             busType = DigBusInOut
+        extra = {"model": model} if direction == "output" else {}
         #Create single pin
         if width == 1:
-            return digType(self, 
+            pin = digType(self, 
                            name, 
                            Bool(value), 
                            domain, 
@@ -2108,7 +3625,11 @@ class HiLevelMod(Module):
                            gnd,
                            delay,
                            rise, 
-                           fall)
+                           fall,
+                           **extra)
+            if cached:
+                pin.cache(self)
+            return pin
         #Create a bus
         else:
             bus = busType()
@@ -2123,8 +3644,11 @@ class HiLevelMod(Module):
                                    gnd,
                                    delay,
                                    rise, 
-                                   fall))
+                                   fall,
+                                   **extra))
                 j = j << 1
+            if cached:
+                bus.cache(self)
             return bus
 
     #---------------------------------------------------------------------------
@@ -2135,36 +3659,73 @@ class HiLevelMod(Module):
     #  @param cond Initial switch conductance. Default is 0S.
     #  @param rise Rise time for changes in the conductance. Default is 1us.
     #  @param fall Fall time for changes in the conductance. Default is 1us.
+    #  @param model default (transition filter) or settle (constant 
+    #         conductance once the ramp is done).
     #  @return a Sw class.
     #
     #---------------------------------------------------------------------------
-    def sw(self, pin1, pin2, cond = 0.0, rise = 1e-6, fall = 1e-6):
+    def sw(self, pin1, pin2, cond = 0.0, rise = 1e-6, fall = 1e-6, 
+           model = "default"):
         checkInstance("pin1", pin1, Electrical)
         checkInstance("pin2", pin2, Electrical)
         checkReal("cond", cond)
         checkReal("rise", rise)
         checkReal("fall", fall)
-        return Sw(self, pin1, pin2, cond, rise, fall)
+        return Sw(self, pin1, pin2, cond, rise, fall, model)
         
     #---------------------------------------------------------------------------
     ## Build a clock model using a digital pin
     #  @param self The object pointer.
     #  @param pin DigIn or DigInOut.
+    #  @param shared the clock is driven by a periodic timer shared by all 
+    #         clocks running at the same frequency if True.
     #  @return a Clock class.
     #
     #---------------------------------------------------------------------------
-    def clock(self, pin):
+    def clock(self, pin, shared = False):
         """
         Builds a clock model using a digital pin.
 
         Args:
             pin (DigOut): Digital output pin.
+            shared (bool): The clock is driven by a periodic timer shared by 
+                all clocks running at the same frequency if True. Their edges
+                are aligned and the frequency must be a float or an int.
 
         Returns:
             Clock: Clock object.
         """
         checkInstance("pin", pin, DigOut)
-        return Clock(self, pin)
+        return Clock(self, pin, shared)
+
+    #---------------------------------------------------------------------------
+    ## Build a clock tree. The master clock and the derived clocks are driven
+    #  by a single timer.
+    #  @param self The object pointer.
+    #  @param master DigOut driven by the master clock.
+    #  @param derived list of tuples (pin, divider) or (pin, divider, shift). 
+    #         The shift is given in half periods of the master clock.
+    #  @return a ClockTree class.
+    #
+    #---------------------------------------------------------------------------
+    def clockTree(self, master, derived = ()):
+        """
+        Builds a clock tree. The master clock and the derived clocks are 
+        driven by a single timer.
+
+        Args:
+            master (DigOut): Pin driven by the master clock.
+            derived (list): Tuples (pin, divider) or (pin, divider, shift).
+                The divider is the ratio between the period of the derived 
+                clock and the period of the master clock. The shift is the 
+                delay in half periods of the master clock. For instance, 
+                (pin, 2, 1) is a divided by 2 clock in quadrature.
+
+        Returns:
+            ClockTree: ClockTree object.
+        """
+        checkInstance("master", master, DigOut)
+        return ClockTree(self, master, derived)
 
     #---------------------------------------------------------------------------
     ## Return a Smu object or a SmuBus object if width > 1.
@@ -2178,6 +3739,7 @@ class HiLevelMod(Module):
     #  @param res Real expression holding the resitance.
     #  @return Smu or SmuBus depending on the width. 
     #  @param gnd Electrical representing the ground reference. 
+    #  @param model default or fast (see SmuFast).
     #
     #---------------------------------------------------------------------------
     def smu(self, 
@@ -2188,7 +3750,8 @@ class HiLevelMod(Module):
             minCur = 0, 
             maxCur = 0, 
             res = 1e12,
-            gnd = None): 
+            gnd = None,
+            model = "default"): 
         """
         Return a Smu object or a SmuBus object if width > 1.
 
@@ -2201,6 +3764,9 @@ class HiLevelMod(Module):
             maxCur (float): Real expression holding the initial maximum current.
             res (float): Real expression holding the resistance.
             gnd (optional): Electrical reference for the ground.
+            model (str): default or fast. The fast model (SmuFast) uses a 
+                single transition filter and only evaluates the contributions
+                of the active mode.
 
         Returns:
             Smu or SmuBus: Depending on the width, returns a single Smu or a vector of Smu objects.
@@ -2209,14 +3775,16 @@ class HiLevelMod(Module):
         checkReal("minCur", minCur)
         checkReal("maxCur", maxCur)
         checkReal("res", res)
+        assert model in ("default", "fast"), "model must be default or fast"
+        Type = SmuFast if model == "fast" else Smu
         name = self.addNode(name, width, direction)
         if width == 1:
-            return  Smu(self, name, volt, minCur, maxCur, res, gnd)
+            return  Type(self, name, volt, minCur, maxCur, res, gnd)
         else:
             vector = SmuBus()
             for i in range(0, width):
                 vector.append(
-                    Smu(self, 
+                    Type(self, 
                         name + "[" + str(i) + "]",
                         volt, 
                         minCur,
@@ -2237,6 +3805,8 @@ class HiLevelMod(Module):
     #  @param gnd Electrical representing the ground reference.
     #  @param rise Real expression holding the initial rise time.
     #  @param fall Real expression holding the initial fall time.
+    #  @param shared If True, the bits of a bus share the value, the rise and 
+    #         the fall times, and a single transition filter.
     #  @return Vdc or VdcBus depending on the width. 
     #
     #---------------------------------------------------------------------------
@@ -2247,7 +3817,8 @@ class HiLevelMod(Module):
             value = 0,
             gnd = None,
             rise = 1e-6,
-            fall = 1e-6):
+            fall = 1e-6,
+            shared = False):
         """
         Return a Vdc object or a VdcBus object if width > 1.
 
@@ -2259,6 +3830,8 @@ class HiLevelMod(Module):
             gnd (optional): Electrical reference for the ground.
             rise (float): Initial rise time of the voltage.
             fall (float): Initial fall time of the voltage.
+            shared (bool): If True, the bits of a bus share the value, the
+                rise and fall times, and a single transition filter.
 
         Returns:
             Vdc or VdcBus: Depending on the width, returns a single Vdc or a vector of Vdc objects.
@@ -2266,10 +3839,14 @@ class HiLevelMod(Module):
         checkReal("value", value)
         checkReal("rise", rise)
         checkReal("fall", fall)
+        checkType("shared", shared, bool)
         name = self.addNode(name, width, direction)
         if width == 1:
             return  Vdc(self, name, value, gnd, rise, fall)
         else:
+            gen = None
+            if shared:
+                gen = SourceGen(self, name, value, rise, fall)
             vBus = VdcBus()
             for i in range(0, width):
                 vBus.append(
@@ -2278,7 +3855,8 @@ class HiLevelMod(Module):
                         value,
                         gnd,
                         rise, 
-                        fall
+                        fall,
+                        gen
                     )
                 )
             return vBus
@@ -2293,6 +3871,8 @@ class HiLevelMod(Module):
     #  @param gnd Electrical representing the ground reference.
     #  @param rise Real expression holding the initial rise time.
     #  @param fall Real expression holding the initial fall time.
+    #  @param shared If True, the bits of a bus share the value, the rise and 
+    #         the fall times, and a single transition filter.
     #  @return Idc or IdcBus depending on the width. 
     #
     #---------------------------------------------------------------------------
@@ -2303,7 +3883,8 @@ class HiLevelMod(Module):
             value = 0,
             gnd = None,
             rise = 1e-6,
-            fall = 1e-6):
+            fall = 1e-6,
+            shared = False):
         """
         Return an Idc object or an IdcBus object if width > 1.
 
@@ -2315,6 +3896,8 @@ class HiLevelMod(Module):
             gnd (optional): Electrical reference for the ground.
             rise (float): Initial rise time of the current.
             fall (float): Initial fall time of the current.
+            shared (bool): If True, the bits of a bus share the value, the
+                rise and fall times, and a single transition filter.
 
         Returns:
             Idc or IdcBus: Depending on the width, returns a single Idc or a vector of Idc objects.
@@ -2322,10 +3905,14 @@ class HiLevelMod(Module):
         checkReal("value", value)
         checkReal("rise", rise)
         checkReal("fall", fall)
+        checkType("shared", shared, bool)
         name = self.addNode(name, width, direction)
         if width == 1:
             return  Idc(self, name, value, gnd, rise, fall)
         else:
+            gen = None
+            if shared:
+                gen = SourceGen(self, name, value, rise, fall)
             iBus = IdcBus()
             for i in range(0, width):
                 iBus.append(
@@ -2334,26 +3921,196 @@ class HiLevelMod(Module):
                         value,
                         gnd,
                         rise, 
-                        fall
+                        fall,
+                        gen
                     )
                 )
             return iBus
 
     #---------------------------------------------------------------------------
-    ## Sequence. Do not use it! Use Seq instead.
-    #  @param cmdsIn list of commands to be processed.
-    #  @return The list of remaining commands to be processed.
+    ## Write vectors to a data file and return a command that plays them back
+    #  inside a sequence. Each vector holds a delay in us followed by one 
+    #  value per target. The values are applied and then the delay is waited 
+    #  for. The size of the module doesn't depend on the number of vectors.
+    #  The data file is written by this method, not by getVA, as the vectors 
+    #  can be a generator consumed once.
+    #  @param self The object pointer.
+    #  @param fileName Name of the data file. It is opened by the simulator, so
+    #         it should be an absolute path.
+    #  @param targets list of IntegerVar, RealVar, BoolVar, Vdc, VdcBus, Idc, 
+    #         IdcBus, DigOut or DigBusOut.
+    #  @param vectors iterable of sequences with the delay and the values.
+    #  @return Playback command.
     #
     #---------------------------------------------------------------------------
-    def seqNested(self, cmdsIn):
+    def playback(self, fileName, targets, vectors):
         """
-        Sequence. Do not use it! Use Seq instead.
+        Write vectors to a data file and return a command that plays them back
+        inside a sequence.
+
+        The data file is written by this method, not by getVA, as the vectors
+        can be a generator consumed once.
 
         Args:
-            cmdsIn (list): List of commands to be processed.
+            fileName (str): Name of the data file. It is opened by the 
+                simulator, so it should be an absolute path.
+            targets (list): IntegerVar, RealVar, BoolVar, Vdc, VdcBus, Idc, 
+                IdcBus, DigOut or DigBusOut.
+            vectors (iterable): Sequences with the delay in us followed by one
+                value per target.
 
         Returns:
-            CmdList: The list of remaining commands to be processed.
+            Playback: Command to be used inside a sequence.
+        """
+        checkType("fileName", fileName, str)
+        targets = list(targets)
+        assert len(targets) > 0, "targets can't be empty"
+        variables = []
+        cmds = CmdList()
+        isReal = []
+        i = 0
+        for target in targets:
+            if isinstance(target, (IntegerVar, BoolVar, RealVar)):
+                var = target
+            elif isinstance(target, (Vdc, VdcBus)):
+                var = self.var(0.0)
+                cmds.append(target.applyV(var))
+            elif isinstance(target, (Idc, IdcBus)):
+                var = self.var(0.0)
+                cmds.append(target.applyI(var))
+            elif isinstance(target, DigOut):
+                var = self.var()
+                cmds.append(target.write(var != 0))
+            elif isinstance(target, DigBusOut):
+                assert len(target) <= 32, \
+                       f"targets[{i}] can't be wider than 32 bits"
+                var = self.var()
+                cmds.append(target.write(var))
+            else:
+                raise TypeError( (f"targets[{i}] can't be played back. A "
+                                  f"{type(target)} was given") )
+            variables.append(var)
+            isReal.append(isinstance(var, RealVar))
+            i = i + 1
+        
+        #Write the data file in large chunks
+        with open(fileName, "w", buffering = 1 << 20) as file:
+            lines = []
+            i = 0
+            for vector in vectors:
+                vector = list(vector)
+                assert len(vector) == len(targets) + 1, \
+                       (f"vectors[{i}] must have the delay and "
+                        f"{len(targets)} values")
+                assert type(vector[0]) in (int, float), \
+                       f"delay of vectors[{i}] must be int or float"
+                line = [repr(float(vector[0]))]
+                for real, value in zip(isReal, vector[1:]):
+                    if real:
+                        assert type(value) in (int, float), \
+                               f"values of vectors[{i}] must be int or float"
+                        line.append(repr(float(value)))
+                    else:
+                        assert type(value) in (int, bool), \
+                               f"values of vectors[{i}] must be int or bool"
+                        line.append(str(int(value)))
+                lines.append(" ".join(line))
+                if len(lines) == 4096:
+                    lines.append("")
+                    file.write("\n".join(lines))
+                    lines = []
+                i = i + 1
+            if len(lines) > 0:
+                lines.append("")
+                file.write("\n".join(lines))
+        return Playback(fileName, self.var(0.0), variables, cmds)
+
+    #---------------------------------------------------------------------------
+    ## Subroutine of sequences. The body is compiled once in each sequence 
+    #  that calls it and the Call command jumps to it, so the size of the
+    #  generated code doesn't grow with the number of calls.
+    #  @param self The object pointer.
+    #  @param *cmds commands of the subroutine.
+    #  @return Subseq to be used with the Call command.
+    #
+    #---------------------------------------------------------------------------
+    def subseq(self, *cmds):
+        """
+        Subroutine of sequences.
+
+        The body is compiled once in each sequence that calls it and the Call
+        command jumps to it, so the size of the generated code doesn't grow
+        with the number of calls. Recursive calls aren't supported.
+
+        Args:
+            *cmds: Commands of the subroutine.
+
+        Returns:
+            Subseq: Subroutine to be used with the Call command.
+        """
+        assert len(cmds) > 0, "Subroutine can't be empty"
+        i = 1
+        for cmd in cmds:
+            assert isinstance(cmd, Cmd) and \
+                   not isinstance(cmd, (WaitAnalogEvent, Mark)), (f"Command "
+                   f"{i} must be an instance of Cmd and can't be and instance "
+                   "of WaitAnalogEvent or Mark")
+            i = i + 1
+        return Subseq(CmdList(*cmds))
+
+    #---------------------------------------------------------------------------
+    ## Sequence. Do not use it! Use Seq instead. The nested blocks are compiled
+    #  with an explicit stack of seqBlock generators, so the nesting depth 
+    #  isn't limited by the recursion limit.
+    #  @param cmdsIn list of commands to be processed.
+    #  @return The list of remaining commands to be processed.
+    #
+    #---------------------------------------------------------------------------
+    def seqNested(self, cmdsIn):
+        """
+        Sequence. Do not use it! Use Seq instead.
+
+        The nested blocks are compiled with an explicit stack of seqBlock 
+        generators, so the nesting depth isn't limited by the recursion limit.
+
+        Args:
+            cmdsIn (list): List of commands to be processed.
+
+        Returns:
+            CmdList: The list of remaining commands to be processed.
+        """
+        stack = [self.seqBlock(cmdsIn)]
+        result = None
+        while len(stack) > 0:
+            try:
+                block = stack[-1].send(result)
+                stack.append(self.seqBlock(block))
+                result = None
+            except StopIteration as stop:
+                stack.pop()
+                result = stop.value
+        return result
+
+    #---------------------------------------------------------------------------
+    ## Compile a block of a sequence. Do not use it! Use Seq instead. It yields
+    #  each nested block to seqNested and receives the list of its remaining 
+    #  commands.
+    #  @param cmdsIn list of commands to be processed.
+    #  @return generator. Its return value is the list of remaining commands.
+    #
+    #---------------------------------------------------------------------------
+    def seqBlock(self, cmdsIn):
+        """
+        Compile a block of a sequence. Do not use it! Use Seq instead.
+
+        It yields each nested block to seqNested and receives the list of its
+        remaining commands.
+
+        Args:
+            cmdsIn (list): List of commands to be processed.
+
+        Returns:
+            generator: Its return value is the list of remaining commands.
         """
         cmdsIn = cmdsIn.flat()
         cmds = CmdList()
@@ -2361,144 +4118,157 @@ class HiLevelMod(Module):
         
             #Found a WaitUs. Update timer event and go to next state
             if isinstance(cmd, WaitUs):
-                cmds.append(self.eventId.eq(0))
-                cmds.append(self.state.eq(self.nState + 1))
-                cmds.append(self.time.eq(abstime + 1e-6*cmd.getDelay()))
-                self.pCase.append((self.nState, cmds))
+                self.seqStates.append(
+                    SeqState(self.nState, 
+                        cmds, 
+                        SeqJump(self.nState + 1, 0, cmd.getDelay())
+                    )
+                )
                 self.nState = self.nState + 1
                 cmds = CmdList()
                 
             #Found a WaitSignal. Update signal events and go to next state
             elif isinstance(cmd, WaitSignal):
-                evnt = cmd.getEvnt()
-                #The event was used before
-                if evnt in self.evntList:
-                    i = self.evntListG.index(evnt)
-                    eventId = i + 1  
-                #Fist event was used before but not in the current sequence
-                elif evnt in self.evntListG:
-                    self.evntList.append(evnt)
-                    i = self.evntListG.index(evnt)
-                    eventId = i + 1  
-                    self.pEventList[i].append(
-                        If(eventId == self.eventId)(
-                            self.runSt.eq(True)
-                        )
+                self.nEvents = self.nEvents + 1
+                eventId = self.seqEvent(cmd.getEvnt())
+                self.seqStates.append(
+                    SeqState(self.nState, 
+                        cmds, 
+                        SeqJump(self.nState + 1, eventId)
                     )
-                #The event wasn't used in any sequence
-                else:
-                    eventId = len(self.evntListG) + 1
-                    self.evntList.append(evnt)
-                    self.evntListG.append(evnt)
-                    pEvntCmd = CmdList( 
-                        If(eventId == self.eventId)(
-                            self.runSt.eq(True)
-                        )
-                    )
-                    self.pEventList.append(pEvntCmd)
-                    self.beginningAnalog(
-                        At(evnt)(
-                            pEvntCmd
-                        )
-                    )
-                cmds.append(self.eventId.eq(eventId))
-                cmds.append(self.state.eq(self.nState + 1))
-                self.pCase.append((self.nState, cmds))
+                )
                 self.nState = self.nState + 1
                 cmds = CmdList()
                 
-            #Found a repeat loop
-            elif isinstance(cmd, RepeatLoop):
-                temp = self.var()
-                cmds.append(temp.eq(0))
-                cmds.append(self.runSt.eq(True))
-                cmds.append(self.state.eq(self.nState + 1))
-                self.pCase.append((self.nState, cmds))
-                self.nState = self.nState + 1
-                nStateTest = self.nState
+            #Found a playback. Open the file and read one line per timer event
+            elif isinstance(cmd, Playback):
+                desc = self.var()
+                count = self.var()
+                cmds.append(desc.eq(Fopen(cmd.getFileName(), "r")))
+                self.seqStates.append(
+                    SeqState(self.nState, cmds, SeqJump(self.nState + 1))
+                )
                 self.nState = self.nState + 1
-                nStateLoop = self.nState
-                cmds = self.seqNested(cmd)
-                self.pCase.append(
-                    (self.nState, 
-                        cmds,
-                        temp.inc(),
-                        self.runSt.eq(True),
-                        self.state.eq(nStateTest)
-                    )
-                )               
-                self.pCase.append(
-                    (nStateTest,
-                        self.runSt.eq(True),
-                        If(temp < cmd.getN())(
-                            self.state.eq(nStateLoop),
-                        ).Else(
-                            self.state.eq(self.nState + 1)    
+                variables = cmd.getVariables()
+                valid = count == len(variables)
+                self.seqStates.append(
+                    SeqState(self.nState, 
+                        CmdList(
+                            count.eq(
+                                Fscanf(desc, cmd.getFormat(), *variables)
+                            ),
+                            If(valid)(
+                                cmd.getCmds(),
+                                self.time.eq(abstime + 1e-6*cmd.getDelay())
+                            ).Else(
+                                Fclose(desc)
+                            )
+                        ), 
+                        SeqBranch(valid, 
+                            SeqJump(self.nState, 0), 
+                            SeqJump(self.nState + 1)
                         )
                     )
-                )  
-                self.nState = self.nState + 1  
-                cmds = CmdList()           
-
-            #Found a While loop
-            elif isinstance(cmd, WhileLoop):
-                cmds.append(self.runSt.eq(True))
-                cmds.append(self.state.eq(self.nState + 1))
-                self.pCase.append((self.nState, cmds))
+                )
                 self.nState = self.nState + 1
-                nStateTest = self.nState
+                cmds = CmdList()
+                
+            #Found a call. Save the return state and jump to the subroutine.
+            #The subroutine is compiled after the sequence.
+            elif isinstance(cmd, Call):
+                sub = self.seqSubroutine(cmd.getSubseq())
+                jumpReturn = SeqJump(self.nState + 1)
+                jumpEntry = SeqJump(None)
+                sub["returns"].append(jumpReturn)
+                sub["calls"].append(jumpEntry)
+                self.seqStates.append(
+                    SeqState(self.nState, 
+                        cmds, 
+                        SeqCall(sub["ret"], jumpEntry, jumpReturn)
+                    )
+                )
                 self.nState = self.nState + 1
-                nStateLoop = self.nState
-                cmds = self.seqNested(cmd)
-                self.pCase.append(
-                    (self.nState, 
-                        cmds,
-                        self.runSt.eq(True),
-                        self.state.eq(nStateTest)
+                cmds = CmdList()
+                
+            #Found a repeat loop that only assigns variables and waits for a 
+            #fixed delay. Use a periodic timer and a countdown.
+            elif isinstance(cmd, RepeatLoop) and self.periodic and \
+                 not isinstance(self.seqPeriodic(cmd), type(None)):
+                n, pre, delay, post = self.seqPeriodic(cmd)
+                count = self.var()
+                start = self.var(self.never)
+                self.nCounters = self.nCounters + 1
+                eventId = self.seqTimer(start, 1e-6*delay)
+                cmds.append(pre)
+                cmds.append(count.eq(n))
+                cmds.append(start.eq(abstime + 1e-6*delay))
+                self.seqStates.append(
+                    SeqState(self.nState, 
+                        cmds, 
+                        SeqJump(self.nState + 1, eventId)
                     )
-                )               
-                self.pCase.append(
-                    (nStateTest,
-                        self.runSt.eq(True),
-                        If(cmd.getCond())(
-                            self.state.eq(nStateLoop),
-                        ).Else(
-                            self.state.eq(self.nState + 1)    
+                )
+                self.nState = self.nState + 1
+                if len(pre.flat()) > 0:
+                    stop = If(count > 0)(
+                        pre
+                    ).Else(
+                        start.eq(self.never)
+                    )
+                else:
+                    stop = If(count == 0)(
+                        start.eq(self.never)
+                    )
+                self.seqStates.append(
+                    SeqState(self.nState, 
+                        CmdList(post, count.dec(), stop), 
+                        SeqBranch(count > 0, 
+                            SeqJump(self.nState, eventId), 
+                            SeqJump(self.nState + 1)
                         )
                     )
-                )  
-                self.nState = self.nState + 1  
+                )
+                self.nState = self.nState + 1
                 cmds = CmdList()
                 
-            #Found a for loop
-            elif isinstance(cmd, ForLoop):
-                cmds.append(cmd.getStart())
-                cmds.append(self.runSt.eq(True))
-                cmds.append(self.state.eq(self.nState + 1))
-                self.pCase.append((self.nState, cmds))
+            #Found a loop
+            elif isinstance(cmd, (RepeatLoop, WhileLoop, ForLoop)):
+                if isinstance(cmd, RepeatLoop):
+                    temp = self.var()
+                    self.nCounters = self.nCounters + 1
+                    cmds.append(temp.eq(0))
+                    cond = temp < cmd.getN()
+                    inc = temp.inc()
+                elif isinstance(cmd, WhileLoop):
+                    cond = cmd.getCond()
+                    inc = CmdList()
+                else:
+                    cmds.append(cmd.getStart())
+                    cond = cmd.getCond()
+                    inc = cmd.getInc()
+                self.seqStates.append(
+                    SeqState(self.nState, cmds, SeqJump(self.nState + 1))
+                )
                 self.nState = self.nState + 1
                 nStateTest = self.nState
                 self.nState = self.nState + 1
                 nStateLoop = self.nState
-                cmds = self.seqNested(cmd)
-                self.pCase.append(
-                    (self.nState, 
-                        cmds,
-                        cmd.getInc(),
-                        self.runSt.eq(True),
-                        self.state.eq(nStateTest)
+                cmds = yield cmd
+                self.seqStates.append(
+                    SeqState(self.nState, 
+                        CmdList(cmds, inc), 
+                        SeqJump(nStateTest)
                     )
-                )               
-                self.pCase.append(
-                    (nStateTest,
-                        self.runSt.eq(True),
-                        If(cmd.getCond())(
-                            self.state.eq(nStateLoop),
-                        ).Else(
-                            self.state.eq(self.nState + 1)    
+                )
+                self.seqStates.append(
+                    SeqState(nStateTest, 
+                        CmdList(), 
+                        SeqBranch(cond, 
+                            SeqJump(nStateLoop), 
+                            SeqJump(self.nState + 1)
                         )
                     )
-                )  
+                )
                 self.nState = self.nState + 1  
                 cmds = CmdList()
                 
@@ -2507,36 +4277,32 @@ class HiLevelMod(Module):
                 nStateTest = self.nState
                 self.nState = self.nState + 1
                 nStateTrue = self.nState
-                cmdsEndTrue = self.seqNested(cmd.getBlock(True))
+                cmdsEndTrue = yield cmd.getBlock(True)
                 nStateEndTrue = self.nState
                 self.nState = self.nState + 1
                 nStateFalse = self.nState                
-                cmdsEndFalse = self.seqNested(cmd.getBlock(False))
-                self.pCase.append(
-                    (self.nState, 
-                        cmdsEndFalse,
-                        self.runSt.eq(True),
-                        self.state.eq(self.nState + 1)
+                cmdsEndFalse = yield cmd.getBlock(False)
+                self.seqStates.append(
+                    SeqState(self.nState, 
+                        cmdsEndFalse, 
+                        SeqJump(self.nState + 1)
                     )
-                )      
-                self.pCase.append(
-                    (nStateEndTrue, 
-                        cmdsEndTrue,
-                        self.runSt.eq(True),
-                        self.state.eq(self.nState + 1)
+                )
+                self.seqStates.append(
+                    SeqState(nStateEndTrue, 
+                        cmdsEndTrue, 
+                        SeqJump(self.nState + 1)
                     )
-                )                    
-                self.pCase.append(
-                    (nStateTest,
-                        cmds,
-                        self.runSt.eq(True),
-                        If(cmd.getCond())(
-                            self.state.eq(nStateTrue),
-                        ).Else(
-                            self.state.eq(nStateFalse)    
+                )
+                self.seqStates.append(
+                    SeqState(nStateTest, 
+                        cmds, 
+                        SeqBranch(cmd.getCond(), 
+                            SeqJump(nStateTrue), 
+                            SeqJump(nStateFalse)
                         )
                     )
-                )  
+                )
                 self.nState = self.nState + 1  
                 cmds = CmdList()
                 
@@ -2555,49 +4321,803 @@ class HiLevelMod(Module):
                 
         return cmds
 
+    #---------------------------------------------------------------------------
+    ## Return the compile record of a subroutine in the current sequence. It is
+    #  created and scheduled for compilation at the first call. Do not use it! 
+    #  Use Seq instead.
+    #  @param self The object pointer.
+    #  @param subseq instance of Subseq.
+    #  @return dictionary with the keys subseq, ret, calls, returns and 
+    #          callees.
+    #
+    #---------------------------------------------------------------------------
+    def seqSubroutine(self, subseq):
+        """
+        Return the compile record of a subroutine in the current sequence. Do
+        not use it! Use Seq instead.
+
+        Args:
+            subseq (Subseq): The subroutine.
+
+        Returns:
+            dict: Record with the keys subseq, ret (return state variable), 
+                calls (jumps to the entry), returns (jumps to the return 
+                states) and callees (subroutines called by its body).
+        """
+        key = id(subseq)
+        if not isinstance(self.seqCaller, type(None)):
+            self.seqSubs[self.seqCaller]["callees"].add(key)
+        if key not in self.seqSubs:
+            self.seqSubs[key] = {"subseq"  : subseq,
+                                 "ret"     : self.var(),
+                                 "calls"   : [],
+                                 "returns" : [],
+                                 "callees" : set()}
+            self.nCounters = self.nCounters + 1
+        return self.seqSubs[key]
+
+    #---------------------------------------------------------------------------
+    ## Compile the subroutines called by the current sequence. Their states 
+    #  are placed after the last state of the sequence. Do not use it! Use Seq
+    #  instead.
+    #  @param self The object pointer.
+    #  @return None
+    #
+    #---------------------------------------------------------------------------
+    def seqSubroutines(self):
+        """
+        Compile the subroutines called by the current sequence. Do not use it!
+        Use Seq instead.
+
+        Their states are placed after the last state of the sequence.
+        """
+        i = 0
+        while i < len(self.seqSubs):
+            key = list(self.seqSubs)[i]
+            sub = self.seqSubs[key]
+            self.nState = self.nState + 1
+            entry = self.nState
+            self.seqCaller = key
+            cmds = self.seqNested(sub["subseq"].getCmds())
+            self.seqCaller = None
+            self.seqStates.append(
+                SeqState(self.nState, 
+                    cmds, 
+                    SeqReturn(sub["ret"], sub["returns"])
+                )
+            )
+            for jump in sub["calls"]:
+                jump.nxt = entry
+            i = i + 1
+        
+        #The return state is overwritten by recursive calls
+        remaining = set(self.seqSubs)
+        while len(remaining) > 0:
+            leaves = [key for key in remaining 
+                      if len(self.seqSubs[key]["callees"] & remaining) == 0]
+            if len(leaves) == 0:
+                raise Exception("Subroutines can't be called recursively")
+            remaining.difference_update(leaves)
+
+    #---------------------------------------------------------------------------
+    ## Return the commands that perform a jump of the sequence
+    #  @param self The object pointer.
+    #  @param jump instance of SeqJump.
+    #  @return list of commands.
+    #
+    #---------------------------------------------------------------------------
+    def seqJumpCmds(self, jump):
+        """
+        Return the commands that perform a jump of the sequence.
+
+        Args:
+            jump (SeqJump): Jump to be performed.
+
+        Returns:
+            list: Commands that perform the jump.
+        """
+        if not jump.isWait():
+            return [self.runSt.eq(True), self.state.eq(jump.nxt)]
+        cmds = [self.eventId.eq(jump.eventId), self.state.eq(jump.nxt)]
+        if not isinstance(jump.delay, type(None)):
+            cmds.append(self.time.eq(abstime + 1e-6*jump.delay))
+        return cmds
+
+    #---------------------------------------------------------------------------
+    ## Return the case item of a state of the sequence
+    #  @param self The object pointer.
+    #  @param state instance of SeqState.
+    #  @return tuple with the state number followed by the commands.
+    #
+    #---------------------------------------------------------------------------
+    def seqCaseItem(self, state):
+        """
+        Return the case item of a state of the sequence.
+
+        Args:
+            state (SeqState): State of the sequence.
+
+        Returns:
+            tuple: The state number followed by the commands.
+        """
+        exit = state.exit
+        if isinstance(exit, SeqJump):
+            cmds = self.seqJumpCmds(exit)
+        elif isinstance(exit, SeqBranch):
+            jumpTrue = exit.jumpTrue
+            jumpFalse = exit.jumpFalse
+            if not (jumpTrue.isWait() or jumpFalse.isWait()):
+                cmds = [self.runSt.eq(True),
+                        If(exit.cond)(
+                            self.state.eq(jumpTrue.nxt),
+                        ).Else(
+                            self.state.eq(jumpFalse.nxt)
+                        )]
+            elif jumpTrue.isWait() and jumpFalse.isWait() and \
+                 jumpTrue.eventId == jumpFalse.eventId and \
+                 isinstance(jumpTrue.delay, type(None)) and \
+                 isinstance(jumpFalse.delay, type(None)):
+                cmds = [self.eventId.eq(jumpTrue.eventId),
+                        If(exit.cond)(
+                            self.state.eq(jumpTrue.nxt),
+                        ).Else(
+                            self.state.eq(jumpFalse.nxt)
+                        )]
+            else:
+                cmds = [If(exit.cond)(
+                            *self.seqJumpCmds(jumpTrue)
+                        ).Else(
+                            *self.seqJumpCmds(jumpFalse)
+                        )]
+        elif isinstance(exit, SeqCall):
+            cmds = [exit.ret.eq(exit.jumpReturn.nxt)] + \
+                   self.seqJumpCmds(exit.jumpEntry)
+        elif isinstance(exit, SeqReturn):
+            cmds = [self.runSt.eq(True), self.state.eq(exit.ret)]
+        else:
+            cmds = []
+        return tuple([state.n, state.cmds] + cmds)
+
+    #---------------------------------------------------------------------------
+    ## Return the id of an event of the sequence. The monitor of the event is 
+    #  created if it doesn't exist. Do not use it! Use Seq instead.
+    #  @param self The object pointer.
+    #  @param evnt instance of Event.
+    #  @return int.
+    #
+    #---------------------------------------------------------------------------
+    def seqEvent(self, evnt):
+        """
+        Return the id of an event of the sequence. Do not use it! Use Seq 
+        instead.
+
+        The monitor of the event is created if it doesn't exist.
+
+        Args:
+            evnt (Event): The event.
+
+        Returns:
+            int: Id of the event.
+        """
+        #Events are identified by their canonical form so textually identical
+        #events share the same monitor
+        key = str(evnt)
+        #The event was used before
+        if key in self.evntList:
+            eventId = self.evntListG[key]
+        #Fist event was used before but not in the current sequence
+        elif key in self.evntListG:
+            self.evntList.add(key)
+            eventId = self.evntListG[key]
+            self.pEventList[eventId - 1].append(
+                If(eventId == self.eventId)(
+                    self.runSt.eq(True)
+                )
+            )
+        #The event wasn't used in any sequence
+        else:
+            eventId = len(self.evntListG) + 1
+            self.nMonitors = self.nMonitors + 1
+            self.evntList.add(key)
+            self.evntListG[key] = eventId
+            pEvntCmd = CmdList( 
+                If(eventId == self.eventId)(
+                    self.runSt.eq(True)
+                )
+            )
+            self.pEventList.append(pEvntCmd)
+            self.beginningAnalog(
+                At(evnt)(
+                    pEvntCmd
+                )
+            )
+        return eventId
+
+    #---------------------------------------------------------------------------
+    ## Return the id of a periodic timer event of the sequence. The timer is 
+    #  run by the shared timer in the scheduler mode. Do not use it! Use Seq 
+    #  instead.
+    #  @param self The object pointer.
+    #  @param time RealVar holding the first fire time.
+    #  @param period period of the timer.
+    #  @return id of the event.
+    #
+    #---------------------------------------------------------------------------
+    def seqTimer(self, time, period):
+        """
+        Return the id of a periodic timer event of the sequence. Do not use 
+        it! Use Seq instead.
+
+        The timer is run by the shared timer in the scheduler mode.
+
+        Args:
+            time (RealVar): First fire time.
+            period (Real, float or int): Period of the timer.
+
+        Returns:
+            int: Id of the event.
+        """
+        key = str(Timer(*([time, period] + self.timeArgs[1:])))
+        eventId = len(self.evntListG) + 1
+        self.nMonitors = self.nMonitors + 1
+        self.evntList.add(key)
+        self.evntListG[key] = eventId
+        pEvntCmd = CmdList( 
+            If(eventId == self.eventId)(
+                self.runSt.eq(True)
+            )
+        )
+        self.pEventList.append(pEvntCmd)
+        self.beginningAnalog(
+            self.timerEvent(time, pEvntCmd, period = period, seq = True)
+        )
+        return eventId
+
+    #---------------------------------------------------------------------------
+    ## Return the parts of a repeat loop that only assigns variables and waits
+    #  for a fixed delay. Do not use it! Use Seq instead.
+    #  @param self The object pointer.
+    #  @param loop instance of RepeatLoop.
+    #  @return tuple with the number of iterations, the commands before the 
+    #          wait, the delay in us and the commands after the wait. None if 
+    #          the loop can't be run by a periodic timer.
+    #
+    #---------------------------------------------------------------------------
+    def seqPeriodic(self, loop):
+        """
+        Return the parts of a repeat loop that only assigns variables and 
+        waits for a fixed delay. Do not use it! Use Seq instead.
+
+        Args:
+            loop (RepeatLoop): The loop.
+
+        Returns:
+            tuple or None: Number of iterations, commands before the wait, 
+                delay in us and commands after the wait. None if the loop 
+                can't be run by a periodic timer.
+        """
+        n = self.seqLiteral(loop.getN())
+        if type(n) != int or n < 1:
+            return None
+        pre = CmdList()
+        post = CmdList()
+        delay = None
+        for cmd in loop.flat():
+            if isinstance(cmd, WaitUs) and isinstance(delay, type(None)):
+                delay = self.seqLiteral(cmd.getDelay())
+                if isinstance(delay, type(None)) or delay <= 0:
+                    return None
+            elif type(cmd) == Cmd and not isinstance(cmd.target, type(None)):
+                if isinstance(delay, type(None)):
+                    pre.append(cmd)
+                else:
+                    post.append(cmd)
+            else:
+                return None
+        if isinstance(delay, type(None)):
+            return None
+        return n, pre, float(delay), post
+
+    #---------------------------------------------------------------------------
+    ## Return the value of a numeric literal
+    #  @param self The object pointer.
+    #  @param literal string, Real, Integer, int or float.
+    #  @return int, float or None if the literal isn't a number.
+    #
+    #---------------------------------------------------------------------------
+    def seqLiteral(self, literal):
+        """
+        Return the value of a numeric literal.
+
+        Args:
+            literal (str, Real, Integer, int, or float): The literal.
+
+        Returns:
+            int, float, or None: The value or None if it isn't a number.
+        """
+        if type(literal) in (int, float):
+            return literal
+        literal = str(literal).strip()
+        if literal[:1] not in "+-.0123456789" or literal == "":
+            return None
+        try:
+            return int(literal)
+        except ValueError:
+            pass
+        try:
+            return float(literal)
+        except ValueError:
+            return None
+
+    #---------------------------------------------------------------------------
+    ## Return the targets, the values and the delay of a state that only 
+    #  assigns literals to variables and waits for the timer.
+    #  @param self The object pointer.
+    #  @param state instance of SeqState.
+    #  @return tuple with the targets, the values and the delay or None.
+    #
+    #---------------------------------------------------------------------------
+    def seqStep(self, state):
+        """
+        Return the targets, values and delay of a simple timed step.
+
+        Args:
+            state (SeqState): State of the sequence.
+
+        Returns:
+            tuple or None: Targets, values and delay of the step, or None if
+                the state doesn't only assign literals and wait for the timer.
+        """
+        exit = state.exit
+        if not isinstance(exit, SeqJump) or exit.eventId != 0 or \
+           exit.nxt != state.n + 1:
+            return None
+        delay = self.seqLiteral(exit.delay)
+        if isinstance(delay, type(None)):
+            return None
+        targets = []
+        values = []
+        for cmd in state.cmds.flat():
+            if type(cmd) != Cmd or isinstance(cmd.target, type(None)) or \
+               cmd.target in targets:
+                return None
+            value = self.seqLiteral(cmd.operand)
+            if isinstance(value, type(None)):
+                return None
+            targets.append(cmd.target)
+            values.append(value)
+        return tuple(targets), values, float(delay)
+
+    #---------------------------------------------------------------------------
+    ## Compress runs of states that only assign literals and wait for the 
+    #  timer. Each run is replaced by a single state that reads the values and 
+    #  the delays from constant arrays. Do not use it! Use Seq instead.
+    #  @param self The object pointer.
+    #  @param states list of SeqState.
+    #  @param minLength minimum number of states of a compressed run.
+    #  @return list of SeqState.
+    #
+    #---------------------------------------------------------------------------
+    def seqCompress(self, states, minLength):
+        """
+        Compress runs of timed steps into table driven states. Do not use it!
+        Use Seq instead.
+
+        Args:
+            states (list): List of SeqState.
+            minLength (int): Minimum number of states of a compressed run.
+
+        Returns:
+            list: List of SeqState.
+        """
+        preds = {}
+        for state in states:
+            for jump in state.getJumps():
+                preds[jump.nxt] = preds.get(jump.nxt, 0) + 1
+        ans = []
+        i = 0
+        while i < len(states):
+            head = states[i]
+            step = self.seqStep(head)
+            run = [step]
+            while not isinstance(step, type(None)) and \
+                  i + len(run) < len(states):
+                state = states[i + len(run)]
+                nxt = self.seqStep(state)
+                if state.n != head.n + len(run) or \
+                   preds.get(state.n, 0) != 1 or \
+                   isinstance(nxt, type(None)) or nxt[0] != step[0]:
+                    break
+                run.append(nxt)
+            if isinstance(step, type(None)) or len(run) < minLength:
+                ans.append(head)
+                i = i + 1
+                continue
+            index = self.var()
+            self.nCounters = self.nCounters + 1
+            cmds = CmdList()
+            for k, target in enumerate(step[0]):
+                values = self.table([values[k] for targets, values, delay 
+                                     in run])
+                cmds.append(assign(target, values[index]))
+            delays = self.table([delay for targets, values, delay in run])
+            cmds.append(self.time.eq(abstime + 1e-6*delays[index]))
+            cmds.append(index.eq((index + 1) % len(run)))
+            ans.append(
+                SeqState(head.n, 
+                    cmds, 
+                    SeqBranch(index == 0, 
+                        SeqJump(head.n + len(run), 0), 
+                        SeqJump(head.n, 0)
+                    )
+                )
+            )
+            i = i + len(run)
+        return ans
+
+    #---------------------------------------------------------------------------
+    ## Optimize the states of a sequence. Jumps are threaded through states 
+    #  that only jump to another state, the tests of loops and conditions are 
+    #  copied into the states that jump to them, states reached by a single 
+    #  immediate jump are merged into their predecessor, unreachable states are
+    #  removed and the states are renumbered densely. Do not use it! Use Seq 
+    #  instead.
+    #  @param self The object pointer.
+    #  @param states list of SeqState.
+    #  @return optimized list of SeqState sorted by state number.
+    #
+    #---------------------------------------------------------------------------
+    def seqOptimize(self, states):
+        """
+        Optimize the states of a sequence. Do not use it! Use Seq instead.
+
+        Jumps are threaded through states that only jump to another state,
+        the tests of loops and conditions are copied into the states that
+        jump to them, states reached by a single immediate jump are merged
+        into their predecessor, unreachable states are removed and the states
+        are renumbered densely.
+
+        Args:
+            states (list): List of SeqState.
+
+        Returns:
+            list: Optimized list of SeqState sorted by state number.
+        """
+        table = {state.n: state for state in states}
+        
+        #Thread the jumps through states without commands
+        for state in states:
+            for jump in state.getJumps():
+                visited = set()
+                target = table.get(jump.nxt)
+                while not isinstance(target, type(None)) and \
+                      target.n not in visited and target.isEmpty() and \
+                      isinstance(target.exit, SeqJump) and \
+                      not target.exit.isWait():
+                    visited.add(target.n)
+                    jump.nxt = target.exit.nxt
+                    target = table.get(jump.nxt)
+        
+        #Copy the tests of the loops and conditions into the states that jump 
+        #to them
+        for state in states:
+            if isinstance(state.exit, SeqJump) and not state.exit.isWait():
+                target = table.get(state.exit.nxt)
+                if not isinstance(target, type(None)) and \
+                   target is not state and target.isEmpty() and \
+                   isinstance(target.exit, SeqBranch) and \
+                   not target.exit.jumpTrue.isWait() and \
+                   not target.exit.jumpFalse.isWait():
+                    state.exit = SeqBranch(target.exit.cond,
+                        SeqJump(target.exit.jumpTrue.nxt),
+                        SeqJump(target.exit.jumpFalse.nxt)
+                    )
+        
+        #Remove the unreachable states
+        reachable = set()
+        stack = [0]
+        while len(stack) > 0:
+            n = stack.pop()
+            if n in reachable or n not in table:
+                continue
+            reachable.add(n)
+            stack.extend([jump.nxt for jump in table[n].getJumps()])
+        states = [state for state in sorted(states, key = lambda s: s.n) 
+                  if state.n in reachable]
+        
+        #Merge states reached by a single immediate jump. Halting states are 
+        #not merged since they run again if their event is retriggered.
+        preds = {}
+        for state in states:
+            for jump in state.getJumps():
+                preds[jump.nxt] = preds.get(jump.nxt, 0) + 1
+        merged = set()
+        for state in states:
+            if state.n in merged:
+                continue
+            while isinstance(state.exit, SeqJump) and \
+                  not state.exit.isWait():
+                target = table.get(state.exit.nxt)
+                if isinstance(target, type(None)) or target.n == 0 or \
+                   target is state or preds[target.n] != 1 or \
+                   isinstance(target.exit, type(None)):
+                    break
+                state.cmds = CmdList(state.cmds, target.cmds)
+                state.exit = target.exit
+                merged.add(target.n)
+        states = [state for state in states if state.n not in merged]
+        
+        #Renumber the states
+        index = {state.n: i for i, state in enumerate(states)}
+        last = len(states)
+        for state in states:
+            state.n = index[state.n]
+            for jump in state.getJumps():
+                jump.nxt = index.get(jump.nxt, last)
+        return states
+
+    #---------------------------------------------------------------------------
+    ## Add discontinuity hints to the states that change sources (Vdc, Idc and
+    #  Sw) with a step, that is when the rise time is zero and the value goes 
+    #  up or the fall time is zero and the value goes down. The direction is 
+    #  recorded in a flag before each assignment. The time step is also bound 
+    #  if autoBoundStep is enabled. Only the assignments at the top level of 
+    #  each state are considered. Do not use it! Use Seq instead.
+    #  @param self The object pointer.
+    #  @param states list of SeqState.
+    #  @return number of states with hints.
+    #
+    #---------------------------------------------------------------------------
+    def seqDiscontinuity(self, states):
+        """
+        Add discontinuity hints to the states that change sources with a 
+        step. Do not use it! Use Seq instead.
+
+        A source steps when the rise time is zero and the value goes up or 
+        the fall time is zero and the value goes down. The direction is 
+        recorded in a flag before each assignment. The time step is also 
+        bound if autoBoundStep is enabled. Only the assignments at the top 
+        level of each state are considered.
+
+        Args:
+            states (list): List of SeqState.
+
+        Returns:
+            int: Number of states with hints.
+        """
+        ans = 0
+        for state in states:
+            cmds = CmdList()
+            found = False
+            for cmd in state.cmds.flat():
+                if type(cmd) == Cmd and cmd.target in self.stepSources:
+                    if isinstance(self.stepFlag, type(None)):
+                        self.stepFlag = self.var(Bool(False), "_$step")
+                    rise, fall = self.stepSources[cmd.target]
+                    step = ternary(Real(cmd.operand) > Real(cmd.target), 
+                                   rise, fall) == 0
+                    if found:
+                        step = self.stepFlag | step
+                    cmds.append(self.stepFlag.eq(step))
+                    found = True
+                cmds.append(cmd)
+            if not found:
+                continue
+            hints = CmdList(Discontinuity(0))
+            if not isinstance(self.autoBoundStep, type(None)):
+                hints.append(BoundStep(self.autoBoundStep))
+            state.cmds = CmdList(cmds, If(self.stepFlag)(hints))
+            ans = ans + 1
+        return ans
+
+    #---------------------------------------------------------------------------
+    ## Return the longest run of states executed without waiting. The states 
+    #  that loop without waiting are counted once. Do not use it! Use Seq 
+    #  instead.
+    #  @param self The object pointer.
+    #  @param states list of SeqState.
+    #  @return tuple with the number of states of the longest run and True if
+    #          there are states that loop without waiting.
+    #
+    #---------------------------------------------------------------------------
+    def seqZeroWaitRun(self, states):
+        """
+        Return the longest run of states executed without waiting. Do not use 
+        it! Use Seq instead.
+
+        The states that loop without waiting are counted once.
+
+        Args:
+            states (list): List of SeqState.
+
+        Returns:
+            tuple: Number of states of the longest run and True if there are
+                states that loop without waiting.
+        """
+        succs = {state.n: [] for state in states}
+        preds = {state.n: [] for state in states}
+        for state in states:
+            for jump in state.getJumps():
+                if not jump.isWait() and jump.nxt in succs:
+                    succs[state.n].append(jump.nxt)
+                    preds[jump.nxt].append(state.n)
+        
+        #Order the states by finishing time
+        order = []
+        visited = set()
+        for root in succs:
+            if root in visited:
+                continue
+            visited.add(root)
+            stack = [(root, iter(succs[root]))]
+            while len(stack) > 0:
+                n, it = stack[-1]
+                for nxt in it:
+                    if nxt not in visited:
+                        visited.add(nxt)
+                        stack.append((nxt, iter(succs[nxt])))
+                        break
+                else:
+                    stack.pop()
+                    order.append(n)
+        
+        #Find the strongly connected components in topological order
+        comp = {}
+        comps = []
+        for root in reversed(order):
+            if root in comp:
+                continue
+            comp[root] = len(comps)
+            members = [root]
+            stack = [root]
+            while len(stack) > 0:
+                n = stack.pop()
+                for pred in preds[n]:
+                    if pred not in comp:
+                        comp[pred] = comp[root]
+                        members.append(pred)
+                        stack.append(pred)
+            comps.append(members)
+        
+        #Longest path of the condensed graph
+        loop = False
+        run = [len(members) for members in comps]
+        for i, members in enumerate(comps):
+            for n in members:
+                for nxt in succs[n]:
+                    if comp[nxt] == i:
+                        loop = True
+                    else:
+                        run[comp[nxt]] = max(run[comp[nxt]], 
+                                             run[i] + len(comps[comp[nxt]]))
+        return max(run + [0]), loop
+
+    #---------------------------------------------------------------------------
+    ## Return a balanced tree of range tests with case statements in the 
+    #  leaves. Do not use it! Use Seq instead.
+    #  @param self The object pointer.
+    #  @param items list of case items sorted by state number.
+    #  @param leafSize maximum number of states in each case statement.
+    #  @return tuple with the command, the number of leaves and the depth.
+    #
+    #---------------------------------------------------------------------------
+    def seqDispatch(self, items, leafSize):
+        """
+        Return a balanced tree of range tests with case statements in the 
+        leaves. Do not use it! Use Seq instead.
+
+        Args:
+            items (list): Case items sorted by state number.
+            leafSize (int): Maximum number of states in each case statement.
+
+        Returns:
+            tuple: The command, the number of leaves and the depth of the tree.
+        """
+        if len(items) <= leafSize:
+            leaf = Case(self.state)()
+            leaf.append(*items)
+            return leaf, 1, 0
+        mid = len(items)//2
+        low, lowLeaves, lowDepth = self.seqDispatch(items[:mid], leafSize)
+        high, highLeaves, highDepth = self.seqDispatch(items[mid:], leafSize)
+        tree = If(self.state < items[mid][0])(
+            low
+        ).Else(
+            high
+        )
+        return tree, lowLeaves + highLeaves, max(lowDepth, highDepth) + 1
+
     #---------------------------------------------------------------------------
     ## Sequence
     #  @param cond condition to run the sequence.
+    #  @param optimize states of the sequence are optimized if True (see 
+    #         seqOptimize).
+    #  @param compress runs of at least compress timed steps are replaced by a
+    #         table driven state (see seqCompress). 0 disables it.
+    #  @param leafSize case statements with more than leafSize states are split
+    #         into a balanced tree of range tests (see seqDispatch). 0 
+    #         disables it.
+    #  @param periodic repeat loops that only assign variables and wait for a 
+    #         fixed delay are run by a periodic timer if True (see 
+    #         seqPeriodic).
+    #  @param discontinuity the states that change sources with zero rise or
+    #         fall times announce the discontinuity if True (see 
+    #         seqDiscontinuity).
     #  @return function that accepts variable number of commands to be added to
     #  the sequence.
     #
     #---------------------------------------------------------------------------
-    def seq(self, cond):
+    def seq(self, cond, optimize = False, compress = 0, leafSize = 0, 
+            periodic = False, discontinuity = False):
         """
         Sequence
 
         Args:
             cond (bool): Condition to run the sequence.
+            optimize (bool): The states of the sequence are merged and 
+                renumbered if True.
+            compress (int): Runs of at least compress states that only 
+                assign literals and wait for the timer are replaced by a 
+                single table driven state. 0 disables it.
+            leafSize (int): Case statements with more than leafSize states 
+                are split into a balanced tree of range tests, so the dispatch
+                cost is logarithmic. 0 disables it.
+            periodic (bool): Repeat loops that only assign variables and wait
+                for a fixed delay are run by a periodic timer with a countdown
+                instead of re-arming the timer at each iteration if True.
+            discontinuity (bool): The states that change a Vdc, an Idc or a 
+                Sw whose rise or fall time is zero call $discontinuity (and 
+                $bound_step if autoBoundStep is enabled) if True, so the 
+                simulator doesn't find the step by rejecting time steps.
 
         Returns:
             func: Function that accepts a variable number of commands to be added to the sequence.
         """
+        checkType("optimize", optimize, bool)
+        checkType("compress", compress, int)
+        assert compress == 0 or compress > 1, \
+               "compress must be 0 or greater than 1"
+        checkType("leafSize", leafSize, int)
+        assert leafSize >= 0, "leafSize can't be negative"
+        checkType("periodic", periodic, bool)
+        checkType("discontinuity", discontinuity, bool)
         def func(*args):
-            self.nState   = 0
-            self.time     = self.var(Real(1e-9),  f"_$evntTime_{self.nSeq}") 
-            self.state    = self.var(Integer(0),  f"_$state_{self.nSeq}") 
-            self.runSt    = self.var(Bool(False), f"_$runSt_{self.nSeq}") 
-            self.eventId  = self.var(Integer(0),  f"_$eventId_{self.nSeq}") 
-            self.pCase    = Case(self.state)()
-            self.cond     = cond
-            self.evntList = []
+            start          = time.perf_counter()
+            self.nState    = 0
+            self.nEvents   = 0
+            self.nMonitors = 0
+            self.nCounters = 0
+            self.time      = self.var(Real(1e-9),  f"_$evntTime_{self.nSeq}") 
+            self.state     = self.var(Integer(0),  f"_$state_{self.nSeq}") 
+            self.runSt     = self.var(Bool(False), f"_$runSt_{self.nSeq}") 
+            self.eventId   = self.var(Integer(0),  f"_$eventId_{self.nSeq}") 
+            self.pCase     = Case(self.state)()
+            self.seqStates = []
+            self.seqSubs   = {}
+            self.seqCaller = None
+            self.periodic  = periodic
+            self.cond      = cond
+            self.evntList  = set()
             self.beginningAnalog(
-                At(Timer(*([self.time] + self.timeArgs)))(
+                self.timerEvent(self.time,
                     If(self.eventId == 0)(
                         self.runSt.eq(True)
-                    )
+                    ),
+                    seq = True
                 )
             )
+            dispatch = CmdList()
             self.testSeqs.append(
                 If(self.cond)(
                     While(self.runSt)(
                         self.runSt.eq(False),
-                        self.pCase
+                        dispatch
                     )
                 )
             )
             cmds = CmdList()
             i = 1
+            nMuxMarks = 0
             assert len(args) > 0, "Sequence can be empty"
             for cmd in args:
                 assert isinstance(cmd, Cmd) and \
@@ -2606,19 +5126,118 @@ class HiLevelMod(Module):
                        "of WaitAnalogEvent")
                 i = i + 1
                 if isinstance(cmd, Mark):
+                    #Marks are only allowed at the top level of the sequence,
+                    #so each one runs once and in order
+                    if not isinstance(cmd.marker, type(None)):
+                        nMuxMarks = nMuxMarks + 1
+                        cmd.marker.addMuxEvent(cmd.name, nMuxMarks)
                     cmds.append(cmd.getCmd())
                 else:
                     cmds.append(cmd)
             cmds = self.seqNested(cmds)
-            #Add a finish command
-            #cmds.append(Finish()) 
             #Add the last state 
-            if len(cmds) > 0:
-                self.pCase.append((Integer(self.nState), cmds))
+            self.seqStates.append(SeqState(self.nState, cmds))
+            self.seqSubroutines()
+            states = self.seqStates
+            if compress > 0:
+                states = self.seqCompress(states, compress)
+            if optimize:
+                states = self.seqOptimize(states)
+            if discontinuity:
+                self.seqDiscontinuity(states)
+            states = [state for state in states 
+                      if not state.isEmpty() or 
+                         not isinstance(state.exit, type(None))]
+            items = [self.seqCaseItem(state) for state in states]
+            if leafSize > 0 and len(items) > leafSize:
+                items.sort(key = lambda item: item[0])
+                tree, leaves, depth = self.seqDispatch(items, leafSize)
+                dispatch.append(tree)
+            else:
+                self.pCase.append(*items)
+                dispatch.append(self.pCase)
+                leaves, depth = 1, 0
+            run, loop = self.seqZeroWaitRun(states)
+            self.seqStats.append({"seq"          : self.nSeq,
+                                  "states"       : len(items),
+                                  "leaves"       : leaves,
+                                  "depth"        : depth,
+                                  "events"       : self.nEvents,
+                                  "monitors"     : self.nMonitors,
+                                  "counters"     : self.nCounters,
+                                  "time"         : time.perf_counter() - start,
+                                  "size"         : None,
+                                  "zeroWaitRun"  : run,
+                                  "zeroWaitLoop" : loop})
+            self.seqCode.append(dispatch)
+            if not isinstance(self.seqLog, type(None)):
+                stats = self.getSeqStats()[-1]
+                self.seqLog.write(self.formatSeqStats(stats) + "\n")
             #Go to the next sequence
             self.nSeq = self.nSeq + 1
         return func
             
+    #---------------------------------------------------------------------------
+    ## Return the compile report of the sequences. The rendered size is only 
+    #  computed when the report is requested.
+    #  @param self The object pointer.
+    #  @return list of dictionaries (one per sequence) with the keys seq, 
+    #          states, leaves, depth, events, monitors, counters, time, size, 
+    #          zeroWaitRun and zeroWaitLoop.
+    #
+    #---------------------------------------------------------------------------
+    def getSeqStats(self):
+        """
+        Return the compile report of the sequences.
+
+        Returns:
+            list: One dictionary per sequence with the keys:
+                seq (number of the sequence), 
+                states (number of case items), 
+                leaves (number of case statements), 
+                depth (depth of the dispatch tree), 
+                events (number of WaitSignal), 
+                monitors (number of new event monitors; the other events 
+                    were merged with existing monitors), 
+                counters (number of loop counters allocated), 
+                time (compile time in seconds), 
+                size (number of characters of the rendered states), 
+                zeroWaitRun (longest run of states executed in a single 
+                    simulator event) and 
+                zeroWaitLoop (True if states can loop without waiting).
+        """
+        for stats, code in zip(self.seqStats, self.seqCode):
+            if isinstance(stats["size"], type(None)):
+                text = code.getVA(3)
+                if self.symbolic:
+                    text = self.nameSpace.resolve(text)
+                stats["size"] = len(text)
+        return [dict(stats) for stats in self.seqStats]
+
+    #---------------------------------------------------------------------------
+    ## Format the compile report of a sequence.
+    #  @param self The object pointer.
+    #  @param stats dictionary returned by getSeqStats.
+    #  @return string.
+    #
+    #---------------------------------------------------------------------------
+    def formatSeqStats(self, stats):
+        """
+        Format the compile report of a sequence.
+
+        Args:
+            stats (dict): Report returned by getSeqStats.
+
+        Returns:
+            str: One line describing the sequence.
+        """
+        loop = " (loops without wait)" if stats["zeroWaitLoop"] else ""
+        return (f"seq {stats['seq']:4d}  states {stats['states']:6d}  "
+                f"events {stats['events']:4d} ({stats['monitors']} new)  "
+                f"counters {stats['counters']:4d}  "
+                f"compile {stats['time']:9.4f}s  size {stats['size']:9d}B  "
+                f"zero-wait run {stats['zeroWaitRun']}{loop}")
+            
     #---------------------------------------------------------------------------
     ## Return the equations in a format that can be imported by the maestro view
     #  @param self The object pointer.
@@ -33,8 +33,7 @@
 ## Imports
 #
 #-------------------------------------------------------------------------------
-from datetime import date
-import re
+from array import array
 import math as m
 
 #-------------------------------------------------------------------------------
@@ -1819,6 +1818,30 @@ class Integer():
         return self.value
 
         
+#-------------------------------------------------------------------------------
+## Return a command assigning a value to a variable. The target and the operand
+#  are kept in the command, so they can be stored in a compact way.
+#  @param target variable
+#  @param value expression assigned to the variable
+#  @return command representing the assignment
+#
+#-------------------------------------------------------------------------------
+def assign(target, value):
+    """Return a command assigning a value to a variable.
+
+    Args:
+        target (IntegerVar, RealVar or BoolVar): The variable.
+        value (Integer, Real, Bool or str): The expression assigned.
+
+    Returns:
+        Cmd: A command representing the assignment.
+    """
+    cmd = Cmd(f"{target} = {value}")
+    cmd.target  = str(target)
+    cmd.operand = str(value)
+    return cmd
+
+
 #-------------------------------------------------------------------------------
 ## Integer variable class
 #
@@ -1853,7 +1876,7 @@ class IntegerVar(Integer):
         Returns:
             Cmd: A command representing the increment operation.
         """
-        return Cmd(f"{self} = {self} + 1")  
+        return assign(self, f"{self} + 1")  
         
     #---------------------------------------------------------------------------
     ## Decrement
@@ -1867,7 +1890,7 @@ class IntegerVar(Integer):
         Returns:
             Cmd: A command representing the decrement operation.
         """
-        return Cmd(f"{self} = {self} - 1")    
+        return assign(self, f"{self} - 1")    
                      
     #---------------------------------------------------------------------------
     ## Atribution
@@ -1886,7 +1909,7 @@ class IntegerVar(Integer):
             Cmd: A command representing the assignment.
         """
         value = parseInteger("value", value)
-        return Cmd(f"{self} = {value}")        
+        return assign(self, value)        
     
 
 #-------------------------------------------------------------------------------
@@ -1928,7 +1951,7 @@ class RealVar(Real):
             Cmd: A command representing the assignment.
         """
         value = parseReal("value", value)
-        return Cmd(f"{self} = {value}")     
+        return assign(self, value)     
         
         
 #-------------------------------------------------------------------------------
@@ -1965,7 +1988,7 @@ class BoolVar(Bool):
         Returns:
             Cmd: A command representing the toggle operation.
         """
-        return Cmd(f"{self} = !{self}")  
+        return assign(self, f"!{self}")  
         
     #---------------------------------------------------------------------------
     ## Atribution
@@ -1984,9 +2007,181 @@ class BoolVar(Bool):
             Cmd: A command representing the assignment.
         """
         value = parseBool("value", value)
-        return Cmd(f"{self} = {value}") 
-        
-       
+        return assign(self, value)
+
+
+#-------------------------------------------------------------------------------
+## Return the placeholder of a template parameter
+#  @param name name of the template parameter
+#  @return string representing the placeholder in the rendered verilogA
+#
+#-------------------------------------------------------------------------------
+def placeholder(name):
+    """Return the placeholder of a template parameter.
+
+    Args:
+        name (str): Name of the template parameter.
+
+    Returns:
+        str: The placeholder used in the rendered verilogA.
+    """
+    checkType("name", name, str)
+    assert name.isidentifier(), \
+           f"{name} isn't a valid template parameter name"
+    return "{{" + name + "}}"
+
+
+#-------------------------------------------------------------------------------
+## Real template parameter class. It can be used wherever a Real is accepted
+#  and it is replaced by a literal when the module is rendered.
+#
+#-------------------------------------------------------------------------------
+class RealTemplate(Real):
+    """Real placeholder that is replaced by a literal at rendering."""
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self object pointer
+    #  @param name name of the template parameter
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, name):
+        """Initialize a RealTemplate instance.
+
+        Args:
+            name (str): Name of the template parameter.
+        """
+        super(RealTemplate, self).__init__(placeholder(name))
+        self.name = name
+
+    #---------------------------------------------------------------------------
+    ## Return the literal that replaces the placeholder
+    #  @param self object pointer
+    #  @param value Real, float or int
+    #  @return string representing the literal
+    #
+    #---------------------------------------------------------------------------
+    def literal(self, value):
+        """Return the literal that replaces the placeholder.
+
+        Args:
+            value (Real, float, int): Value of the parameter.
+
+        Returns:
+            str: The literal.
+        """
+        return str(parseReal(self.name, value))
+
+
+#-------------------------------------------------------------------------------
+## Integer template parameter class. It can be used wherever an Integer is
+#  accepted and it is replaced by a literal when the module is rendered.
+#
+#-------------------------------------------------------------------------------
+class IntegerTemplate(Integer):
+    """Integer placeholder that is replaced by a literal at rendering."""
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self object pointer
+    #  @param name name of the template parameter
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, name):
+        """Initialize an IntegerTemplate instance.
+
+        Args:
+            name (str): Name of the template parameter.
+        """
+        super(IntegerTemplate, self).__init__(placeholder(name))
+        self.name = name
+
+    #---------------------------------------------------------------------------
+    ## Return the literal that replaces the placeholder
+    #  @param self object pointer
+    #  @param value Integer or int
+    #  @return string representing the literal
+    #
+    #---------------------------------------------------------------------------
+    def literal(self, value):
+        """Return the literal that replaces the placeholder.
+
+        Args:
+            value (Integer, int): Value of the parameter.
+
+        Returns:
+            str: The literal.
+        """
+        return str(parseInteger(self.name, value))
+
+
+#-------------------------------------------------------------------------------
+## Table class. It represents a constant array parameter of the module. Its 
+#  elements can be used wherever a Real (or an Integer) is accepted.
+#
+#-------------------------------------------------------------------------------
+class Table():
+    """Class representing a constant array parameter of the module."""
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self object pointer
+    #  @param name name of the array parameter
+    #  @param vType it can be Integer or Real
+    #  @param length number of elements
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, name, vType, length):
+        """Initialize a Table instance.
+
+        Args:
+            name (str): Name of the array parameter.
+            vType (type): Integer or Real.
+            length (int): Number of elements.
+        """
+        checkType("name", name, str)
+        checkType("length", length, int)
+        assert vType in (Integer, Real), "vType must be Integer or Real"
+        self.name = name
+        self.vType = vType
+        self.length = length
+
+    #---------------------------------------------------------------------------
+    ## Number of elements
+    #  @param self object pointer
+    #  @return int
+    #
+    #---------------------------------------------------------------------------
+    def __len__(self):
+        """Return the number of elements.
+
+        Returns:
+            int: Number of elements.
+        """
+        return self.length
+
+    #---------------------------------------------------------------------------
+    ## Element of the table
+    #  @param self object pointer
+    #  @param index Integer or int representing the index
+    #  @return Integer or Real depending on the vType
+    #
+    #---------------------------------------------------------------------------
+    def __getitem__(self, index):
+        """Return an element of the table.
+
+        Args:
+            index (Integer or int): Index of the element.
+
+        Returns:
+            Integer or Real: The element.
+        """
+        if type(index) == int:
+            assert index >= 0 and index < self.length, "Index is out of range"
+        index = parseInteger("index", index)
+        return self.vType(f"{self.name}[{index}]")
+
+
 #-------------------------------------------------------------------------------
 ## Class of events
 #
@@ -2050,6 +2245,17 @@ class Event():
 #-------------------------------------------------------------------------------
 class Cmd:
     """Class representing a command in the system."""
+
+    # Target and operand of assignments (None for other commands)
+    target  = None
+    operand = None
+
+    # True for the commands that are compiled by a sequence (WaitUs, Mark...)
+    seqOnly = False
+
+    # Number of changes done to all CmdList and CmdBuffer. Module.render uses
+    # it to know if its skeleton is out of date.
+    edits = 0
     
     #---------------------------------------------------------------------------
     ## Constructor
@@ -2154,11 +2360,15 @@ class CmdList(list, Cmd):
             list: A flat list of commands.
         """
         ans = []
-        for item in self:
-            if type(item) == CmdList:   
-                ans = ans + item.flat()
-            else:
+        stack = [iter(self)]
+        while len(stack) > 0:
+            for item in stack[-1]:
+                if type(item) == CmdList:   
+                    stack.append(iter(item))
+                    break
                 ans.append(item)  
+            else:
+                stack.pop()
         return ans
 
     #---------------------------------------------------------------------------
@@ -2172,12 +2382,23 @@ class CmdList(list, Cmd):
         Args:
             *cmds: Variable number of commands to append.
         """
+        Cmd.edits = Cmd.edits + 1
         i = 0
         for cmd in cmds:
             checkInstance(f"cmds[{i}]", cmd, Cmd)
             checkNotInstance(f"cmds[{i}]", cmd, WaitAnalogEvent)
             super(CmdList, self).append(cmd)
             i = i + 1
+
+    #---------------------------------------------------------------------------
+    ## clear override 
+    #  @param self object pointer
+    #
+    #---------------------------------------------------------------------------
+    def clear(self):
+        """Override the clear method to count the change."""
+        Cmd.edits = Cmd.edits + 1
+        super(CmdList, self).clear()
         
     #---------------------------------------------------------------------------
     ## Return the VA verilog command
@@ -2200,6 +2421,341 @@ class CmdList(list, Cmd):
         return "".join([f"{l.getVA(padding)}" for l in self])
 
 
+#-------------------------------------------------------------------------------
+## String table class. Each string is stored only once and referenced by an 
+#  integer id.
+#
+#-------------------------------------------------------------------------------
+class StringTable:
+    """Table of strings referenced by integer ids."""
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self object pointer
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self):
+        """Initialize an empty StringTable."""
+        self.strings = []
+        self.ids     = {}
+
+    #---------------------------------------------------------------------------
+    ## Return the id of a string. The string is added if it isn't in the table.
+    #  @param self object pointer
+    #  @param string string to be added
+    #  @return id of the string
+    #
+    #---------------------------------------------------------------------------
+    def intern(self, string):
+        """Return the id of a string, adding it to the table if needed.
+
+        Args:
+            string (str): The string.
+
+        Returns:
+            int: The id of the string.
+        """
+        ans = self.ids.get(string)
+        if ans is None:
+            ans = len(self.strings)
+            self.ids[string] = ans
+            self.strings.append(string)
+        return ans
+
+    #---------------------------------------------------------------------------
+    ## Return the string of an id
+    #  @param self object pointer
+    #  @param index id of the string
+    #  @return string
+    #
+    #---------------------------------------------------------------------------
+    def __getitem__(self, index):
+        """Return the string of an id.
+
+        Args:
+            index (int): The id.
+
+        Returns:
+            str: The string.
+        """
+        return self.strings[index]
+
+    #---------------------------------------------------------------------------
+    ## Return the number of strings in the table
+    #  @param self object pointer
+    #  @return number of strings
+    #
+    #---------------------------------------------------------------------------
+    def __len__(self):
+        """Return the number of strings in the table.
+
+        Returns:
+            int: Number of strings.
+        """
+        return len(self.strings)
+
+    #---------------------------------------------------------------------------
+    ## Check if a string is in the table
+    #  @param self object pointer
+    #  @param string string to be checked
+    #  @return True if the string is in the table
+    #
+    #---------------------------------------------------------------------------
+    def __contains__(self, string):
+        """Check if a string is in the table.
+
+        Args:
+            string (str): The string.
+
+        Returns:
+            bool: True if the string is in the table.
+        """
+        return string in self.ids
+
+
+#-------------------------------------------------------------------------------
+## Symbol table class. It holds the identifiers of a module. Expressions may 
+#  reference an identifier by its id, so the identifier can be renamed without
+#  touching the expressions.
+#
+#-------------------------------------------------------------------------------
+class SymbolTable(StringTable):
+    """Table of identifiers referenced by integer ids."""
+
+    #---------------------------------------------------------------------------
+    ## Return the reference to an identifier. References are replaced by the
+    #  identifier when the table resolves a text.
+    #  @param self object pointer
+    #  @param name identifier
+    #  @return string representing the reference
+    #
+    #---------------------------------------------------------------------------
+    def ref(self, name):
+        """Return the reference to an identifier.
+
+        Args:
+            name (str): The identifier.
+
+        Returns:
+            str: The reference.
+        """
+        return f"\x02{self.ids[name]}\x03"
+
+    #---------------------------------------------------------------------------
+    ## Rename an identifier.
+    #  @param self object pointer
+    #  @param name current identifier
+    #  @param newName new identifier
+    #
+    #---------------------------------------------------------------------------
+    def rename(self, name, newName):
+        """Rename an identifier.
+
+        Args:
+            name (str): The current identifier.
+            newName (str): The new identifier.
+        """
+        index = self.ids.pop(name)
+        self.ids[newName] = index
+        self.strings[index] = newName
+
+    #---------------------------------------------------------------------------
+    ## Replace all references in a text by their identifiers.
+    #  @param self object pointer
+    #  @param text string with references
+    #  @return string without references
+    #
+    #---------------------------------------------------------------------------
+    def resolve(self, text):
+        """Replace all references in a text by their identifiers.
+
+        Args:
+            text (str): Text with references.
+
+        Returns:
+            str: Text without references.
+        """
+        chunks = text.split("\x02")
+        strings = self.strings
+        for i in range(1, len(chunks)):
+            index, rest = chunks[i].split("\x03", 1)
+            chunks[i] = strings[int(index)] + rest
+        return "".join(chunks)
+
+
+#-------------------------------------------------------------------------------
+## Command Buffer class. It stores a long sequence of commands in array columns
+#  (opcode, target id and operand id) whose strings are kept in a string table.
+#  The text of the commands is only built when the verilogA is emitted.
+#
+#-------------------------------------------------------------------------------
+class CmdBuffer(Cmd):
+    """Compact storage for long sequences of commands."""
+
+    # Opcodes
+    ASSIGN = 0
+    TEXT   = 1
+    OBJECT = 2
+
+    #---------------------------------------------------------------------------
+    ## Constructor
+    #  @param self object pointer
+    #  @param cmds commands to be added to the va
+    #  @param table string table. A new one is created if None.
+    #
+    #---------------------------------------------------------------------------
+    def __init__(self, *cmds, table = None):
+        """Initialize a CmdBuffer instance and append the provided commands.
+
+        Args:
+            *cmds: Variable number of commands to add.
+            table (StringTable, optional): Shared string table.
+        """
+        if table is None:
+            table = StringTable()
+        checkInstance("table", table, StringTable)
+        self.table    = table
+        self.opcodes  = array("B")
+        self.targets  = array("I")
+        self.operands = array("I")
+        self.objects  = []
+        self.append(*cmds)
+
+    #---------------------------------------------------------------------------
+    ## Add an assignment without building the command
+    #  @param self object pointer
+    #  @param target variable
+    #  @param value expression assigned to the variable
+    #
+    #---------------------------------------------------------------------------
+    def assign(self, target, value):
+        """Add an assignment without building the command.
+
+        Args:
+            target (IntegerVar, RealVar or BoolVar): The variable.
+            value (Integer, Real, Bool or str): The expression assigned.
+        """
+        Cmd.edits = Cmd.edits + 1
+        self.opcodes.append(CmdBuffer.ASSIGN)
+        self.targets.append(self.table.intern(str(target)))
+        self.operands.append(self.table.intern(str(value)))
+
+    #---------------------------------------------------------------------------
+    ## append
+    #  @param self object pointer
+    #  @param *cmds variable number of Cmd or CmdList to be added 
+    #
+    #---------------------------------------------------------------------------
+    def append(self, *cmds):
+        """Add commands to the buffer.
+
+        Args:
+            *cmds: Variable number of commands to append.
+        """
+        Cmd.edits = Cmd.edits + 1
+        i = 0
+        for cmd in cmds:
+            checkInstance(f"cmds[{i}]", cmd, Cmd)
+            checkNotInstance(f"cmds[{i}]", cmd, WaitAnalogEvent)
+            assert not cmd.seqOnly, f"cmds[{i}] can only be used in a sequence"
+            if type(cmd) == CmdList:
+                self.append(*cmd.flat())
+            elif type(cmd) == Cmd and cmd.target is not None:
+                self.opcodes.append(CmdBuffer.ASSIGN)
+                self.targets.append(self.table.intern(cmd.target))
+                self.operands.append(self.table.intern(cmd.operand))
+            elif type(cmd) == Cmd:
+                self.opcodes.append(CmdBuffer.TEXT)
+                self.targets.append(self.table.intern(cmd.cmd))
+                self.operands.append(0)
+            else:
+                self.opcodes.append(CmdBuffer.OBJECT)
+                self.targets.append(len(self.objects))
+                self.operands.append(0)
+                self.objects.append(cmd)
+            i = i + 1
+
+    #---------------------------------------------------------------------------
+    ## Return the number of commands in the buffer
+    #  @param self object pointer
+    #  @return number of commands
+    #
+    #---------------------------------------------------------------------------
+    def __len__(self):
+        """Return the number of commands in the buffer.
+
+        Returns:
+            int: Number of commands.
+        """
+        return len(self.opcodes)
+
+    #---------------------------------------------------------------------------
+    ## Iterate over the commands. They are rebuilt from the columns.
+    #  @param self object pointer
+    #  @return iterator of commands
+    #
+    #---------------------------------------------------------------------------
+    def __iter__(self):
+        """Iterate over the commands, rebuilding them from the columns.
+
+        Returns:
+            iterator: Iterator of Cmd instances.
+        """
+        table = self.table
+        for opcode, target, operand in zip(self.opcodes, self.targets, 
+                                           self.operands):
+            if opcode == CmdBuffer.ASSIGN:
+                yield assign(table[target], table[operand])
+            elif opcode == CmdBuffer.TEXT:
+                yield Cmd(table[target])
+            else:
+                yield self.objects[target]
+
+    #---------------------------------------------------------------------------
+    ## Return string representation
+    #  @param self object pointer
+    #  @return string representation
+    #
+    #---------------------------------------------------------------------------
+    def __str__(self):
+        """Return a comma-separated string representation of the commands.
+
+        Returns:
+            str: The string representation.
+        """
+        return ", ".join([str(x) for x in self])
+
+    #---------------------------------------------------------------------------
+    ## Return the VA verilog command
+    #  @param self object pointer
+    #  @param padding number of tabs by which the text will be right shifted
+    #  @return verilog command
+    #  
+    #---------------------------------------------------------------------------
+    def getVA(self, padding):
+        """Return the VA Verilog commands with the specified padding.
+
+        Args:
+            padding (int): Number of indentation tabs.
+
+        Returns:
+            str: The formatted Verilog command string.
+        """
+        checkType("padding", padding, int)
+        pad     = '    '*padding
+        strings = self.table.strings
+        result  = []
+        for opcode, target, operand in zip(self.opcodes, self.targets, 
+                                           self.operands):
+            if opcode == CmdBuffer.ASSIGN:
+                result.append(f"{pad}{strings[target]} = {strings[operand]};\n")
+            elif opcode == CmdBuffer.TEXT:
+                result.append(Cmd(strings[target]).getVA(padding))
+            else:
+                result.append(self.objects[target].getVA(padding))
+        return "".join(result)
+
+
 #-------------------------------------------------------------------------------
 ## Returns the pointer to a function that add commands to an analog event
 #  @param header header of the block
@@ -2276,7 +2832,8 @@ class Block(CmdList):
             str: The formatted Verilog command string.
         """
         checkType("padding", padding, int)
-        length = len(self.flat())
+        length = sum([len(cmd) if isinstance(cmd, CmdBuffer) else 1 
+                      for cmd in self.flat()])
         if length > 1:
             result = (f"{'    '*padding}{self.header} begin\n"
                       f"{super(Block, self).getVA(padding + 1)}"
@@ -3177,20 +3734,56 @@ def Write(msg, *params):
 #-------------------------------------------------------------------------------
 ## Fopen
 #  @param fileName name of the file
+#  @param mode optional string with the type of the file ("r", "w" or "a")
 #  @return Integer representing the file descriptor
 #
 #-------------------------------------------------------------------------------
-def Fopen(fileName):
+def Fopen(fileName, mode = None):
     """Return an Integer representing the file descriptor from opening a file.
 
     Args:
         fileName (str): The name of the file.
+        mode (str, optional): Type of the file ("r", "w" or "a").
 
     Returns:
         Integer: The file descriptor.
     """
     checkType("msg", fileName, str)
-    return Integer(f'$fopen("{fileName}")') 
+    if mode is None:
+        return Integer(f'$fopen("{fileName}")') 
+    assert mode in ("r", "w", "a"), "mode must be r, w or a"
+    return Integer(f'$fopen("{fileName}", "{mode}")') 
+
+
+#-------------------------------------------------------------------------------
+## Fscanf
+#  @param desc Integer or int representing the file descriptor
+#  @param fmt format of the line
+#  @param *variables variables where the values read are stored
+#  @return Integer representing the number of values read
+#
+#-------------------------------------------------------------------------------
+def Fscanf(desc, fmt, *variables):
+    """Return an Integer representing the number of values read from a file.
+
+    Args:
+        desc (Integer or int): The file descriptor.
+        fmt (str): The format of the line.
+        *variables: Variables (IntegerVar, RealVar or BoolVar) where the values 
+            are stored.
+
+    Returns:
+        Integer: The number of values read.
+    """
+    desc = parseInteger("desc", desc)
+    checkType("fmt", fmt, str)
+    i = 0
+    for variable in variables:
+        checkInstance(f"variables[{i}]", variable, 
+                      (IntegerVar, RealVar, BoolVar))
+        i = i + 1
+    args = "".join([f", {variable}" for variable in variables])
+    return Integer(f'$fscanf({desc}, "{fmt}"{args})') 
 
 
 #-------------------------------------------------------------------------------
@@ -4364,19 +4957,24 @@ class Module:
     #  @param moduleName name of the module (the first word after module in the 
     #         va)
     #  @param ignoreHiddenStates ignore hiddel state pragma will be added if True
+    #  @param symbolic identifiers are referenced by id in the expressions if 
+    #         True. It allows them to be renamed.
     #
     #---------------------------------------------------------------------------
-    def __init__(self, moduleName, ignoreHiddenStates = False):
+    def __init__(self, moduleName, ignoreHiddenStates = False, symbolic = False):
         """Initialize a Module instance.
 
         Args:
             moduleName (str): The module's name.
             ignoreHiddenStates (bool): Pragma will be added if True
+            symbolic (bool): Identifiers are referenced by id if True.
         """
         checkType("moduleName", moduleName, str)
+        checkType("symbolic", symbolic, bool)
         self.moduleName = moduleName   
         self.nameCount  = 0
-        self.nameSpace  = []
+        self.nameSpace  = SymbolTable()
+        self.symbolic   = symbolic
         self.nodes      = []
         self.ports      = []
         self.parameters = []
@@ -4385,6 +4983,10 @@ class Module:
         self.endCmds    = []
         self.beginningCmds = []
         self.ignoreHiddenStates = ignoreHiddenStates 
+        self.templates  = {}
+        self.skeleton   = None
+        self.skeletonKey = None
+        self.strings    = StringTable()
 
     #---------------------------------------------------------------------------
     ## return module name
@@ -4422,12 +5024,81 @@ class Module:
         if name == "":
             self.nameCount = self.nameCount + 1
             name = f"_${self.nameCount}"
-        assert re.match(r"[_a-zA-Z][_a-zA-Z$0-9]*", name), \
+        assert name[:1] == "_" or (name[:1].isascii() and name[:1].isalpha()), \
                f"{name} isn't a valid verilogA identifier"
         assert not name in self.nameSpace, f"{name} is already taken"
-        self.nameSpace.append(name)
+        self.nameSpace.intern(name)
+        self.skeleton = None
         return name
 
+    #---------------------------------------------------------------------------
+    ## Return the string used to reference an identifier in the expressions. It
+    #  is the identifier itself unless the module is symbolic. 
+    #  @param self The object pointer. 
+    #  @param name identifier. Bus bits (e.g. "a[3]") are accepted.
+    #  @return string referencing the identifier
+    #
+    #---------------------------------------------------------------------------
+    def ref(self, name):
+        """Return the string used to reference an identifier.
+
+        Args:
+            name (str): The identifier. Bus bits (e.g. "a[3]") are accepted.
+
+        Returns:
+            str: The reference.
+        """
+        if not self.symbolic:
+            return name
+        base, sep, index = name.partition("[")
+        return self.nameSpace.ref(base) + sep + index
+
+    #---------------------------------------------------------------------------
+    ## Replace the references of a text by the current identifiers. The text is
+    #  returned unchanged unless the module is symbolic.
+    #  @param self The object pointer. 
+    #  @param text string with references
+    #  @return string without references
+    #
+    #---------------------------------------------------------------------------
+    def resolve(self, text):
+        """Replace the references of a text by the current identifiers.
+
+        Args:
+            text (str): Text with references.
+
+        Returns:
+            str: Text without references.
+        """
+        if not self.symbolic:
+            return text
+        return self.nameSpace.resolve(text)
+
+    #---------------------------------------------------------------------------
+    ## Rename an identifier. It is only available for symbolic modules.
+    #  @param self The object pointer. 
+    #  @param name current identifier
+    #  @param newName new identifier
+    #
+    #---------------------------------------------------------------------------
+    def rename(self, name, newName):
+        """Rename an identifier of a symbolic module.
+
+        Args:
+            name (str): The current identifier.
+            newName (str): The new identifier.
+        """
+        if not self.symbolic:
+            raise Exception("only symbolic modules can be renamed")
+        checkType("newName", newName, str)
+        assert name in self.nameSpace, f"{name} isn't in the module"
+        assert newName[:1] == "_" or \
+               (newName[:1].isascii() and newName[:1].isalpha()), \
+               f"{newName} isn't a valid verilogA identifier"
+        assert not newName in self.nameSpace, f"{newName} is already taken"
+        self.nameSpace.rename(name, newName)
+        self.skeleton = None
+
     #---------------------------------------------------------------------------
     ## Add variable to the module
     #  @param self The object pointer. 
@@ -4447,7 +5118,7 @@ class Module:
         Returns:
             An instance of IntegerVar, BoolVar, or RealVar.
         """
-        name = self.fixName(name)
+        name = self.ref(self.fixName(name))
         if vType == Integer:
             vType = "integer"
             ans   = IntegerVar(name)
@@ -4481,7 +5152,7 @@ class Module:
         Returns:
             RealVar or IntegerVar: The parameter variable.
         """
-        name = self.fixName(name)
+        name = self.ref(self.fixName(name))
         if isinstance(value, Integer) or type(value) == int:
             value = parseInteger("value", value)
             pType = "integer"
@@ -4496,6 +5167,93 @@ class Module:
         self.parameters.append((name, pType, str(value))) 
         return ans
 
+    #---------------------------------------------------------------------------
+    ## Add a constant array parameter to the module
+    #  @param self The object pointer. 
+    #  @param values list of int or float. The table is an array of integers 
+    #         if all values are int.
+    #  @param name string representing the name of the parameter in the verilogA
+    #  @return Table
+    #
+    #---------------------------------------------------------------------------
+    def table(self, values, name = ""):
+        """Add a constant array parameter to the module.
+
+        Args:
+            values (list): Values of the elements (int or float). The table 
+                is an array of integers if all values are int.
+            name (str, optional): The parameter's name. Defaults to "".
+
+        Returns:
+            Table: The array parameter.
+        """
+        values = list(values)
+        assert len(values) > 0, "values can't be empty"
+        for i, value in enumerate(values):
+            assert type(value) in (int, float), \
+                   f"values[{i}] must be int or float"
+        name = self.ref(self.fixName(name))
+        if all(type(value) == int for value in values):
+            pType = "integer"
+            vType = Integer
+        else:
+            pType = "real"
+            vType = Real
+        literals = [str(vType(value)) for value in values]
+        self.parameters.append((f"{name}[0:{len(values) - 1}]", pType, 
+                                "'{" + ", ".join(literals) + "}"))
+        return Table(name, vType, len(values))
+
+    #---------------------------------------------------------------------------
+    ## Add a template parameter to the module. The template parameter can be 
+    #  used wherever a Real or an Integer literal is accepted. Its value is only
+    #  given when the module is rendered.
+    #  @param self The object pointer. 
+    #  @param name string representing the name of the template parameter
+    #  @param vType it can be Integer or Real
+    #  @return RealTemplate or IntegerTemplate depending on the vType
+    #
+    #---------------------------------------------------------------------------
+    def tpar(self, name, vType = Real):
+        """Add a template parameter to the module.
+
+        Args:
+            name (str): The template parameter's name.
+            vType (type, optional): Real or Integer. Defaults to Real.
+
+        Returns:
+            RealTemplate or IntegerTemplate: The placeholder.
+        """
+        assert not name in self.templates, f"{name} is already taken"
+        if vType == Real:
+            ans = RealTemplate(name)
+        elif vType == Integer:
+            ans = IntegerTemplate(name)
+        else:
+            raise TypeError( (f"vType be Integer or Real but a {vType} was "
+                               "given") ) 
+        self.templates[name] = ans
+        return ans
+
+    #---------------------------------------------------------------------------
+    ## Return a command buffer that shares the string table of the module. It 
+    #  should be used for long sequences of simple commands.
+    #  @param self The object pointer.
+    #  @param *args variable number of Cmd or CmdList to be added 
+    #  @return CmdBuffer
+    #
+    #---------------------------------------------------------------------------
+    def cmdBuffer(self, *args):
+        """Return a command buffer that shares the module's string table.
+
+        Args:
+            *args: Variable number of commands.
+
+        Returns:
+            CmdBuffer: The command buffer.
+        """
+        return CmdBuffer(*args, table = self.strings)
+
     #---------------------------------------------------------------------------
     ## Add commands to the analog block
     #  @param self The object pointer.
@@ -4515,6 +5273,7 @@ class Module:
                     f" was given instead")
             i = i + 1
             self.cmds.append(arg)
+        self.skeleton = None
 
     #---------------------------------------------------------------------------
     ## Add commands to beginning of the analog block
@@ -4535,6 +5294,7 @@ class Module:
                     f" was given instead")
             i = i + 1
             self.beginningCmds.append(arg)
+        self.skeleton = None
 
     #---------------------------------------------------------------------------
     ## Add commands to the end of the analog block
@@ -4555,6 +5315,7 @@ class Module:
                     f" was given instead")
             i = i + 1
             self.endCmds.append(arg)
+        self.skeleton = None
 
     #---------------------------------------------------------------------------
     ## Add node
@@ -4583,9 +5344,10 @@ class Module:
         assert direction in ["input", "output", "inout", "internal"], \
                "direction must be input, output, inout, or internal"
         name = self.fixName(name)
+        ref  = self.ref(name)
         if direction != "internal":
-            self.ports.append((name, width, direction))
-        self.nodes.append((name, width)) 
+            self.ports.append((ref, width, direction))
+        self.nodes.append((ref, width)) 
         return name
 
     #---------------------------------------------------------------------------
@@ -4610,7 +5372,7 @@ class Module:
         Returns:
             Electrical or list[Electrical]: The Electrical signal(s).
         """
-        name = self.addNode(name, width, direction)
+        name = self.ref(self.addNode(name, width, direction))
         if width == 1:
             return Electrical(name)
         else:
@@ -4634,6 +5396,7 @@ class Module:
         #-----------------------------------------------------------------------
         # Header
         #-----------------------------------------------------------------------
+        from datetime import date
         comment = "Module: " + self.moduleName + "\n"
         comment = comment + "Date: " + str(date.today())
         result = blockComment(0, comment, align = "left")
@@ -4725,5 +5488,50 @@ class Module:
         #-----------------------------------------------------------------------
         result = result + "end\nendmodule"
 
+        if self.symbolic:
+            result = self.nameSpace.resolve(result)
         return result
+
+    #---------------------------------------------------------------------------
+    ## Return the VA verilog code with the template parameters replaced by the
+    #  given values. The module is rendered only once into a skeleton, which is
+    #  kept until the module, one of its CmdList or CmdBuffer or the date of 
+    #  the header is changed.
+    #  @param self The object pointer.
+    #  @param **values value of each template parameter
+    #  @return string with the verilogA code
+    #
+    #---------------------------------------------------------------------------
+    def render(self, **values):
+        """Return the Verilog-A code with the template parameters replaced.
+
+        The module is rendered only once into a skeleton, which is kept until
+        the module, one of its CmdList or CmdBuffer or the date of the header
+        is changed.
+
+        Args:
+            **values: Value of each template parameter.
+
+        Returns:
+            str: The generated Verilog-A code.
+        """
+        for name in values:
+            if not name in self.templates:
+                raise Exception(f"{name} isn't a template parameter")
+        from datetime import date
+        if self.skeleton is None or \
+           self.skeletonKey != (Cmd.edits, date.today()):
+            import re
+            self.skeleton = re.split(r"\{\{([_a-zA-Z][_a-zA-Z0-9]*)\}\}", 
+                                     self.getVA())
+            self.skeletonKey = (Cmd.edits, date.today())
+        literals = {}
+        for name, template in self.templates.items():
+            if not name in values:
+                raise Exception(f"{name} wasn't given")
+            literals[name] = template.literal(values[name])
+        chunks = list(self.skeleton)
+        for i in range(1, len(chunks), 2):
+            chunks[i] = literals[chunks[i]]
+        return "".join(chunks)
     